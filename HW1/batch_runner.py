@@ -0,0 +1,253 @@
+import argparse
+import csv
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from pathlib import Path
+
+import cv2
+
+from edge_detection_test_images.gradient_edge_detection import roberts_operator, prewitt_operator, sobel_operator
+from edge_detection_test_images.laplacian_edge_detection import laplacian_abs, log_zero_crossing
+from edge_detection_test_images.canny_edge_detection import canny_multiscale
+from gaussian_multiscale_smoothing_test_images.gaussian_filter import KERNEL_SIZES, multiscale_gaussian_blur
+from threshold_segmentation_test_images.threshold_segmentation import otsu_threshold
+from region_splitting_merging_test_images.quadtree_split import QuadTreeSplitter
+from region_growing_test_images.region_growing import RegionGrower
+
+# HW1 默认测试目录 (相对于 HW1 目录)
+DEFAULT_IMAGE_DIRS = [
+    "edge_detection_test_images",
+    "gaussian_multiscale_smoothing_test_images",
+    "region_growing_test_images",
+    "region_splitting_merging_test_images",
+    "threshold_segmentation_test_images",
+]
+
+IMAGE_EXTENSIONS = {".bmp", ".jpg", ".jpeg", ".png", ".tif", ".tiff"}
+
+# 每个算法默认处理的目录 (未指定 --dirs 时使用)
+ALGORITHM_DEFAULT_DIRS = {
+    "gradient": ["edge_detection_test_images"],
+    "laplacian": ["edge_detection_test_images"],
+    "canny": ["edge_detection_test_images"],
+    "gaussian": ["gaussian_multiscale_smoothing_test_images"],
+    "otsu": ["threshold_segmentation_test_images"],
+    "quadtree": ["region_splitting_merging_test_images"],
+    "region_growing": ["region_growing_test_images"],
+}
+
+ALGORITHMS = list(ALGORITHM_DEFAULT_DIRS)
+
+def discover_images(dirs):
+    """递归查找目录下的所有图像 (跳过 results 结果目录)"""
+    images = []
+    for d in dirs:
+        root = Path(d)
+        if root.is_file():
+            images.append(root)
+            continue
+        for path in sorted(root.rglob("*")):
+            if "results" in path.relative_to(root).parts:
+                continue
+            if path.suffix.lower() in IMAGE_EXTENSIONS:
+                images.append(path)
+    return images
+
+def load_seeds(seed_path):
+    """读取种子文件，每行一个 'x y' (或 'x,y')，'#' 开头为注释"""
+    seeds = []
+    with open(seed_path, encoding="utf-8") as f:
+        for line in f:
+            line = line.split("#", 1)[0].strip()
+            if not line:
+                continue
+            x, y = line.replace(",", " ").split()[:2]
+            seeds.append((int(x), int(y)))
+    return seeds
+
+def find_seed_file(img_path, seeds_dir=None):
+    """查找图像对应的种子文件: <seeds_dir 或图像目录>/<文件名>.seeds"""
+    img_path = Path(img_path)
+    seed_dir = Path(seeds_dir) if seeds_dir else img_path.parent
+    seed_path = seed_dir / f"{img_path.stem}.seeds"
+    return seed_path if seed_path.exists() else None
+
+def run_gradient(img_path, options):
+    img = cv2.imread(str(img_path), cv2.IMREAD_GRAYSCALE)
+    return {
+        "roberts": roberts_operator(img),
+        "prewitt": prewitt_operator(img),
+        "sobel": sobel_operator(img),
+    }
+
+def run_laplacian(img_path, options):
+    img = cv2.imread(str(img_path), cv2.IMREAD_GRAYSCALE)
+    results = {"laplacian": laplacian_abs(img)}
+    for sigma in sorted(options["log_sigmas"]):
+        results[f"log_sigma{sigma:g}"] = log_zero_crossing(img, sigma, threshold=options["log_threshold"])
+    return results
+
+def run_canny(img_path, options):
+    img = cv2.imread(str(img_path), cv2.IMREAD_GRAYSCALE)
+    canny_small, canny_med, canny_large = canny_multiscale(img, options["canny_low"], options["canny_high"])
+    return {
+        "canny_small": canny_small,
+        "canny_medium": canny_med,
+        "canny_large": canny_large,
+    }
+
+def run_gaussian(img_path, options):
+    img = cv2.imread(str(img_path), cv2.IMREAD_GRAYSCALE)
+    blurred_imgs = multiscale_gaussian_blur(img, KERNEL_SIZES)
+    return {f"gaussian_{ksize[0]}x{ksize[1]}": blurred for ksize, blurred in zip(KERNEL_SIZES, blurred_imgs)}
+
+def run_otsu(img_path, options):
+    img = cv2.imread(str(img_path), cv2.IMREAD_GRAYSCALE)
+    _, otsu_img = otsu_threshold(img)
+    return {"otsu": otsu_img}
+
+def run_quadtree(img_path, options):
+    img = cv2.imread(str(img_path), cv2.IMREAD_GRAYSCALE)
+    std_thresholds = options["std_thresh"]
+    if len(std_thresholds) == 1:
+        splitter = QuadTreeSplitter(img, std_thresh=std_thresholds[0], min_size=options["min_size"])
+        res_segment, res_grid = splitter.run()
+        return {"segment": res_segment, "grid": res_grid}
+
+    # 多个阈值: 建一次完整四叉树，再对每个阈值剪枝
+    tree = QuadTreeSplitter(img, min_size=options["min_size"]).build_full()
+    results = {}
+    for t in std_thresholds:
+        results[f"segment_t{t:g}"] = tree.render_segmentation(t)
+        results[f"grid_t{t:g}"] = tree.render_grid(img, t)
+    return results
+
+def run_region_growing(img_path, options):
+    seed_path = find_seed_file(img_path, options["seeds_dir"])
+    if seed_path is None:
+        return None
+    grower = RegionGrower(str(img_path), threshold=options["rg_threshold"])
+    for seed in load_seeds(seed_path):
+        grower.seeds.append(seed)
+        grower.region_growing(seed)
+    return {"region_growing": grower.output}
+
+RUNNERS = {
+    "gradient": run_gradient,
+    "laplacian": run_laplacian,
+    "canny": run_canny,
+    "gaussian": run_gaussian,
+    "otsu": run_otsu,
+    "quadtree": run_quadtree,
+    "region_growing": run_region_growing,
+}
+
+def run_task(algorithm, img_path, output_root, options):
+    """
+    在工作进程中执行单个 (算法, 图像) 任务，并将结果写入:
+        <output_root>/<algorithm>/<图像所在目录名>/<文件名>_<结果名>.png
+    """
+    img_path = Path(img_path)
+    start = time.perf_counter()
+    try:
+        results = RUNNERS[algorithm](img_path, options)
+    except Exception as e:
+        return {"algorithm": algorithm, "image": str(img_path), "status": f"error: {e!r}",
+                "elapsed_s": time.perf_counter() - start, "outputs": []}
+
+    if results is None:
+        return {"algorithm": algorithm, "image": str(img_path), "status": "skipped",
+                "elapsed_s": time.perf_counter() - start, "outputs": []}
+
+    out_dir = Path(output_root) / algorithm / img_path.parent.name
+    out_dir.mkdir(parents=True, exist_ok=True)
+    outputs = []
+    for variant, result_img in results.items():
+        out_path = out_dir / f"{img_path.stem}_{variant}.png"
+        cv2.imwrite(str(out_path), result_img)
+        outputs.append(str(out_path))
+
+    return {"algorithm": algorithm, "image": str(img_path), "status": "ok",
+            "elapsed_s": time.perf_counter() - start, "outputs": outputs}
+
+def run_batch(algorithms, output_root, dirs=None, workers=None, options=None):
+    """
+    对所有 (算法, 图像) 组合并行执行，返回每个任务的结果记录列表。
+    dirs 为 None 时每个算法使用各自的默认测试目录。
+    """
+    opts = default_options()
+    opts.update(options or {})
+
+    tasks = []
+    for algorithm in algorithms:
+        for img_path in discover_images(dirs or ALGORITHM_DEFAULT_DIRS[algorithm]):
+            tasks.append((algorithm, str(img_path)))
+
+    print(f"共 {len(tasks)} 个任务，结果将保存至: {output_root}")
+    records = []
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        futures = [pool.submit(run_task, algorithm, img_path, output_root, opts) for algorithm, img_path in tasks]
+        for i, future in enumerate(as_completed(futures), 1):
+            record = future.result()
+            records.append(record)
+            print(f"[{i}/{len(tasks)}] {record['algorithm']:<15} {record['image']}  {record['status']} ({record['elapsed_s']:.2f}s)")
+
+    records.sort(key=lambda r: (r["algorithm"], r["image"]))
+    write_summary(records, Path(output_root) / "summary.csv")
+    return records
+
+def write_summary(records, summary_path):
+    summary_path.parent.mkdir(parents=True, exist_ok=True)
+    with open(summary_path, "w", newline="", encoding="utf-8") as f:
+        writer = csv.writer(f)
+        writer.writerow(["algorithm", "image", "status", "elapsed_s", "outputs"])
+        for r in records:
+            writer.writerow([r["algorithm"], r["image"], r["status"], f"{r['elapsed_s']:.4f}", ";".join(r["outputs"])])
+
+def default_options():
+    return {
+        "log_sigmas": [1.0, 2.0, 4.0],
+        "log_threshold": 2.0,
+        "canny_low": 50,
+        "canny_high": 150,
+        "std_thresh": [15.0],
+        "min_size": 4,
+        "rg_threshold": 15,
+        "seeds_dir": None,
+    }
+
+def main():
+    parser = argparse.ArgumentParser(description="HW1 批量实验运行器")
+    parser.add_argument("-a", "--algorithms", nargs="+", choices=ALGORITHMS, default=ALGORITHMS,
+                        help="要运行的算法 (默认全部)")
+    parser.add_argument("-d", "--dirs", nargs="+", default=None,
+                        help="图像目录或文件 (默认使用各算法对应的 HW1 测试目录)")
+    parser.add_argument("-o", "--output", default="batch_results", help="结果输出根目录")
+    parser.add_argument("-j", "--workers", type=int, default=os.cpu_count(), help="工作进程数")
+    parser.add_argument("--seeds-dir", default=None, help="区域生长种子文件目录 (<文件名>.seeds)")
+    parser.add_argument("--rg-threshold", type=int, default=15, help="区域生长灰度差阈值")
+    parser.add_argument("--std-thresh", type=float, nargs="+", default=[15.0],
+                        help="四叉树分裂标准差阈值 (可给多个，一次建树后分别剪枝)")
+    parser.add_argument("--min-size", type=int, default=4, help="四叉树最小区域尺寸")
+    args = parser.parse_args()
+
+    records = run_batch(
+        args.algorithms,
+        args.output,
+        dirs=args.dirs,
+        workers=args.workers,
+        options={
+            "seeds_dir": args.seeds_dir,
+            "rg_threshold": args.rg_threshold,
+            "std_thresh": args.std_thresh,
+            "min_size": args.min_size,
+        },
+    )
+
+    n_ok = sum(r["status"] == "ok" for r in records)
+    n_skip = sum(r["status"] == "skipped" for r in records)
+    print(f"\n完成: {n_ok} 成功, {n_skip} 跳过, {len(records) - n_ok - n_skip} 失败")
+
+if __name__ == "__main__":
+    main()
@@ -1,10 +1,13 @@
 import cv2
 import numpy as np
-import matplotlib.pyplot as plt
 import os
 
-plt.rcParams['font.sans-serif'] = ['SimHei']
-plt.rcParams['axes.unicode_minus'] = False
+def get_pyplot():
+    """首次绘图时才导入 matplotlib 并设置中文字体，只做计算的调用方不承担导入开销"""
+    import matplotlib.pyplot as plt
+    plt.rcParams['font.sans-serif'] = ['SimHei']
+    plt.rcParams['axes.unicode_minus'] = False
+    return plt
 
 def non_max_suppression(magnitude, angle_deg):
     # 非极大值抑制 (NMS)
@@ -50,6 +53,7 @@ def non_max_suppression(magnitude, angle_deg):
     return cv2.convertScaleAbs(nms_img)
 
 def analyze_canny_internals(img_name, img_path):
+    plt = get_pyplot()
     # canny 内部实现
     img = cv2.imread(img_path, cv2.IMREAD_GRAYSCALE)
 
@@ -109,13 +113,8 @@ def analyze_canny_internals(img_name, img_path):
     name_no_ext, _ = os.path.splitext(filename)
     plt.savefig(f"edge_detection_test_images/results/{name_no_ext}_canny_analysis.png")
 
-def analyze_canny_scales(img_name, img_path):
-    # 多尺度 Canny 检测
-    img = cv2.imread(img_path, cv2.IMREAD_GRAYSCALE)
-
-    # 设置阈值
-    T_low = 50
-    T_high = 150
+def canny_multiscale(img, T_low=50, T_high=150):
+    # 多尺度 Canny 检测，返回 (小, 中, 大) 三个尺度的边缘图
 
     # 小尺度 (Sigma 小 -> 模糊核小)
     blur_small = cv2.GaussianBlur(img, (3, 3), 0.5)
@@ -129,6 +128,19 @@ def analyze_canny_scales(img_name, img_path):
     blur_large = cv2.GaussianBlur(img, (13, 13), 3.0)
     canny_large = cv2.Canny(blur_large, T_low, T_high)
 
+    return canny_small, canny_med, canny_large
+
+def analyze_canny_scales(img_name, img_path):
+    plt = get_pyplot()
+    # 多尺度 Canny 检测
+    img = cv2.imread(img_path, cv2.IMREAD_GRAYSCALE)
+
+    # 设置阈值
+    T_low = 50
+    T_high = 150
+
+    canny_small, canny_med, canny_large = canny_multiscale(img, T_low, T_high)
+
     plt.figure(figsize=(16, 6))
     plt.suptitle(f"Canny 算法多尺度分析（{img_name}）", fontsize=18)
 
@@ -1,10 +1,13 @@
 import cv2
 import numpy as np
-import matplotlib.pyplot as plt
 import os
 
-plt.rcParams['font.sans-serif'] = ['SimHei']
-plt.rcParams['axes.unicode_minus'] = False
+def get_pyplot():
+    """首次绘图时才导入 matplotlib 并设置中文字体，只做计算的调用方不承担导入开销"""
+    import matplotlib.pyplot as plt
+    plt.rcParams['font.sans-serif'] = ['SimHei']
+    plt.rcParams['axes.unicode_minus'] = False
+    return plt
 
 def roberts_operator(img):
     # Roberts Gx
@@ -49,6 +52,7 @@ def sobel_operator(img):
     return cv2.convertScaleAbs(magnitude)
 
 def process_and_display(img_name, img_path):
+    plt = get_pyplot()
     img = cv2.imread(img_path, cv2.IMREAD_GRAYSCALE)
 
     res_roberts = roberts_operator(img)
@@ -1,11 +1,13 @@
 import cv2
 import numpy as np
-import matplotlib.pyplot as plt
 import os
 
-
-plt.rcParams['font.sans-serif'] = ['SimHei']
-plt.rcParams['axes.unicode_minus'] = False
+def get_pyplot():
+    """首次绘图时才导入 matplotlib 并设置中文字体，只做计算的调用方不承担导入开销"""
+    import matplotlib.pyplot as plt
+    plt.rcParams['font.sans-serif'] = ['SimHei']
+    plt.rcParams['axes.unicode_minus'] = False
+    return plt
 
 def laplacian_abs(img):
     # 标准 Laplacian
@@ -44,6 +46,7 @@ def log_zero_crossing(img, sigma, threshold=0.0):
     return zc_img
 
 def process_comprehensive(img_name, img_path):
+    plt = get_pyplot()
     img = cv2.imread(img_path, cv2.IMREAD_GRAYSCALE)
 
     sigma_small = 1.0
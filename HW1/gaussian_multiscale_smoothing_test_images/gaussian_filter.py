@@ -1,15 +1,15 @@
 import cv2
-import matplotlib.pyplot as plt
 import numpy as np
 import os
 
-plt.rcParams['font.sans-serif'] = ['SimHei']  
-plt.rcParams['axes.unicode_minus'] = False  
+def get_pyplot():
+    """首次绘图时才导入 matplotlib 并设置中文字体，只做计算的调用方不承担导入开销"""
+    import matplotlib.pyplot as plt
+    plt.rcParams['font.sans-serif'] = ['SimHei']
+    plt.rcParams['axes.unicode_minus'] = False
+    return plt
 
-img_path = "gaussian_multiscale_smoothing_test_images/gray_gaussian_noise_3.jpg"
-img = cv2.imread(img_path, cv2.IMREAD_GRAYSCALE)
-
-kernel_sizes = [
+KERNEL_SIZES = [
     (5, 5), 
     (7, 7), 
     (9, 9), 
@@ -17,24 +17,38 @@ kernel_sizes = [
     (13, 13)
 ]
 
-plt.figure(figsize=(15, 8))
-plt.suptitle("不同高斯核的平滑效果比较（高斯噪声图像）", fontsize=20)
+def multiscale_gaussian_blur(img, kernel_sizes=KERNEL_SIZES):
+    # 每个尺寸各用截断的高斯核直接平滑原图 (结果图像即以此生成)
+    return [cv2.GaussianBlur(img, ksize, sigmaX=0) for ksize in kernel_sizes]
 
-plt.subplot(2, 3, 1)
-plt.imshow(img, cmap='gray')
-plt.title("原始图像")
-plt.axis('off')
+def process_and_display(img_path, output_path, kernel_sizes=KERNEL_SIZES):
+    plt = get_pyplot()
+    img = cv2.imread(img_path, cv2.IMREAD_GRAYSCALE)
+    blurred_imgs = multiscale_gaussian_blur(img, kernel_sizes)
 
-for i, ksize in enumerate(kernel_sizes):
-    blurred_img = cv2.GaussianBlur(img, ksize, sigmaX=0)
+    plt.figure(figsize=(15, 8))
+    plt.suptitle("不同高斯核的平滑效果比较（高斯噪声图像）", fontsize=20)
 
-    plt.subplot(2, 3, i + 2)
-    plt.imshow(blurred_img, cmap='gray')
-    plt.title(f"高斯滤波 {ksize[0]}x{ksize[1]}")
+    plt.subplot(2, 3, 1)
+    plt.imshow(img, cmap='gray')
+    plt.title("原始图像")
     plt.axis('off')
 
-plt.tight_layout()
+    for i, (ksize, blurred_img) in enumerate(zip(kernel_sizes, blurred_imgs)):
+        plt.subplot(2, 3, i + 2)
+        plt.imshow(blurred_img, cmap='gray')
+        plt.title(f"高斯滤波 {ksize[0]}x{ksize[1]}")
+        plt.axis('off')
+
+    plt.tight_layout()
+
+    plt.savefig(output_path, dpi=300)
+    print(f"结果已显示并保存为 {output_path}")
+
+def main():
+    img_path = "gaussian_multiscale_smoothing_test_images/gray_gaussian_noise_3.jpg"
+    output_path = "gaussian_multiscale_smoothing_test_images/results/gaussian_noise_3_gaussian_blur.png"
+    process_and_display(img_path, output_path)
 
-output_path = "gaussian_multiscale_smoothing_test_images/results/gaussian_noise_3_gaussian_blur.png"
-plt.savefig(output_path, dpi=300)
-print(f"结果已显示并保存为 {output_path}")
\ No newline at end of file
+if __name__ == "__main__":
+    main()
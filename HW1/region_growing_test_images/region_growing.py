@@ -1,14 +1,59 @@
 import cv2
 import numpy as np
-import matplotlib.pyplot as plt
-from collections import deque
 import os
+import math
+from bisect import bisect_right
+from collections import OrderedDict
 
-plt.rcParams['font.sans-serif'] = ['SimHei']
-plt.rcParams['axes.unicode_minus'] = False
+def get_pyplot():
+    """首次绘图时才导入 matplotlib 并设置中文字体，只做计算的调用方不承担导入开销"""
+    import matplotlib.pyplot as plt
+    plt.rcParams['font.sans-serif'] = ['SimHei']
+    plt.rcParams['axes.unicode_minus'] = False
+    return plt
+
+# 连通域标记图缓存的默认上限: 条目数与总字节数 (int32 标记图每像素 4 字节)
+DEFAULT_CACHE_SIZE = 4
+DEFAULT_CACHE_BYTES = 256 * 1024 * 1024
+
+class ComponentIndex:
+    """
+    连通域索引: 相似性准则只取决于种子灰度值和阈值，
+    因此对每个种子灰度带 [v-T, v+T] 只需对满足条件的掩码做一次 8 邻域连通域标记。
+    标记图按灰度值惰性计算，并用 LRU 缓存保留最近使用的结果，
+    条目数不超过 cache_size、标记图与统计量的总字节数不超过 cache_bytes
+    (最近一次的结果总会保留，即使它本身超过 cache_bytes)。
+    """
+
+    def __init__(self, img, threshold, cache_size=DEFAULT_CACHE_SIZE, cache_bytes=DEFAULT_CACHE_BYTES):
+        self.img = img
+        self.threshold = threshold
+        self.cache_size = cache_size
+        self.cache_bytes = cache_bytes
+        self._cache = OrderedDict()  # 种子灰度值 -> (labels, stats)
+        self._nbytes = 0
+
+    def lookup(self, seed_val):
+        """返回种子灰度值对应的 (标记图, 各连通域统计 [x, y, w, h, area])"""
+        key = int(seed_val)
+        if key in self._cache:
+            self._cache.move_to_end(key)
+            return self._cache[key]
+
+        lower = max(0, math.ceil(key - self.threshold))
+        upper = min(255, math.floor(key + self.threshold))
+        mask = cv2.inRange(self.img, lower, upper)
+        _, labels, stats, _ = cv2.connectedComponentsWithStats(mask, connectivity=8, ltype=cv2.CV_32S)
+
+        self._cache[key] = (labels, stats)
+        self._nbytes += labels.nbytes + stats.nbytes
+        while len(self._cache) > 1 and (len(self._cache) > self.cache_size or self._nbytes > self.cache_bytes):
+            _, (old_labels, old_stats) = self._cache.popitem(last=False)
+            self._nbytes -= old_labels.nbytes + old_stats.nbytes
+        return labels, stats
 
 class RegionGrower:
-    def __init__(self, img_path, threshold=10):
+    def __init__(self, img_path, threshold=10, cache_size=DEFAULT_CACHE_SIZE, cache_bytes=DEFAULT_CACHE_BYTES):
         # 读取灰度图
         self.img_path = img_path
         self.img = cv2.imread(img_path, cv2.IMREAD_GRAYSCALE)
@@ -17,54 +62,85 @@ class RegionGrower:
         self.threshold = threshold
         self.seeds = []
         self.output = np.zeros_like(self.img) # 分割结果图
+        self.index = ComponentIndex(self.img, threshold, cache_size, cache_bytes)
 
-    def get_8_neighbors(self, x, y):
-        """获取 8 邻域坐标"""
-        neighbors = []
-        for dx in [-1, 0, 1]:
-            for dy in [-1, 0, 1]:
-                if dx == 0 and dy == 0: continue
-                nx, ny = x + dx, y + dy
-                if 0 <= nx < self.w and 0 <= ny < self.h:
-                    neighbors.append((nx, ny))
-        return neighbors
+    def _row_runs(self, mask):
+        """
+        将掩码按行做游程编码 (向量化)。
+        返回每个游程的 (行号, 起始列, 结束列(不含)) 以及每行游程的起始下标 row_ptr。
+        """
+        padded = np.zeros((self.h, self.w + 2), dtype=np.int8)
+        padded[:, 1:-1] = mask
+        d = np.diff(padded, axis=1)
+        run_rows, run_start = np.nonzero(d == 1)
+        _, run_end = np.nonzero(d == -1)
+        row_ptr = np.searchsorted(run_rows, np.arange(self.h + 1))
+        return run_rows, run_start, run_end, row_ptr
 
     def region_growing(self, seed):
-        """执行区域生长算法 (BFS)"""
-        seed_val = float(self.img[seed[1], seed[0]])
-        q = deque([seed])
-        
+        """执行区域生长算法 (8 邻域扫描线填充)"""
+        sx, sy = seed
+        if self.output[sy, sx] == 255:
+            return 0
+        seed_val = int(self.img[sy, sx])
+
+        # 相似性准则: 灰度差 <= 阈值 (整图向量化预计算)，已分割的像素不再参与生长
+        fillable = (np.abs(self.img.astype(np.int16) - seed_val) <= self.threshold) & (self.output != 255)
+
+        # 每个水平游程 (span) 是一次填充的单位，visited 在入栈时标记，保证每个游程只入栈一次
+        # 转为 Python 列表，循环内的标量访问和二分查找更快
+        run_rows, run_start, run_end, row_ptr = (a.tolist() for a in self._row_runs(fillable))
+        visited = bytearray(len(run_rows))
+
+        seed_run = bisect_right(run_start, sx, row_ptr[sy], row_ptr[sy + 1]) - 1
+
         count = 0
-        while q:
-            cx, cy = q.popleft()
-            
-            if self.output[cy, cx] == 255:
-                continue
-                
-            # 标记为前景 (白色)
-            self.output[cy, cx] = 255
-            count += 1
-
-            for nx, ny in self.get_8_neighbors(cx, cy):
-                if self.output[ny, nx] == 255:
+        stack = [seed_run]
+        visited[seed_run] = 1
+        while stack:
+            r = stack.pop()
+            y, x0, x1 = run_rows[r], run_start[r], run_end[r]
+            # 整段标记为前景 (白色)
+            self.output[y, x0:x1] = 255
+            count += x1 - x0
+
+            # 8 邻域: 上下两行中与 [x0-1, x1] 有重叠的游程
+            for ny in (y - 1, y + 1):
+                if ny < 0 or ny >= self.h:
                     continue
-                
-                # 相似性准则: 灰度差 <= 阈值
-                pixel_val = float(self.img[ny, nx])
-                if abs(pixel_val - seed_val) <= self.threshold:
-                    # 简单优化：如果尚未加入结果图，则入队
-                    # (注：严格BFS需visited数组，此处简化利用output做标记)
-                    q.append((nx, ny))
-        
+                lo, hi = row_ptr[ny], row_ptr[ny + 1]
+                first = bisect_right(run_end, x0 - 1, lo, hi)
+                last = bisect_right(run_start, x1, lo, hi)
+                for k in range(first, last):
+                    if not visited[k]:
+                        visited[k] = 1
+                        stack.append(k)
+
         return count
 
+    def grow_from_index(self, seed):
+        """
+        通过连通域索引完成区域生长: 查表得到种子所在连通域，
+        只在其外接矩形内把该连通域并入结果图。
+        与 region_growing 不同，已分割的区域不会阻断生长 (多种子结果为各连通域的并集)。
+        返回该连通域的像素数。
+        """
+        sx, sy = seed
+        labels, stats = self.index.lookup(self.img[sy, sx])
+        label = labels[sy, sx]
+        x, y, w, h, area = stats[label]
+
+        roi = self.output[y:y+h, x:x+w]
+        roi[labels[y:y+h, x:x+w] == label] = 255
+        return int(area)
+
     def on_mouse(self, event, x, y, flags, param):
         """鼠标点击回调"""
         if event == cv2.EVENT_LBUTTONDOWN:
             print(f"捕获种子点: ({x}, {y}), 灰度值: {self.img[y, x]}")
             self.seeds.append((x, y))
             
-            self.region_growing((x, y))
+            self.grow_from_index((x, y))
             
             result_win_name = "Segmented Result (Preview)"
             cv2.namedWindow(result_win_name, cv2.WINDOW_NORMAL)
@@ -73,6 +149,7 @@ class RegionGrower:
 
     def run_and_plot(self):
         """运行交互并在结束后绘制 1*2 对比图"""
+        plt = get_pyplot()
         window_name = "Interactive Selection (Press 'q' to Finish)"
         cv2.namedWindow(window_name, cv2.WINDOW_NORMAL)
         display_width = 800
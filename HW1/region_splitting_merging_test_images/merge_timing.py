@@ -0,0 +1,66 @@
+"""
+区域合并 (RegionMerger.merge) 的耗时检查。
+
+默认对 complex_image_3 (960x800) 做分裂 (min_size=2)，约 10 万个叶子；--scale 可放大图像增加叶子数。
+用法 (在 HW1 目录下):
+
+    python region_splitting_merging_test_images/merge_timing.py
+    python region_splitting_merging_test_images/merge_timing.py --scale 2.5 --budget 30
+
+注意: 合并代价随"大区域不断吞并小邻居"的次数增长。一个大区域每合并一次，它的全部候选都会过期，
+出堆时要重算后重新入堆；若图像大部分是一整块、并且它要逐个吞并成千上万个小噪声块，
+合并耗时会接近叶子数的平方。
+"""
+
+import argparse
+import os
+import sys
+import time
+
+import cv2
+
+try:
+    from .quadtree_split import QuadTreeSplitter, RegionMerger
+except ImportError:
+    from quadtree_split import QuadTreeSplitter, RegionMerger
+
+DEFAULT_IMAGE = os.path.join(os.path.dirname(os.path.abspath(__file__)), "complex_image_3.jpg")
+
+# 默认图像与尺寸下合并阶段的时间预算 (秒)
+DEFAULT_BUDGET_S = 10.0
+
+def time_merge(img, std_thresh=15.0, min_size=2):
+    # 返回 (叶子数, 合并后的区域数, 合并耗时秒数)；分裂和建邻接图不计入
+    splitter = QuadTreeSplitter(img, std_thresh=std_thresh, min_size=min_size)
+    splitter.split(0, 0, splitter.w, splitter.h)
+    merger = RegionMerger(splitter, merge_thresh=std_thresh)
+
+    start = time.perf_counter()
+    merger.merge()
+    elapsed = time.perf_counter() - start
+
+    n_regions = sum(merger.parent[i] == i for i in range(len(merger.parent)))
+    return len(merger.parent), n_regions, elapsed
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="区域合并耗时检查")
+    parser.add_argument("--image", default=DEFAULT_IMAGE, help="测试图像")
+    parser.add_argument("--scale", type=float, default=1.0, help="图像放大倍数")
+    parser.add_argument("--budget", type=float, default=DEFAULT_BUDGET_S, help="时间预算 (秒)")
+    args = parser.parse_args(argv)
+
+    img = cv2.imread(args.image, cv2.IMREAD_GRAYSCALE)
+    if img is None:
+        print(f"无法读取图像: {args.image}")
+        return 2
+    if args.scale != 1:
+        img = cv2.resize(img, None, fx=args.scale, fy=args.scale, interpolation=cv2.INTER_CUBIC)
+
+    n_leaves, n_regions, elapsed = time_merge(img)
+    ok = elapsed <= args.budget
+    print(f"{img.shape[1]}x{img.shape[0]}: {n_leaves} 个叶子 -> {n_regions} 个区域, "
+          f"合并耗时 {elapsed:.2f} s (预算 {args.budget:g} s)  {'通过' if ok else '超出'}")
+    return 0 if ok else 1
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -1,10 +1,145 @@
 import cv2
 import numpy as np
-import matplotlib.pyplot as plt
 import os
+import heapq
+import math
 
-plt.rcParams['font.sans-serif'] = ['SimHei']
-plt.rcParams['axes.unicode_minus'] = False
+def get_pyplot():
+    """首次绘图时才导入 matplotlib 并设置中文字体，只做计算的调用方不承担导入开销"""
+    import matplotlib.pyplot as plt
+    plt.rcParams['font.sans-serif'] = ['SimHei']
+    plt.rcParams['axes.unicode_minus'] = False
+    return plt
+
+class QuadTree:
+    """
+    紧凑的数组式四叉树。
+
+    所有节点按广度优先顺序存放在一组并行数组中 (根节点下标为 0):
+        x, y, w, h : 节点矩形
+        mean, std  : 节点区域的灰度均值和标准差
+        level      : 节点深度
+        child      : 第一个子节点的下标 (四个子节点连续存放: 左上, 右上, 左下, 右下)，叶子为 -1
+    树本身不保存任何图像，分割结果和网格图都按需渲染；统计量已存好，
+    换一个更大的 std_thresh / min_size 只需对树做一次剪枝，不必重新计算。
+    """
+
+    FIELDS = ('x', 'y', 'w', 'h', 'mean', 'std', 'level', 'child')
+
+    def __init__(self, shape, x, y, w, h, mean, std, level, child):
+        self.shape = tuple(shape)  # 原图尺寸 (H, W)
+        self.x = x.astype(np.int32)
+        self.y = y.astype(np.int32)
+        self.w = w.astype(np.int32)
+        self.h = h.astype(np.int32)
+        self.mean = mean.astype(np.float64)
+        self.std = std.astype(np.float64)
+        self.level = level.astype(np.uint8)
+        self.child = child.astype(np.int32)
+
+    def __len__(self):
+        return len(self.x)
+
+    def is_split(self, std_thresh=None, min_size=None):
+        # 每个节点在给定参数下是否继续分裂 (只有建树时已分裂的节点才有子节点)
+        split = self.child >= 0
+        if std_thresh is not None:
+            split &= self.std > std_thresh
+        if min_size is not None:
+            split &= (self.w > min_size) & (self.h > min_size)
+        return split
+
+    def cut(self, std_thresh=None, min_size=None):
+        """
+        从根节点向下剪枝，返回 (叶子下标, 内部节点下标)。
+        参数为 None 时使用建树时的结果。
+        """
+        split = self.is_split(std_thresh, min_size)
+        frontier = np.zeros(1, dtype=np.int64)
+        leaves, internal = [], []
+        while frontier.size:
+            s = split[frontier]
+            leaves.append(frontier[~s])
+            internal.append(frontier[s])
+            frontier = (self.child[frontier[s]][:, None] + np.arange(4)).ravel()
+        return np.concatenate(leaves), np.concatenate(internal)
+
+    def leaves(self, std_thresh=None, min_size=None):
+        return self.cut(std_thresh, min_size)[0]
+
+    def query(self, px, py, std_thresh=None, min_size=None):
+        # 返回包含点 (px, py) 的叶子节点下标
+        i = 0
+        while self.child[i] >= 0:
+            if std_thresh is not None and self.std[i] <= std_thresh:
+                break
+            if min_size is not None and (self.w[i] <= min_size or self.h[i] <= min_size):
+                break
+            right = px >= self.x[i] + self.w[i] // 2
+            bottom = py >= self.y[i] + self.h[i] // 2
+            i = self.child[i] + int(right) + 2 * int(bottom)
+        return i
+
+    def fill_rects(self, idx, values, dtype):
+        # 用给定值填充一组互不重叠的节点矩形
+        # 二维差分数组 + 两次前缀和一次完成，第一次前缀和后的值是相邻像素的差，
+        # 所以 dtype 只需容纳 ±max(values)
+        H, W = self.shape
+        xs, ys, ws, hs = self.x[idx], self.y[idx], self.w[idx], self.h[idx]
+        values = values.astype(dtype)
+        diff = np.zeros((H + 1, W + 1), dtype=dtype)
+        np.add.at(diff, (ys, xs), values)
+        np.add.at(diff, (ys, xs + ws), -values)
+        np.add.at(diff, (ys + hs, xs), -values)
+        np.add.at(diff, (ys + hs, xs + ws), values)
+        return diff.cumsum(axis=0, dtype=dtype).cumsum(axis=1, dtype=dtype)[:H, :W]
+
+    def render_segmentation(self, std_thresh=None, min_size=None):
+        # 用叶子区域均值填充结果图
+        leaves = self.leaves(std_thresh, min_size)
+        return self.fill_rects(leaves, self.mean[leaves], np.int16).astype(np.uint8)
+
+    def render_grid(self, img, std_thresh=None, min_size=None):
+        # 在原图上绘制分割线 (与 cv2.line 相同, 端点包含在内并裁剪到图像范围内)
+        H, W = self.shape
+        _, internal = self.cut(std_thresh, min_size)
+        xs, ys, ws, hs = self.x[internal], self.y[internal], self.w[internal], self.h[internal]
+
+        # 水平线 (x, y + h/2) -> (x + w, y + h/2)
+        diff = np.zeros((H, W + 1), dtype=np.int16)
+        np.add.at(diff, (ys + hs // 2, xs), 1)
+        np.add.at(diff, (ys + hs // 2, np.minimum(xs + ws + 1, W)), -1)
+        mask = diff.cumsum(axis=1, dtype=np.int16)[:, :W] > 0
+
+        # 垂直线 (x + w/2, y) -> (x + w/2, y + h)
+        diff = np.zeros((H + 1, W), dtype=np.int16)
+        np.add.at(diff, (ys, xs + ws // 2), 1)
+        np.add.at(diff, (np.minimum(ys + hs + 1, H), xs + ws // 2), -1)
+        mask |= diff.cumsum(axis=0, dtype=np.int16)[:H, :] > 0
+
+        grid = cv2.cvtColor(img, cv2.COLOR_GRAY2BGR)
+        grid[mask] = (0, 0, 255)
+        return grid
+
+    def sweep(self, std_thresholds, min_size=None):
+        """
+        对一组 std_thresh 逐个剪枝，返回 {阈值: (叶子数, 分割结果图)}。
+        树需要由 build_full() 建成，才能得到比建树阈值更小的阈值的结果。
+        """
+        results = {}
+        for t in std_thresholds:
+            leaves = self.leaves(t, min_size)
+            seg = self.fill_rects(leaves, self.mean[leaves], np.int16).astype(np.uint8)
+            results[t] = (len(leaves), seg)
+        return results
+
+    def save(self, path):
+        np.savez_compressed(path, shape=np.array(self.shape), **{f: getattr(self, f) for f in self.FIELDS})
+
+    @classmethod
+    def load(cls, path):
+        with np.load(path) as data:
+            return cls(data['shape'], *(data[f] for f in cls.FIELDS))
 
 class QuadTreeSplitter:
     def __init__(self, img, std_thresh=10.0, min_size=4):
@@ -12,56 +147,230 @@ class QuadTreeSplitter:
         self.h, self.w = img.shape
         self.std_thresh = std_thresh  # 均匀性阈值
         self.min_size = min_size      # 最小区域尺寸
-        
-        # 用于可视化的结果图
-        self.result_image = np.zeros_like(img)
-        # 用于绘制分割线的画布
-        self.draw_lines = cv2.cvtColor(img, cv2.COLOR_GRAY2BGR)
-
-    def split(self, x, y, w, h):
-        # 递归分裂函数
-        # 获取当前区域 (ROI)
-        roi = self.img[y:y+h, x:x+w]
-        
-        # 计算均值和标准差
-        mean, std = cv2.meanStdDev(roi)
-        mean = mean[0][0]
-        std = std[0][0]
-
-        # 判定准则: 
-        # 1. 区域足够均匀 (std < T_split) 
-        # 2. 区域已经太小 (size <= MinSize)
-        if std <= self.std_thresh or w <= self.min_size or h <= self.min_size:
-            # -> 停止分裂，作为叶子节点
-            # 用区域均值填充结果图
-            self.result_image[y:y+h, x:x+w] = int(mean)
-        else:
-            # -> 继续分裂 (递归)
-            # 计算分裂点 (中心)
-            half_w = int(w / 2)
-            half_h = int(h / 2)
-            
-            # 绘制分割线 (为了可视化递归过程)
-            cv2.line(self.draw_lines, (x, y + half_h), (x + w, y + half_h), (0, 0, 255), 1)
-            cv2.line(self.draw_lines, (x + half_w, y), (x + half_w, y + h), (0, 0, 255), 1)
-
-            # 递归调用四个子象限
-            # 左上
-            self.split(x, y, half_w, half_h)
-            # 右上
-            self.split(x + half_w, y, w - half_w, half_h)
-            # 左下
-            self.split(x, y + half_h, half_w, h - half_h)
-            # 右下
-            self.split(x + half_w, y + half_h, w - half_w, h - half_h)
+
+        # 积分图 (I 和 I^2)，任意矩形区域的和都可以 O(1) 得到
+        self.sum_table, self.sqsum_table = cv2.integral2(img, sdepth=cv2.CV_64F, sqdepth=cv2.CV_64F)
+        self.tree = None
+
+    def region_sums(self, x, y, w, h):
+        # 由积分图批量计算多个矩形区域的灰度和与平方和 (参数均为数组)
+        def rect_sum(table):
+            return table[y + h, x + w] - table[y, x + w] - table[y + h, x] + table[y, x]
+        return rect_sum(self.sum_table), rect_sum(self.sqsum_table)
+
+    def region_stats(self, x, y, w, h):
+        # 批量计算多个矩形区域的均值和标准差
+        sums, sqsums = self.region_sums(x, y, w, h)
+
+        # 与 cv2.meanStdDev 相同: 先求 1/n 再相乘 (保证取整后的均值完全一致)
+        scale = 1.0 / (w * h)
+        mean = sums * scale
+        var = sqsums * scale - mean * mean
+        std = np.sqrt(np.maximum(var, 0))
+        return mean, std
+
+    def split(self, x, y, w, h, full=False):
+        # 逐层 (广度优先) 分裂: 每一层的所有节点用数组运算一次性判定，结果保存为 QuadTree
+        # full=True 时忽略均匀性准则，一直分裂到 min_size，之后可用 tree.cut(std_thresh=t) 得到任意阈值的结果
+        xs = np.array([x], dtype=np.int64)
+        ys = np.array([y], dtype=np.int64)
+        ws = np.array([w], dtype=np.int64)
+        hs = np.array([h], dtype=np.int64)
+
+        levels = []
+        depth = 0
+        n_nodes = 0
+        while xs.size:
+            mean, std = self.region_stats(xs, ys, ws, hs)
+
+            # 判定准则: 
+            # 1. 区域足够均匀 (std < T_split) 
+            # 2. 区域已经太小 (size <= MinSize)
+            is_leaf = (ws <= self.min_size) | (hs <= self.min_size)
+            if not full:
+                is_leaf |= std <= self.std_thresh
+
+            # 下一层从 n_nodes + len(xs) 开始，每个被分裂的节点占 4 个连续位置
+            n_nodes += len(xs)
+            child = np.full(len(xs), -1, dtype=np.int64)
+            child[~is_leaf] = n_nodes + 4 * np.arange(np.count_nonzero(~is_leaf))
+            levels.append((xs, ys, ws, hs, mean, std, np.full(len(xs), depth), child))
+
+            # -> 继续分裂
+            xs, ys, ws, hs = xs[~is_leaf], ys[~is_leaf], ws[~is_leaf], hs[~is_leaf]
+            half_w = ws // 2
+            half_h = hs // 2
+
+            # 四个子象限: 左上, 右上, 左下, 右下
+            xs, ys, ws, hs = (
+                np.stack([xs, xs + half_w, xs, xs + half_w], axis=1).ravel(),
+                np.stack([ys, ys, ys + half_h, ys + half_h], axis=1).ravel(),
+                np.stack([half_w, ws - half_w, half_w, ws - half_w], axis=1).ravel(),
+                np.stack([half_h, half_h, hs - half_h, hs - half_h], axis=1).ravel(),
+            )
+            depth += 1
+
+        self.tree = QuadTree((self.h, self.w), *(np.concatenate(a) for a in zip(*levels)))
+        return self.tree
+
+    def build_full(self):
+        # 一次性建到 min_size 的完整四叉树 (含每个节点的统计量)，用于阈值扫描
+        return self.split(0, 0, self.w, self.h, full=True)
 
     def run(self):
-        print("正在执行四叉树递归分裂...")
+        print("正在执行四叉树逐层分裂...")
         # 从整张图开始分裂
         self.split(0, 0, self.w, self.h)
+        # 用于可视化的结果图和分割线
+        self.result_image = self.tree.render_segmentation()
+        self.draw_lines = self.tree.render_grid(self.img)
         return self.result_image, self.draw_lines
 
+class RegionMerger:
+    """
+    区域合并: 在四叉树叶子的区域邻接图上，按合并后标准差从小到大 (小根堆，代价惰性更新) 依次合并
+    相邻区域，直到任何相邻区域合并后都不再满足均匀性准则 (std <= merge_thresh)。
+
+    区域用并查集维护，每个根节点保存可直接相加的矩 (像素数, 灰度和, 平方和)，
+    合并两个区域的统计量只需 O(1)。
+    """
+
+    def __init__(self, splitter, merge_thresh=None):
+        self.splitter = splitter
+        self.merge_thresh = splitter.std_thresh if merge_thresh is None else merge_thresh
+
+        tree = splitter.tree
+        leaves = tree.leaves()
+        xs, ys, ws, hs = tree.x[leaves], tree.y[leaves], tree.w[leaves], tree.h[leaves]
+        sums, sqsums = splitter.region_sums(xs, ys, ws, hs)
+        self.count = (ws * hs).astype(np.float64).tolist()
+        self.sum = sums.tolist()
+        self.sqsum = sqsums.tolist()
+
+        n = len(xs)
+        self.parent = list(range(n))
+        self.version = [0] * n
+        # 叶子编号图 (每个像素属于哪个叶子)
+        self.leaf_labels = tree.fill_rects(leaves, np.arange(n), np.int32)
+        self.pairs = self.adjacent_pairs()
+        self.adjacency = [set() for _ in range(n)]
+        for a, b in zip(*(p.tolist() for p in self.pairs)):
+            self.adjacency[a].add(b)
+            self.adjacency[b].add(a)
+
+    def adjacent_pairs(self):
+        # 比较水平/垂直相邻像素的叶子编号，一次遍历得到所有相邻叶子对 (无需两两比较叶子)
+        labels = self.leaf_labels
+        n = len(self.parent)
+        pairs = []
+        for a, b in ((labels[:, :-1], labels[:, 1:]), (labels[:-1, :], labels[1:, :])):
+            diff = a != b
+            lo = np.minimum(a[diff], b[diff]).astype(np.int64)
+            hi = np.maximum(a[diff], b[diff]).astype(np.int64)
+            pairs.append(lo * n + hi)
+        keys = np.unique(np.concatenate(pairs))
+        return keys // n, keys % n
+
+    def find(self, a):
+        # 路径压缩
+        root = a
+        while self.parent[root] != root:
+            root = self.parent[root]
+        while self.parent[a] != root:
+            self.parent[a], a = root, self.parent[a]
+        return root
+
+    def merged_std(self, a, b):
+        # 两个区域合并后的标准差 (由矩直接计算)
+        n = self.count[a] + self.count[b]
+        mean = (self.sum[a] + self.sum[b]) / n
+        var = (self.sqsum[a] + self.sqsum[b]) / n - mean * mean
+        return math.sqrt(var) if var > 0 else 0.0
+
+    def union(self, a, b):
+        # 邻接表较小的一方并入较大的一方，返回 (新的根, 被并入一方的邻居)
+        if len(self.adjacency[a]) < len(self.adjacency[b]):
+            a, b = b, a
+        self.parent[b] = a
+        self.count[a] += self.count[b]
+        self.sum[a] += self.sum[b]
+        self.sqsum[a] += self.sqsum[b]
+        self.version[a] += 1
+
+        for nb in self.adjacency[b]:
+            self.adjacency[nb].discard(b)
+            if nb != a:
+                self.adjacency[nb].add(a)
+                self.adjacency[a].add(nb)
+        self.adjacency[a].discard(b)
+        moved = self.adjacency[b]
+        moved.discard(a)
+        self.adjacency[b] = set()
+        return a, moved
+
+    def candidate_heap(self, a, b):
+        # 小根堆: (合并后标准差, 区域 a, 区域 b, a 的版本, b 的版本)
+        # 一批相邻区域对的代价用数组运算一次算出，只有满足均匀性准则的候选才入堆
+        count, sums, sqsums = (np.array(v) for v in (self.count, self.sum, self.sqsum))
+        n = count[a] + count[b]
+        mean = (sums[a] + sums[b]) / n
+        costs = np.sqrt(np.maximum((sqsums[a] + sqsums[b]) / n - mean * mean, 0))
+        keep = costs <= self.merge_thresh
+        a, b = a[keep], b[keep]
+        version = np.array(self.version)
+        heap = list(zip(costs[keep].tolist(), a.tolist(), b.tolist(), version[a].tolist(), version[b].tolist()))
+        heapq.heapify(heap)
+        return heap
+
+    def remaining_pairs(self):
+        # 当前所有相邻的区域对 (根节点编号, a < b)
+        pairs = [(a, nb) for a, neighbours in enumerate(self.adjacency) for nb in neighbours if a < nb]
+        pairs = np.array(pairs, dtype=np.int64).reshape(-1, 2)
+        return pairs[:, 0], pairs[:, 1]
+
+    def merge(self):
+        # 惰性删除: 合并后只为被并入一方的邻居 (与新根构成的新相邻对) 入堆，新根原有邻居的候选
+        # 留在堆中不动，大区域不断长大时不必每次重算并重新入堆它的全部邻居。
+        # 出堆时版本过期的候选按当前统计量重算代价，仍满足准则就带新版本重新入堆，
+        # 所以真正合并的候选，其代价都是按当前统计量算出的，合并按代价从小到大进行。
+        # 过期候选重算后不满足准则即丢弃，之后它可能因对方变化重新满足准则，
+        # 所以堆空后对剩余的相邻区域再整体检查一遍，直到任何相邻区域都不能再合并
+        heap = self.candidate_heap(*self.pairs)
+        while heap:
+            while heap:
+                cost, a, b, ver_a, ver_b = heapq.heappop(heap)
+                # 区域已被并入别的区域: 相邻关系已由新根的候选代替
+                if self.parent[a] != a or self.parent[b] != b:
+                    continue
+                # 统计量已改变: 按当前统计量重算代价后重新入堆
+                if self.version[a] != ver_a or self.version[b] != ver_b:
+                    cost = self.merged_std(a, b)
+                    if cost <= self.merge_thresh:
+                        heapq.heappush(heap, (cost, a, b, self.version[a], self.version[b]))
+                    continue
+
+                root, moved = self.union(a, b)
+                for nb in moved:
+                    cost = self.merged_std(root, nb)
+                    if cost <= self.merge_thresh:
+                        heapq.heappush(heap, (cost, root, nb, self.version[root], self.version[nb]))
+            heap = self.candidate_heap(*self.remaining_pairs())
+
+    def run(self):
+        print("正在执行区域合并...")
+        self.merge()
+
+        # 每个叶子所属的最终区域，重新编号为 0..K-1
+        roots = np.array([self.find(i) for i in range(len(self.parent))])
+        unique_roots, leaf_region = np.unique(roots, return_inverse=True)
+        region_means = np.array(self.sum)[unique_roots] / np.array(self.count)[unique_roots]
+
+        region_labels = leaf_region[self.leaf_labels]
+        merged_image = region_means[region_labels].astype(np.uint8)
+        return merged_image, region_labels
+
 def main():
+    plt = get_pyplot()
     # 建议路径
     path = "region_splitting_merging_test_images/complex_image_2.bmp"
     img = cv2.imread(path, cv2.IMREAD_GRAYSCALE)
@@ -72,24 +381,33 @@ def main():
     
     res_segment, res_grid = splitter.run()
 
-    plt.figure(figsize=(15, 5))
+    # 合并相邻且合并后仍均匀的叶子
+    merger = RegionMerger(splitter, merge_thresh=15.0)
+    res_merged, _ = merger.run()
+
+    plt.figure(figsize=(20, 5))
     plt.suptitle("区域分裂与合并算法实现（复杂图像）", fontsize=16)
 
-    plt.subplot(1, 3, 1)
+    plt.subplot(1, 4, 1)
     plt.imshow(img, cmap='gray')
     plt.title("原图")
     plt.axis('off')
 
-    plt.subplot(1, 3, 2)
+    plt.subplot(1, 4, 2)
     plt.imshow(cv2.cvtColor(res_grid, cv2.COLOR_BGR2RGB))
     plt.title("分裂过程")
     plt.axis('off')
 
-    plt.subplot(1, 3, 3)
+    plt.subplot(1, 4, 3)
     plt.imshow(res_segment, cmap='gray')
     plt.title("分割结果")
     plt.axis('off')
 
+    plt.subplot(1, 4, 4)
+    plt.imshow(res_merged, cmap='gray')
+    plt.title("合并结果")
+    plt.axis('off')
+
     plt.tight_layout()
     filename = os.path.basename(path)
     name_no_ext, _ = os.path.splitext(filename)
@@ -0,0 +1,21 @@
+"""
+HW1 测试的公共设置: 各题的脚本都在自己的目录下，把这些目录加入 sys.path 以便直接导入。
+"""
+
+import sys
+from pathlib import Path
+
+import cv2
+import pytest
+
+HW1_DIR = Path(__file__).resolve().parents[1]
+for name in ('gaussian_multiscale_smoothing_test_images', 'region_growing_test_images',
+             'region_splitting_merging_test_images'):
+    sys.path.insert(0, str(HW1_DIR / name))
+
+def read_gray(path):
+    return cv2.imread(str(path), cv2.IMREAD_GRAYSCALE)
+
+@pytest.fixture(scope='session')
+def hw1_dir():
+    return HW1_DIR
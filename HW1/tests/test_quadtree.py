@@ -0,0 +1,78 @@
+"""
+四叉树剪枝与直接分裂结果一致，区域合并的结果满足均匀性准则。
+"""
+
+import numpy as np
+import pytest
+
+from quadtree_split import QuadTree, QuadTreeSplitter, RegionMerger
+
+from conftest import read_gray
+
+IMAGE_DIR = 'region_splitting_merging_test_images'
+IMAGES = ['simple_image_2.bmp', 'complex_image_2.bmp']
+
+@pytest.fixture(scope='module', params=IMAGES)
+def img(request, hw1_dir):
+    return read_gray(hw1_dir / IMAGE_DIR / request.param)
+
+def test_region_stats_match_pixels(img):
+    splitter = QuadTreeSplitter(img)
+    xs, ys, ws, hs = (np.array(v) for v in ([0, 5, 17], [0, 9, 3], [img.shape[1], 8, 31], [img.shape[0], 16, 7]))
+    mean, std = splitter.region_stats(xs, ys, ws, hs)
+    for i in range(len(xs)):
+        roi = img[ys[i]:ys[i] + hs[i], xs[i]:xs[i] + ws[i]].astype(np.float64)
+        assert mean[i] == pytest.approx(roi.mean())
+        assert std[i] == pytest.approx(roi.std(), abs=1e-6)
+
+@pytest.mark.parametrize('std_thresh', [5.0, 10.0, 20.0])
+def test_full_tree_cut_matches_direct_split(img, std_thresh):
+    full = QuadTreeSplitter(img, std_thresh=std_thresh, min_size=4).build_full()
+    direct = QuadTreeSplitter(img, std_thresh=std_thresh, min_size=4)
+    direct.split(0, 0, direct.w, direct.h)
+    assert len(full.leaves(std_thresh)) == len(direct.tree.leaves())
+    np.testing.assert_array_equal(full.render_segmentation(std_thresh), direct.tree.render_segmentation())
+    count, seg = full.sweep([std_thresh])[std_thresh]
+    assert count == len(direct.tree.leaves())
+    np.testing.assert_array_equal(seg, direct.tree.render_segmentation())
+
+def test_leaves_tile_image(img):
+    tree = QuadTreeSplitter(img, std_thresh=10.0).build_full()
+    leaves = tree.leaves(10.0)
+    coverage = tree.fill_rects(leaves, np.ones(len(leaves), dtype=np.int32), np.int32)
+    assert (coverage == 1).all()
+    for px, py in [(0, 0), (img.shape[1] - 1, img.shape[0] - 1), (img.shape[1] // 3, img.shape[0] // 2)]:
+        leaf = tree.query(px, py, std_thresh=10.0)
+        assert leaf in set(leaves.tolist())
+        assert tree.x[leaf] <= px < tree.x[leaf] + tree.w[leaf]
+        assert tree.y[leaf] <= py < tree.y[leaf] + tree.h[leaf]
+
+def test_tree_save_load(img, tmp_path):
+    tree = QuadTreeSplitter(img).build_full()
+    tree.save(tmp_path / 'tree.npz')
+    loaded = QuadTree.load(tmp_path / 'tree.npz')
+    assert loaded.shape == tree.shape
+    for field in QuadTree.FIELDS:
+        np.testing.assert_array_equal(getattr(loaded, field), getattr(tree, field))
+
+def test_merged_regions_are_homogeneous_and_maximal(img):
+    splitter = QuadTreeSplitter(img, std_thresh=15, min_size=2)
+    splitter.split(0, 0, splitter.w, splitter.h)
+    merger = RegionMerger(splitter)
+    merged_image, labels = merger.run()
+    assert merged_image.shape == labels.shape == img.shape
+
+    # 由多个叶子合并成的区域都满足均匀性准则 (达到 min_size 的叶子本身可能不满足)
+    pixels = img.astype(np.float64).ravel()
+    flat = labels.ravel()
+    count = np.bincount(flat)
+    mean = np.bincount(flat, pixels) / count
+    std = np.sqrt(np.maximum(np.bincount(flat, pixels ** 2) / count - mean ** 2, 0))
+    roots = [merger.find(i) for i in range(len(merger.parent))]
+    _, n_leaves = np.unique(roots, return_counts=True)
+    assert std[n_leaves > 1].max() <= merger.merge_thresh + 1e-6
+
+    # 任何仍相邻的两个区域合并后都不再满足准则
+    for a, b in zip(*merger.remaining_pairs()):
+        assert roots[a] == a and roots[b] == b
+        assert merger.merged_std(a, b) > merger.merge_thresh
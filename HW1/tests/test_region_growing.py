@@ -0,0 +1,40 @@
+"""
+连通域索引的区域生长与扫描线填充的结果一致，LRU 缓存不超过条目数和字节数上限。
+"""
+
+import numpy as np
+import pytest
+
+from region_growing import ComponentIndex, RegionGrower
+
+IMAGE_DIR = 'region_growing_test_images'
+
+@pytest.fixture(params=['simple_image_2.bmp', 'complex_image_2.jpg'])
+def image_path(request, hw1_dir):
+    return str(hw1_dir / IMAGE_DIR / request.param)
+
+@pytest.mark.parametrize('threshold', [5, 10, 20])
+def test_index_matches_scanline_fill(image_path, threshold):
+    h, w = RegionGrower(image_path, threshold=threshold).img.shape
+    rng = np.random.default_rng(threshold)
+    for sx, sy in zip(rng.integers(0, w, 5).tolist(), rng.integers(0, h, 5).tolist()):
+        scan = RegionGrower(image_path, threshold=threshold)
+        indexed = RegionGrower(image_path, threshold=threshold)
+        assert scan.region_growing((sx, sy)) == indexed.grow_from_index((sx, sy))
+        np.testing.assert_array_equal(scan.output, indexed.output)
+
+def test_cache_limits(image_path):
+    grower = RegionGrower(image_path, threshold=10, cache_size=3)
+    index = grower.index
+    for v in range(0, 256, 17):
+        index.lookup(v)
+        assert len(index._cache) <= 3
+    assert list(index._cache) == [221, 238, 255]
+    assert index._nbytes == sum(l.nbytes + s.nbytes for l, s in index._cache.values())
+
+    # 字节上限小于单个标记图时仍保留最近一次的结果
+    small = ComponentIndex(grower.img, 10, cache_size=8, cache_bytes=1)
+    for v in (10, 100, 200):
+        labels, _ = small.lookup(v)
+        assert list(small._cache) == [v]
+    assert small.lookup(200)[0] is labels
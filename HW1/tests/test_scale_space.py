@@ -0,0 +1,57 @@
+"""
+增量尺度空间与直接高斯平滑的一致性，以及金字塔近似的误差上界 (见 GaussianPyramid 的说明)。
+"""
+
+import cv2
+import numpy as np
+import pytest
+
+from scale_space import GaussianPyramid, gaussian_stack, incremental_sigma, scale_space
+
+from conftest import read_gray
+
+IMAGE_DIR = 'gaussian_multiscale_smoothing_test_images'
+
+@pytest.fixture(scope='module')
+def img(hw1_dir):
+    return read_gray(hw1_dir / IMAGE_DIR / 'gray_gaussian_multiscale_smoothing_1.jpg')
+
+def direct_blur(img, sigma):
+    return cv2.GaussianBlur(img.astype(np.float32), (0, 0), sigma, borderType=cv2.BORDER_REFLECT_101)
+
+def interior(a, margin):
+    return a[margin:-margin, margin:-margin]
+
+def test_incremental_sigma():
+    assert incremental_sigma(3.0, 5.0) == pytest.approx(4.0)
+    assert incremental_sigma(2.0, 2.0) == 0.0
+    with pytest.raises(ValueError):
+        incremental_sigma(2.0, 1.0)
+
+def test_gaussian_stack_matches_direct_blur(img):
+    sigmas = [1.0, 2.0, 3.5, 6.0]
+    stack = gaussian_stack(img, sigmas)
+    assert stack.dtype == np.float32 and stack.shape == (len(sigmas),) + img.shape
+    for level, sigma in zip(stack, sigmas):
+        margin = int(np.ceil(3 * sigma))
+        np.testing.assert_allclose(interior(level, margin), interior(direct_blur(img, sigma), margin), atol=0.5)
+
+def test_gaussian_stack_reuses_buffer(img):
+    out = np.empty((2,) + img.shape, dtype=np.float32)
+    assert gaussian_stack(img, [1.0, 2.0], out=out) is out
+    with pytest.raises(ValueError):
+        gaussian_stack(img, [1.0, 2.0, 3.0], out=out)
+
+def test_level_at_rejects_small_sigma(img):
+    pyramid = GaussianPyramid(img)
+    with pytest.raises(ValueError):
+        pyramid.level_at(pyramid.sigma0 / 2)
+
+@pytest.mark.parametrize('sigma', [10.0, 16.0, 24.0])
+def test_pyramid_interior_error(img, sigma):
+    approx = scale_space(img, [sigma])[0]
+    assert approx.shape == img.shape
+    margin = int(np.ceil(3 * sigma))
+    err = np.abs(interior(approx, margin) - interior(direct_blur(img, sigma), margin))
+    assert err.mean() <= 0.35
+    assert err.max() <= 2.5
@@ -1,34 +1,48 @@
 import cv2
-import matplotlib.pyplot as plt
 import os
 import numpy as np
 
-plt.rcParams['font.sans-serif'] = ['SimHei']
-plt.rcParams['axes.unicode_minus'] = False
+def get_pyplot():
+    """首次绘图时才导入 matplotlib 并设置中文字体，只做计算的调用方不承担导入开销"""
+    import matplotlib.pyplot as plt
+    plt.rcParams['font.sans-serif'] = ['SimHei']
+    plt.rcParams['axes.unicode_minus'] = False
+    return plt
 
-img_path = "threshold_segmentation_test_images/simple_image_1.bmp"
+def otsu_threshold(img):
+    # Otsu 自动阈值分割，返回 (最佳阈值, 二值图)
+    return cv2.threshold(img, 0, 255, cv2.THRESH_BINARY + cv2.THRESH_OTSU)
 
-img = cv2.imread(img_path, cv2.IMREAD_GRAYSCALE)
+def process_and_display(img_path, output_path):
+    plt = get_pyplot()
+    img = cv2.imread(img_path, cv2.IMREAD_GRAYSCALE)
 
-best_threshold, otsu_img = cv2.threshold(img, 0, 255, cv2.THRESH_BINARY + cv2.THRESH_OTSU)
+    best_threshold, otsu_img = otsu_threshold(img)
 
-print(f"Otsu 算法计算出的最佳阈值: {best_threshold}")
+    print(f"Otsu 算法计算出的最佳阈值: {best_threshold}")
 
-plt.figure(figsize=(12, 6))
-plt.suptitle("Otsu's 分割结果（简单图像）", fontsize=20)
+    plt.figure(figsize=(12, 6))
+    plt.suptitle("Otsu's 分割结果（简单图像）", fontsize=20)
 
-plt.subplot(1, 2, 1)
-plt.imshow(img, cmap='gray')
-plt.title("原图 (Original)")
-plt.axis('off')
+    plt.subplot(1, 2, 1)
+    plt.imshow(img, cmap='gray')
+    plt.title("原图 (Original)")
+    plt.axis('off')
 
-plt.subplot(1, 2, 2)
-plt.imshow(otsu_img, cmap='gray')
-plt.title(f"Otsu 阈值分割 (T={best_threshold})")
-plt.axis('off')
+    plt.subplot(1, 2, 2)
+    plt.imshow(otsu_img, cmap='gray')
+    plt.title(f"Otsu 阈值分割 (T={best_threshold})")
+    plt.axis('off')
 
-plt.tight_layout()
+    plt.tight_layout()
 
-output_path = "threshold_segmentation_test_images/results/simple_image_1_otsu.png"
-plt.savefig(output_path, dpi=300)
-print(f"结果已保存为 {output_path}")
\ No newline at end of file
+    plt.savefig(output_path, dpi=300)
+    print(f"结果已保存为 {output_path}")
+
+def main():
+    img_path = "threshold_segmentation_test_images/simple_image_1.bmp"
+    output_path = "threshold_segmentation_test_images/results/simple_image_1_otsu.png"
+    process_and_display(img_path, output_path)
+
+if __name__ == "__main__":
+    main()
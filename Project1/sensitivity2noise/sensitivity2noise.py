@@ -1,75 +1,11 @@
+import sys
 import cv2
 import numpy as np
-import matplotlib.pyplot as plt
 from pathlib import Path
 from typing import Tuple, List, Dict, Any
 
-plt.rcParams['font.sans-serif'] = ['SimHei']  
-plt.rcParams['axes.unicode_minus'] = False 
-
-def calculate_image_derivatives(image_gray: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
-    """
-    计算图像的梯度幅值和拉普拉斯算子。
-    """
-    image_float = image_gray.astype(np.float64)
-
-    # 1. 梯度 (使用 3x3 Sobel)
-    grad_x = cv2.Sobel(image_float, cv2.CV_64F, 1, 0, ksize=3)
-    grad_y = cv2.Sobel(image_float, cv2.CV_64F, 0, 1, ksize=3)
-    gradient_magnitude = np.sqrt(grad_x**2 + grad_y**2)
-
-    # 2. 拉普拉斯 (使用 3x3 8邻域核)
-    laplacian_kernel = np.array(
-        [[1, 1, 1],
-         [1, -8, 1],
-         [1, 1, 1]], 
-        dtype=np.float64
-    )
-    laplacian_image = cv2.filter2D(image_float, cv2.CV_64F, laplacian_kernel)
-
-    return gradient_magnitude, laplacian_image
-
-def find_boundary_sample_points(
-    image_gray: np.ndarray, 
-    gradient_magnitude: np.ndarray, 
-    laplacian_image: np.ndarray, 
-    T_g: float
-) -> List[float]:
-    """
-    采样边界点的灰度值。
-    """
-    height, width = image_gray.shape
-    boundary_samples = []
-    
-    image_float = image_gray.astype(np.float64)
-
-    for i in range(height - 1):
-        for j in range(width - 1):
-            p1 = (i, j)
-            p2_right = (i, j + 1)
-            p3_bottom = (i + 1, j)
-
-            l_p1 = laplacian_image[p1]
-            g_p1 = gradient_magnitude[p1]
-            f_p1 = image_float[p1]
-
-            # 检查“右侧边”
-            l_p2_r = laplacian_image[p2_right]
-            g_p2_r = gradient_magnitude[p2_right]
-            if (l_p1 * l_p2_r < 0) and (g_p1 + g_p2_r >= T_g):
-                weight = abs(l_p1) / (abs(l_p1) + abs(l_p2_r))
-                gray_sample = (1 - weight) * f_p1 + weight * image_float[p2_right]
-                boundary_samples.append(gray_sample)
-
-            # 检查“下方边”
-            l_p3_b = laplacian_image[p3_bottom]
-            g_p3_b = gradient_magnitude[p3_bottom]
-            if (l_p1 * l_p3_b < 0) and (g_p1 + g_p3_b >= T_g):
-                weight = abs(l_p1) / (abs(l_p1) + abs(l_p3_b))
-                gray_sample = (1 - weight) * f_p1 + weight * image_float[p3_bottom]
-                boundary_samples.append(gray_sample)
-                
-    return boundary_samples
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+from wangbai import batch_otsu, calculate_image_derivatives, find_boundary_sample_points, get_pyplot
 
 def create_noisy_images(
     img_size: int = 256, 
@@ -129,12 +65,13 @@ def process_noise_analysis_images(
     results = []
 
     print("正在处理噪声分析图像...")
+
+    # 2. 一次批量计算所有图像的全局直方图和 Otsu 阈值
+    otsu = batch_otsu([image for _, image in images_to_process])
     
-    for title, image in images_to_process:
+    for k, (title, image) in enumerate(images_to_process):
         print(f"  处理中: {title}")
-        
-        # 2. 计算全局直方图的数据
-        global_hist, _ = np.histogram(image.ravel(), bins=256, range=[0, 256])
+        global_hist = otsu.histograms[k]
 
         # 3. 计算边界图像的数据
         grad_mag, lap_img = calculate_image_derivatives(image)
@@ -143,7 +80,7 @@ def process_noise_analysis_images(
         )
         
         # 计算边界直方图
-        if boundary_samples:
+        if len(boundary_samples):
             boundary_hist, _ = np.histogram(boundary_samples, bins=100, range=[0, 255])
             calculated_threshold = np.mean(boundary_samples)
         else:
@@ -156,7 +93,8 @@ def process_noise_analysis_images(
             "global_hist": global_hist,
             "boundary_hist": boundary_hist,
             "boundary_samples_count": len(boundary_samples),
-            "calculated_threshold": calculated_threshold
+            "calculated_threshold": calculated_threshold,
+            "otsu_threshold": int(otsu.thresholds[k])
         })
         
     print("...处理完成。")
@@ -169,6 +107,7 @@ def generate_noise_analysis_plot(
     """
     生成3x4 组合图
     """
+    plt = get_pyplot()
     print("正在生成 3x4 组合图...")
     fig, axes = plt.subplots(3, 4, figsize=(20, 15))
     fig.suptitle('噪声敏感性分析', fontsize=20)
@@ -208,10 +147,10 @@ def generate_noise_analysis_plot(
             ax_26.axvline(threshold, color='red', linestyle='--', 
                           label=f"均值: {threshold:.1f}")
             ax_26.legend()
-            threshold_summary.append(f"{title}: {threshold:.1f}")
+            threshold_summary.append(f"{title}: {threshold:.1f}  (Otsu: {res['otsu_threshold']})")
         else:
             ax_26.set_title(f"{title}\n(未找到边界点)", fontsize=14)
-            threshold_summary.append(f"{title}: N/A")
+            threshold_summary.append(f"{title}: N/A  (Otsu: {res['otsu_threshold']})")
 
         ax_26.set_xlabel('灰度级')
         ax_26.set_ylabel('采样点数量')
@@ -1,83 +1,12 @@
+import sys
 import cv2
 import numpy as np
-import matplotlib.pyplot as plt
 from pathlib import Path
-from typing import Tuple, List, Dict, Any, Set
+from typing import List, Dict, Any
 
-plt.rcParams['font.sans-serif'] = ['SimHei']  
-plt.rcParams['axes.unicode_minus'] = False 
-
-def calculate_image_derivatives(image_gray: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
-    """
-    计算图像的梯度幅值和拉普拉斯算子。
-    """
-    image_float = image_gray.astype(np.float64)
-
-    # 1. 梯度 (使用 3x3 Sobel)
-    grad_x = cv2.Sobel(image_float, cv2.CV_64F, 1, 0, ksize=3)
-    grad_y = cv2.Sobel(image_float, cv2.CV_64F, 0, 1, ksize=3)
-    gradient_magnitude = np.sqrt(grad_x**2 + grad_y**2)
-
-    # 2. 拉普拉斯 (使用 3x3 8邻域核)
-    laplacian_kernel = np.array(
-        [[1, 1, 1],
-         [1, -8, 1],
-         [1, 1, 1]], 
-        dtype=np.float64
-    )
-    laplacian_image = cv2.filter2D(image_float, cv2.CV_64F, laplacian_kernel)
-
-    return gradient_magnitude, laplacian_image
-
-def find_boundary_samples_and_positions(
-    image_gray: np.ndarray, 
-    gradient_magnitude: np.ndarray, 
-    laplacian_image: np.ndarray, 
-    T_g: float
-) -> Tuple[List[float], Set[Tuple[int, int]]]:
-    """
-    实现论文的核心算法。
-    
-    返回:
-        - (List[float]): 采样点的灰度值列表
-        - (Set[Tuple[int, int]]): 贡献采样的 *像素* 坐标
-    """
-    height, width = image_gray.shape
-    boundary_samples = []
-    # 使用集合(set)来自动去重
-    pixel_positions = set()
-    
-    image_float = image_gray.astype(np.float64)
-
-    for i in range(height - 1):
-        for j in range(width - 1):
-            p1 = (i, j)
-            p2_right = (i, j + 1)
-            p3_bottom = (i + 1, j)
-
-            l_p1 = laplacian_image[p1]
-            g_p1 = gradient_magnitude[p1]
-            f_p1 = image_float[p1]
-
-            # 检查“右侧边”
-            l_p2_r = laplacian_image[p2_right]
-            g_p2_r = gradient_magnitude[p2_right]
-            if (l_p1 * l_p2_r < 0) and (g_p1 + g_p2_r >= T_g):
-                weight = abs(l_p1) / (abs(l_p1) + abs(l_p2_r))
-                gray_sample = (1 - weight) * f_p1 + weight * image_float[p2_right]
-                boundary_samples.append(gray_sample)
-                pixel_positions.add(p1) # 记录p1像素位置
-
-            # 检查“下方边”
-            l_p3_b = laplacian_image[p3_bottom]
-            g_p3_b = gradient_magnitude[p3_bottom]
-            if (l_p1 * l_p3_b < 0) and (g_p1 + g_p3_b >= T_g):
-                weight = abs(l_p1) / (abs(l_p1) + abs(l_p3_b))
-                gray_sample = (1 - weight) * f_p1 + weight * image_float[p3_bottom]
-                boundary_samples.append(gray_sample)
-                pixel_positions.add(p1) # 记录p1像素位置
-                
-    return boundary_samples, pixel_positions
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+from wangbai import calculate_image_derivatives, find_boundary_samples_and_positions, get_pyplot
+from wangbai.io import read_gray
 
 def generate_gradient_sensitivity_plot(
     image_gray: np.ndarray,
@@ -87,6 +16,7 @@ def generate_gradient_sensitivity_plot(
     """
     生成 3xN 组合图
     """
+    plt = get_pyplot()
     num_thresholds = len(analysis_results)
     fig, axes = plt.subplots(3, num_thresholds, figsize=(7 * num_thresholds, 18))
     fig.suptitle('梯度阈值 $T$ 敏感性分析', fontsize=20)
@@ -104,10 +34,9 @@ def generate_gradient_sensitivity_plot(
         ax_map = axes[0, col]
         # 创建边缘图
         edge_map_image = np.zeros_like(image_gray)
-        if positions:
-            # 将 set of tuples 转换为 numpy 索引
-            rows, cols = zip(*positions)
-            edge_map_image[rows, cols] = 255
+        if len(positions):
+            # positions 为 (K, 2) 的 (行, 列) 坐标
+            edge_map_image[positions[:, 0], positions[:, 1]] = 255
         
         edge_map_image = cv2.bitwise_not(edge_map_image)
         ax_map.imshow(edge_map_image, cmap='gray')
@@ -116,7 +45,7 @@ def generate_gradient_sensitivity_plot(
         
         # --- Row 2: 边界采样直方图 ---
         ax_hist = axes[1, col]
-        if samples:
+        if len(samples):
             ax_hist.hist(samples, bins=50, range=[0, 255], color='darkgreen')
             ax_hist.set_title(f"边界采样直方图\n(N={len(samples)})", fontsize=16)
             ax_hist.axvline(threshold, color='red', linestyle='--', 
@@ -179,11 +108,10 @@ def main():
     print(f"结果将保存至: {OUTPUT_DIR}")
     
     # 1. 载入图像
-    image = cv2.imread(str(IMAGE_PATH))
-    if image is None:
+    image_gray = read_gray(IMAGE_PATH)
+    if image_gray is None:
         print(f"[错误] 无法读取图像文件: {IMAGE_PATH}")
         return
-    image_gray = cv2.cvtColor(image, cv2.COLOR_BGR2GRAY)
     
     # 2. 预计算梯度和拉普拉斯 (只需一次)
     print("  1. 正在预计算梯度和拉普拉斯...")
@@ -202,7 +130,7 @@ def main():
         )
         
         # 3b. 计算阈值
-        if samples:
+        if len(samples):
             threshold = np.mean(samples)
         else:
             threshold = 0 # 失败
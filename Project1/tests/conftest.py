@@ -0,0 +1,36 @@
+"""
+Project1 测试的公共夹具: 把 Project1 目录加入 sys.path，并提供各复现脚本使用的原始图像。
+"""
+
+import sys
+from pathlib import Path
+
+import cv2
+import numpy as np
+import pytest
+
+PROJECT_DIR = Path(__file__).resolve().parents[1]
+sys.path.insert(0, str(PROJECT_DIR))
+
+IMAGE_PATHS = [
+    PROJECT_DIR / 'rice' / 'rice.bmp',
+    PROJECT_DIR / 'fingerprint' / 'fingerprint.bmp',
+    PROJECT_DIR / 'characters' / 'characters.jpg',
+    PROJECT_DIR / 'baboon' / 'baboon.bmp',
+    PROJECT_DIR / 'girls' / 'girl.bmp',
+    PROJECT_DIR / 'head' / 'head.bmp',
+    PROJECT_DIR / 'leg' / 'leg.bmp',
+]
+
+def load_gray(path: Path) -> np.ndarray:
+    """与各复现脚本相同的读法: imread + cvtColor(BGR2GRAY)"""
+    return cv2.cvtColor(cv2.imread(str(path)), cv2.COLOR_BGR2GRAY)
+
+@pytest.fixture(scope='session')
+def gray_images():
+    """图像名 -> 8位灰度图"""
+    return {path.stem: load_gray(path) for path in IMAGE_PATHS}
+
+@pytest.fixture(scope='session')
+def rice():
+    return load_gray(PROJECT_DIR / 'rice' / 'rice.bmp')
@@ -0,0 +1,98 @@
+"""
+共享内存批处理与阈值服务的结果和单张 compare_thresholds 一致。
+"""
+
+import http.client
+import json
+import threading
+
+import cv2
+import numpy as np
+import pytest
+
+from wangbai import calculate_image_derivatives, compare_thresholds
+from wangbai.shm import BINARY_KEYS, SharedArena, batch_compare_thresholds, plain_thresholds
+from wangbai.service import ServiceClosed, ThresholdService, make_server
+
+def test_arena_put_view_roundtrip():
+    arrays = [np.arange(12, dtype=np.uint8).reshape(3, 4), np.linspace(0, 1, 10, dtype=np.float32),
+              np.arange(6, dtype=np.uint16).reshape(2, 3)]
+    size = SharedArena.required_size([(a.shape, a.dtype) for a in arrays])
+    with SharedArena(size) as arena:
+        descs = [arena.put(a) for a in arrays]
+        for desc, a in zip(descs, arrays):
+            view = arena.view(desc)
+            assert view.dtype == a.dtype
+            np.testing.assert_array_equal(view, a)
+
+def test_batch_matches_compare_thresholds(gray_images, rice):
+    images = list(gray_images.values()) + [rice.astype(np.uint16) * 257]
+    T_g = [60.0] * len(gray_images) + [60.0 * 257]
+    fallback = [30.0] * len(gray_images) + [30.0 * 257]
+    with batch_compare_thresholds(images, T_g, fallback, workers=2, with_derivatives=True) as batch:
+        assert len(batch) == len(images)
+        for i, img in enumerate(images):
+            expected = compare_thresholds(img, T_g[i], fallback[i])
+            assert batch.results[i]['thresholds'] == pytest.approx(plain_thresholds(expected.thresholds), abs=1e-9)
+            for method in BINARY_KEYS:
+                np.testing.assert_array_equal(batch.binary(i, method), expected.binaries[method])
+            for actual, derivative in zip(batch.derivatives(i), calculate_image_derivatives(img)):
+                np.testing.assert_array_equal(actual, derivative)
+
+@pytest.fixture(scope='module')
+def service():
+    service = ThresholdService(workers=1, max_batch=4)
+    yield service
+    service.close()
+
+def encode_png(image):
+    return cv2.imencode('.png', image)[1].tobytes()
+
+def test_service_matches_compare_thresholds(service, gray_images):
+    jobs = [{'image': encode_png(img), 'T_g': 60.0, 'fallback_T_g': 30.0} for img in gray_images.values()]
+    futures = [service.submit(job) for job in jobs]
+    for future, img in zip(futures, gray_images.values()):
+        result = future.result(timeout=60)
+        expected = compare_thresholds(img, 60.0, 30.0)
+        assert result['thresholds'] == pytest.approx(plain_thresholds(expected.thresholds), abs=1e-9)
+        assert result['boundary_points_found'] == expected.n_samples
+        assert result['shape'] == list(img.shape)
+
+def test_service_rejects_after_close():
+    service = ThresholdService(workers=1, max_batch=1)
+    service.close()
+    with pytest.raises(ServiceClosed):
+        service.submit({'image': b'', 'T_g': 60.0, 'fallback_T_g': 30.0})
+
+@pytest.fixture(scope='module')
+def server(service):
+    server = make_server(service, port=0)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    yield server
+    server.shutdown()
+    server.server_close()
+
+def request(server, method, path, body=None, headers=None):
+    conn = http.client.HTTPConnection(*server.server_address[:2], timeout=60)
+    try:
+        conn.request(method, path, body=body, headers=headers or {})
+        response = conn.getresponse()
+        return response.status, response.read()
+    finally:
+        conn.close()
+
+def test_http_health(server):
+    status, _ = request(server, 'GET', '/health')
+    assert status == 200
+
+def test_http_threshold(server, rice):
+    status, body = request(server, 'POST', '/threshold?T_g=60', body=encode_png(rice),
+                           headers={'Content-Type': 'image/png'})
+    assert status == 200
+    expected = compare_thresholds(rice, 60.0, 30.0)
+    assert json.loads(body)['thresholds'] == pytest.approx(plain_thresholds(expected.thresholds), abs=1e-9)
+
+def test_http_rejects_bad_content_length(server):
+    status, _ = request(server, 'POST', '/threshold', body=b'', headers={'Content-Length': '-5'})
+    assert status == 400
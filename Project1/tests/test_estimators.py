@@ -0,0 +1,43 @@
+"""
+StreamingHistogram 的统计量与直接在采样数组上计算的结果比较。
+"""
+
+import numpy as np
+import pytest
+
+from wangbai import StreamingHistogram, estimate_threshold
+
+@pytest.fixture
+def samples():
+    rng = np.random.default_rng(2)
+    return np.concatenate([rng.normal(80, 12, 4000), rng.normal(170, 20, 2500)]).clip(0, 255).astype(np.float32)
+
+def test_mean_is_exact(samples):
+    hist = StreamingHistogram().update(samples)
+    assert hist.count == samples.size
+    assert hist.mean() == pytest.approx(float(np.mean(samples, dtype=np.float64)), abs=1e-9)
+
+def test_quantiles_within_one_bin(samples):
+    hist = StreamingHistogram().update(samples)
+    width = float(np.diff(hist.bin_edges)[0])
+    assert abs(hist.median() - float(np.median(samples))) <= width
+    for q in (0.1, 0.25, 0.75, 0.9):
+        assert abs(hist.quantile(q) - float(np.quantile(samples, q))) <= width
+
+def test_chunks_and_merge_match_single_update(samples):
+    whole = StreamingHistogram().update(samples)
+    chunks = np.array_split(samples, 7)
+    np.testing.assert_array_equal(StreamingHistogram.from_chunks(chunks).counts, whole.counts)
+    merged = StreamingHistogram().update(chunks[0])
+    for chunk in chunks[1:]:
+        merged.merge(StreamingHistogram().update(chunk))
+    np.testing.assert_array_equal(merged.counts, whole.counts)
+    assert merged.mean() == pytest.approx(whole.mean(), abs=1e-9)
+
+def test_empty_histogram():
+    hist = StreamingHistogram()
+    assert hist.count == 0
+    assert hist.mean() is None and hist.median() is None
+
+def test_estimate_threshold_mean(samples):
+    assert estimate_threshold(samples, 'mean') == pytest.approx(float(np.mean(samples, dtype=np.float64)), abs=1e-9)
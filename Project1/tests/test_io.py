@@ -0,0 +1,24 @@
+"""
+read_gray 与 imread + cvtColor 逐像素相同。
+"""
+
+import cv2
+import numpy as np
+import pytest
+
+from wangbai.io import read_gray
+
+from conftest import IMAGE_PATHS, load_gray
+
+@pytest.mark.parametrize('path', IMAGE_PATHS, ids=lambda p: p.name)
+@pytest.mark.parametrize('use_mmap', [True, False])
+def test_read_gray_matches_imread(path, use_mmap):
+    np.testing.assert_array_equal(read_gray(path, use_mmap=use_mmap), load_gray(path))
+
+@pytest.mark.parametrize('channels', [1, 3])
+def test_read_gray_bmp_written_by_cv2(tmp_path, rice, channels):
+    # 宽度不是 4 的倍数，覆盖行填充
+    image = rice[:, :-3] if channels == 1 else cv2.cvtColor(rice[:, :-3], cv2.COLOR_GRAY2BGR)
+    path = tmp_path / 'image.bmp'
+    cv2.imwrite(str(path), image)
+    np.testing.assert_array_equal(read_gray(path), load_gray(path))
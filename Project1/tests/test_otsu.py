@@ -0,0 +1,53 @@
+"""
+批量 Otsu / Kapur 与逐张计算的一致性。
+"""
+
+import cv2
+import numpy as np
+import pytest
+
+from wangbai import (GrayHistogram, batch_histograms, batch_otsu, kapur_from_histogram, kapur_from_histograms,
+                     multichannel_thresholds, compare_thresholds)
+
+def cv2_otsu(image):
+    return cv2.threshold(image, 0, 255, cv2.THRESH_BINARY + cv2.THRESH_OTSU)[0]
+
+def test_batch_otsu_matches_cv2(gray_images):
+    images = list(gray_images.values())
+    result = batch_otsu(images)
+    assert result.thresholds.tolist() == [cv2_otsu(img) for img in images]
+
+def test_batch_otsu_matches_cv2_on_random_images():
+    rng = np.random.default_rng(0)
+    images = [rng.integers(lo, hi, size=(64, 80), dtype=np.uint8)
+              for lo, hi in [(0, 256), (100, 140), (0, 2), (37, 38), (0, 64)]]
+    # 双峰图像
+    images.append(np.where(rng.random((64, 80)) < 0.3, 40, 200).astype(np.uint8))
+    assert batch_otsu(np.stack(images)).thresholds.tolist() == [cv2_otsu(img) for img in images]
+
+def test_batch_histograms_match_calc_hist(gray_images):
+    images = list(gray_images.values())
+    hists = batch_histograms(images)
+    for img, hist in zip(images, hists):
+        expected = cv2.calcHist([img], [0], None, [256], [0, 256]).ravel()
+        np.testing.assert_array_equal(hist, expected)
+
+def test_gray_histogram_otsu_matches_cv2(gray_images):
+    for img in gray_images.values():
+        assert GrayHistogram.from_image(img).otsu() == cv2_otsu(img)
+
+def test_batch_kapur_matches_single(gray_images):
+    hists = batch_histograms(list(gray_images.values()))
+    assert kapur_from_histograms(hists).tolist() == [kapur_from_histogram(h) for h in hists]
+
+def test_multichannel_matches_per_channel(rice):
+    rng = np.random.default_rng(1)
+    image = np.stack([rice, 255 - rice, np.clip(rice.astype(np.int16) + rng.integers(-20, 21, rice.shape), 0, 255)
+                      .astype(np.uint8)], axis=-1)
+    result = multichannel_thresholds(image, 60, 30)
+    for c in range(image.shape[-1]):
+        single = compare_thresholds(np.ascontiguousarray(image[..., c]), 60, 30)
+        assert result.otsu[c] == single.thresholds['otsu']
+        assert result.kapur[c] == single.thresholds['kapur']
+        assert result.sample_counts[c] == single.n_samples
+        assert result.wang_bai[c] == pytest.approx(single.thresholds['wang_bai'], abs=1e-9)
@@ -0,0 +1,115 @@
+"""
+边界采样的各种实现 (并行、块稀疏、结构化、流式) 与稠密采样 find_boundary_sample_points 的一致性。
+"""
+
+import numpy as np
+import pytest
+
+from wangbai import (StreamingHistogram, boundary_sample_histogram, calculate_image_derivatives, compare_thresholds,
+                     filter_boundary_samples, find_boundary_sample_points, find_boundary_sample_points_sparse,
+                     find_boundary_samples_structured, parallel_boundary_samples, parallel_boundary_stats,
+                     parallel_derivatives, sample_boundary, stream_boundary)
+
+T_G_VALUES = [10, 30, 60]
+
+def dense(image, T_g):
+    G, L = calculate_image_derivatives(image)
+    return find_boundary_sample_points(image, G, L, T_g)
+
+def assert_same_samples(actual, expected):
+    assert actual.dtype == expected.dtype
+    np.testing.assert_array_equal(actual, expected)
+
+def test_parallel_derivatives_match(gray_images):
+    for img in gray_images.values():
+        G, L = calculate_image_derivatives(img)
+        pG, pL = parallel_derivatives(img, workers=3)
+        np.testing.assert_array_equal(pG, G)
+        np.testing.assert_array_equal(pL, L)
+
+@pytest.mark.parametrize('T_g', T_G_VALUES)
+@pytest.mark.parametrize('workers', [1, 2, 3])
+def test_parallel_matches_dense(gray_images, T_g, workers):
+    for img in gray_images.values():
+        G, L = calculate_image_derivatives(img)
+        assert_same_samples(parallel_boundary_samples(img, G, L, T_g, workers=workers),
+                            find_boundary_sample_points(img, G, L, T_g))
+
+@pytest.mark.parametrize('T_g', T_G_VALUES)
+@pytest.mark.parametrize('block_size', [7, 32])
+def test_sparse_matches_dense(gray_images, T_g, block_size):
+    for img in gray_images.values():
+        G, L = calculate_image_derivatives(img)
+        expected = find_boundary_sample_points(img, G, L, T_g)
+        assert_same_samples(find_boundary_sample_points_sparse(img, G, L, T_g, block_size=block_size), expected)
+        assert_same_samples(parallel_boundary_samples(img, G, L, T_g, workers=2, block_size=block_size), expected)
+
+@pytest.mark.parametrize('workers, block_size', [(1, None), (2, None), (1, 16), (3, 16)])
+def test_sample_boundary_matches_dense(rice, workers, block_size):
+    samples, used_T_g = sample_boundary(rice, 60, 30, workers=workers, block_size=block_size)
+    assert used_T_g == 60
+    assert_same_samples(samples, dense(rice, 60))
+
+def test_sample_boundary_fallback():
+    flat = np.full((32, 32), 128, dtype=np.uint8)
+    samples, used_T_g = sample_boundary(flat, 60, 30)
+    assert samples.size == 0 and used_T_g == 30
+
+def test_uint16_parallel_and_sparse_match_dense(rice):
+    img = rice.astype(np.uint16) * 257
+    G, L = calculate_image_derivatives(img)
+    expected = find_boundary_sample_points(img, G, L, 60 * 257)
+    assert_same_samples(parallel_boundary_samples(img, G, L, 60 * 257, workers=3), expected)
+    assert_same_samples(find_boundary_sample_points_sparse(img, G, L, 60 * 257, block_size=16), expected)
+
+@pytest.mark.parametrize('T_g', T_G_VALUES)
+def test_structured_values_match_dense(gray_images, T_g):
+    for img in gray_images.values():
+        G, L = calculate_image_derivatives(img)
+        structured = find_boundary_samples_structured(img, G, L, T_g)
+        np.testing.assert_array_equal(structured['value'], find_boundary_sample_points(img, G, L, T_g))
+
+def test_filter_matches_reextraction(rice):
+    G, L = calculate_image_derivatives(rice)
+    samples = find_boundary_samples_structured(rice, G, L, 10)
+    for T_g in (30, 60, 90):
+        np.testing.assert_array_equal(filter_boundary_samples(samples, T_g),
+                                      find_boundary_samples_structured(rice, G, L, T_g))
+
+@pytest.mark.parametrize('workers, block_size', [(1, None), (3, None), (2, 16)])
+def test_streamed_histogram_matches_dense(gray_images, workers, block_size):
+    for img in gray_images.values():
+        G, L = calculate_image_derivatives(img)
+        expected = find_boundary_sample_points(img, G, L, 30)
+        hist = boundary_sample_histogram(img, G, L, 30, workers=workers, block_size=block_size, band_rows=37)
+        np.testing.assert_array_equal(hist.counts, StreamingHistogram().update(expected).counts)
+        assert hist.count == expected.size
+        if expected.size:
+            assert hist.mean() == pytest.approx(float(np.mean(expected, dtype=np.float64)), abs=1e-9)
+
+def test_parallel_stats_match_dense(gray_images):
+    for img in gray_images.values():
+        G, L = calculate_image_derivatives(img)
+        expected = find_boundary_sample_points(img, G, L, 30)
+        stats = parallel_boundary_stats(img, G, L, 30, workers=3)
+        assert stats.count == expected.size
+        assert stats.mean == pytest.approx(float(np.mean(expected, dtype=np.float64)), abs=1e-9)
+
+def test_stream_boundary_matches_sample_boundary(rice):
+    hist, used_T_g = stream_boundary(rice, 60, 30, workers=2)
+    samples, expected_T_g = sample_boundary(rice, 60, 30)
+    assert used_T_g == expected_T_g
+    assert hist.count == samples.size
+
+@pytest.mark.parametrize('estimator', ['mean', 'median', 'trimmed_mean'])
+def test_compare_thresholds_without_samples(gray_images, estimator):
+    for img in gray_images.values():
+        kept = compare_thresholds(img, 60, 30, estimator=estimator, keep_samples=True)
+        streamed = compare_thresholds(img, 60, 30, estimator=estimator, keep_samples=False)
+        assert streamed.boundary_samples.size == 0
+        assert streamed.n_samples == kept.n_samples == kept.boundary_samples.size
+        assert streamed.T_g == kept.T_g
+        for method, value in kept.thresholds.items():
+            assert streamed.thresholds[method] == pytest.approx(value, abs=1e-9)
+        for method, binary in kept.binaries.items():
+            np.testing.assert_array_equal(streamed.binaries[method], binary)
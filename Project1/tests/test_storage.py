@@ -0,0 +1,61 @@
+"""
+结果存储 (二值图打包、bundle 文件、SQLite 结果库) 的往返一致性。
+"""
+
+import numpy as np
+import pytest
+
+from wangbai.bundle import load_bundle, pack_binary, save_bundle, unpack_binary
+from wangbai.store import ResultStore
+
+@pytest.mark.parametrize('shape', [(1, 1), (7, 13), (64, 64), (31, 9)])
+def test_pack_unpack_roundtrip(shape):
+    rng = np.random.default_rng(3)
+    binary = np.where(rng.random(shape) < 0.4, 255, 0).astype(np.uint8)
+    packed = pack_binary(binary)
+    assert packed.nbytes == (binary.size + 7) // 8
+    np.testing.assert_array_equal(unpack_binary(packed, shape), binary)
+
+def test_bundle_roundtrip(tmp_path):
+    rng = np.random.default_rng(4)
+    binaries = {
+        'a': {m: np.where(rng.random((20, 30)) < 0.5, 255, 0).astype(np.uint8) for m in ('wang_bai', 'otsu')},
+        'b': {'kapur': np.zeros((5, 3), dtype=np.uint8)},
+    }
+    path = save_bundle(tmp_path / 'bins', binaries, {'a': {'T_g': 60.0}})
+    assert path.suffix == '.npz'
+    loaded, meta = load_bundle(path)
+    assert meta['a']['T_g'] == 60.0
+    assert meta['a']['shape'] == [20, 30]
+    for name, methods in binaries.items():
+        assert set(loaded[name]) == set(methods)
+        for method, binary in methods.items():
+            np.testing.assert_array_equal(loaded[name][method], binary)
+
+def test_bundle_rejects_mixed_shapes(tmp_path):
+    binaries = {'a': {'otsu': np.zeros((4, 4), np.uint8), 'kapur': np.zeros((4, 5), np.uint8)}}
+    with pytest.raises(ValueError):
+        save_bundle(tmp_path / 'bins.npz', binaries)
+
+def test_result_store_check(tmp_path):
+    with ResultStore(tmp_path / 'results.sqlite') as store:
+        store.record_run('rice', {'wang_bai': 120.0, 'otsu': 130.0, 'kapur': None},
+                         expected={'wang_bai': 118.5, 'otsu': 125.0, 'kapur': 100.0}, shape=(256, 256), T_g=60.0)
+        rows = {row['method']: row for row in store.check(tolerance=2.0)}
+        assert rows['wang_bai']['passed']
+        assert not rows['otsu']['passed']
+        assert not rows['kapur']['passed']  # 失败的阈值视为不通过
+        assert rows['wang_bai']['diff'] == pytest.approx(1.5)
+
+        rows = {row['method']: row for row in store.check(tolerance=2.0, method_tolerances={'otsu': 5.0})}
+        assert rows['otsu']['passed']
+
+        # 只检查最近一次运行
+        store.record_run('rice', {'otsu': 124.0}, expected={'otsu': 125.0})
+        rows = store.check(tolerance=2.0)
+        assert [row['method'] for row in rows] == ['otsu'] and rows[0]['passed']
+        assert len(store.check(tolerance=2.0, latest_only=False)) == 4
+
+        runs = store.runs('rice')
+        assert [run['thresholds'] for run in runs] == [
+            {'otsu': 124.0}, {'kapur': None, 'otsu': 130.0, 'wang_bai': 120.0}]
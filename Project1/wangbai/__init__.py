@@ -0,0 +1,70 @@
+"""
+wangbai: Project1 (Wang & Bai, 2003 边界采样阈值法复现) 的公共计算模块。
+
+顶层只导出纯计算接口 (不读写文件、不打印)；各复现脚本的 I/O 与绘图在 wangbai.report 中。
+"""
+
+from .otsu import OtsuResult, batch_histograms, otsu_from_histograms, batch_otsu
+from .histogram import GrayHistogram, kapur_from_histogram, kapur_from_histograms, multi_otsu_from_histogram
+from .derivatives import calculate_image_derivatives
+from .sampling import (BOUNDARY_SAMPLE_DTYPE, boundary_sample_positions, filter_boundary_samples,
+                       find_boundary_sample_points, find_boundary_sample_points_sparse,
+                       find_boundary_samples_and_positions, find_boundary_samples_structured)
+from .bands import (BoundaryStats, row_bands, parallel_derivatives, parallel_boundary_samples, parallel_boundary_stats,
+                    boundary_sample_histogram)
+from .color import ChannelThresholds, multichannel_thresholds
+from .estimators import StreamingHistogram, estimate_from_histogram, estimate_threshold
+from .subsample import SubsampledEstimate, subsampled_wang_bai_threshold
+from .multilevel import find_multilevel_thresholds_kmeans, segment_image_by_thresholds
+from .pipeline import (
+    ComparisonResult,
+    MultilevelResult,
+    sample_boundary,
+    stream_boundary,
+    wang_bai_threshold,
+    compare_thresholds,
+    multilevel_segment,
+)
+from .plotting import get_pyplot
+
+__all__ = [
+    'OtsuResult',
+    'batch_histograms',
+    'otsu_from_histograms',
+    'batch_otsu',
+    'GrayHistogram',
+    'kapur_from_histogram',
+    'kapur_from_histograms',
+    'multi_otsu_from_histogram',
+    'calculate_image_derivatives',
+    'find_boundary_sample_points',
+    'find_boundary_sample_points_sparse',
+    'find_boundary_samples_and_positions',
+    'find_boundary_samples_structured',
+    'filter_boundary_samples',
+    'boundary_sample_positions',
+    'BOUNDARY_SAMPLE_DTYPE',
+    'BoundaryStats',
+    'row_bands',
+    'parallel_derivatives',
+    'parallel_boundary_samples',
+    'parallel_boundary_stats',
+    'boundary_sample_histogram',
+    'ChannelThresholds',
+    'multichannel_thresholds',
+    'StreamingHistogram',
+    'estimate_from_histogram',
+    'estimate_threshold',
+    'SubsampledEstimate',
+    'subsampled_wang_bai_threshold',
+    'find_multilevel_thresholds_kmeans',
+    'segment_image_by_thresholds',
+    'ComparisonResult',
+    'MultilevelResult',
+    'sample_boundary',
+    'stream_boundary',
+    'wang_bai_threshold',
+    'compare_thresholds',
+    'multilevel_segment',
+    'get_pyplot',
+]
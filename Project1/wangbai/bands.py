@@ -0,0 +1,216 @@
+"""
+单张大图的行带 (row band) 并行。
+
+图像按行切成若干水平带，每带连同上下各 1 行的 halo 独立计算 (3x3 算子和
+“右/下”边采样都只依赖相邻一行)，在线程池中执行。cv2 滤波与 NumPy 的整块数组
+运算都会释放 GIL，因此线程即可用满多核，也不需要在进程间拷贝数据。
+各带结果按带的顺序合并，与线程完成的先后无关，输出与整图计算逐位一致。
+"""
+
+import os
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
+from typing import List, Optional, Tuple
+
+import numpy as np
+
+from .derivatives import calculate_image_derivatives, derivative_dtype
+from .estimators import DEFAULT_BINS, StreamingHistogram
+from .histogram import image_value_range
+from .sampling import _edge_samples, find_boundary_sample_points_sparse
+
+# 每带至少的行数，过窄的带里 halo 与调度开销占比过高
+MIN_BAND_ROWS = 32
+
+# 流式累加直方图时每带的行数，决定同时存在的采样值个数的上限
+STREAM_BAND_ROWS = 256
+
+def row_bands(n_rows: int, workers: Optional[int] = None, min_rows: int = MIN_BAND_ROWS) -> List[Tuple[int, int]]:
+    """
+    把 [0, n_rows) 切成若干连续的 [start, stop) 行带，带数约为 2 * workers。
+
+    返回:
+        List[Tuple[int, int]]: 按行序排列的行带
+    """
+    workers = workers or os.cpu_count() or 1
+    n_bands = max(1, min(2 * workers, n_rows // max(min_rows, 1)))
+    edges = np.linspace(0, n_rows, n_bands + 1).round().astype(int)
+    return [(int(a), int(b)) for a, b in zip(edges[:-1], edges[1:]) if b > a]
+
+def parallel_derivatives(
+    image_gray: np.ndarray,
+    workers: Optional[int] = None,
+    out: Optional[Tuple[np.ndarray, np.ndarray]] = None
+) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    按行带并行计算梯度幅值和拉普拉斯 (结果与 calculate_image_derivatives 一致)。
+
+    参数:
+        image_gray (np.ndarray): 8位灰度图像
+        workers (Optional[int]): 线程数
+        out: 可选的预分配 (梯度, 拉普拉斯) 缓冲区，类型为 derivative_dtype(image_gray)
+
+    返回:
+        Tuple[np.ndarray, np.ndarray]: (gradient_magnitude, laplacian_image)
+    """
+    height = image_gray.shape[0]
+    if out is None:
+        dtype = derivative_dtype(image_gray)
+        out = (np.empty(image_gray.shape, dtype=dtype), np.empty(image_gray.shape, dtype=dtype))
+    gradient_out, laplacian_out = out
+
+    def run_band(band):
+        start, stop = band
+        # 上下各带 1 行 halo，保证带边界处的 3x3 邻域与整图计算相同
+        lo, hi = max(start - 1, 0), min(stop + 1, height)
+        grad, lap = calculate_image_derivatives(image_gray[lo:hi])
+        gradient_out[start:stop] = grad[start - lo:stop - lo]
+        laplacian_out[start:stop] = lap[start - lo:stop - lo]
+
+    bands = row_bands(height, workers)
+    with ThreadPoolExecutor(max_workers=workers) as pool:
+        list(pool.map(run_band, bands))
+    return gradient_out, laplacian_out
+
+def _band_edge_samples(image_gray, gradient_magnitude, laplacian_image, T_g, band):
+    # 像素行 [start, stop) 的右/下边，需要多取下方 1 行
+    start, stop = band
+    rows = slice(start, stop + 1)
+    return _edge_samples(image_gray[rows], gradient_magnitude[rows], laplacian_image[rows], T_g)
+
+def _band_samples(image_gray, gradient_magnitude, laplacian_image, T_g, band, block_size=None):
+    # 一个行带的采样值 (按行序)；给出 block_size 时带内用块稀疏扫描
+    if block_size is not None:
+        rows = slice(band[0], band[1] + 1)
+        return find_boundary_sample_points_sparse(image_gray[rows], gradient_magnitude[rows],
+                                                  laplacian_image[rows], T_g, block_size)
+    values, mask = _band_edge_samples(image_gray, gradient_magnitude, laplacian_image, T_g, band)
+    return values[mask]
+
+def parallel_boundary_samples(
+    image_gray: np.ndarray,
+    gradient_magnitude: np.ndarray,
+    laplacian_image: np.ndarray,
+    T_g: float,
+    workers: Optional[int] = None,
+    block_size: Optional[int] = None
+) -> np.ndarray:
+    """
+    按行带并行的边界采样，各带结果按行序拼接，
+    与 find_boundary_sample_points 的输出 (含顺序) 一致。
+    给出 block_size 时每带内部用块稀疏扫描 (find_boundary_sample_points_sparse)，输出不变。
+    """
+    def run_band(band):
+        return _band_samples(image_gray, gradient_magnitude, laplacian_image, T_g, band, block_size)
+
+    bands = row_bands(image_gray.shape[0] - 1, workers)
+    with ThreadPoolExecutor(max_workers=workers) as pool:
+        parts = list(pool.map(run_band, bands))
+    return np.concatenate(parts) if parts else np.empty(0, dtype=np.float64)
+
+def boundary_sample_histogram(
+    image_gray: np.ndarray,
+    gradient_magnitude: np.ndarray,
+    laplacian_image: np.ndarray,
+    T_g: float,
+    workers: int = 1,
+    block_size: Optional[int] = None,
+    bins: int = DEFAULT_BINS,
+    value_range: Optional[Tuple[float, float]] = None,
+    band_rows: int = STREAM_BAND_ROWS
+) -> StreamingHistogram:
+    """
+    逐行带把边界采样值直接累加进 StreamingHistogram，不拼出完整的采样数组。
+
+    每带 band_rows 行，同一时刻只有正在处理的带的采样值在内存中，
+    因此内存只取决于图像宽度、band_rows 和 workers，与采样点总数无关。
+    各带直方图按带的顺序合并，计数与 find_boundary_sample_points 的结果完全一致
+    (总和可能相差浮点舍入误差)。
+
+    参数:
+        image_gray, gradient_magnitude, laplacian_image, T_g: 同 find_boundary_sample_points
+        workers (int): 线程数，> 1 时各带在线程池中并行
+        block_size (Optional[int]): 带内块稀疏扫描的块边长，None 为逐像素扫描
+        bins (int): 直方图 bin 数
+        value_range (Optional[Tuple[float, float]]): 直方图范围，缺省为图像的灰度范围 (image_value_range)
+        band_rows (int): 每带的行数
+
+    返回:
+        StreamingHistogram
+    """
+    if value_range is None:
+        value_range = image_value_range(image_gray)
+    n_rows = image_gray.shape[0] - 1
+    bands = [(start, min(start + band_rows, n_rows)) for start in range(0, max(n_rows, 0), band_rows)]
+
+    def run_band(band):
+        samples = _band_samples(image_gray, gradient_magnitude, laplacian_image, T_g, band, block_size)
+        return StreamingHistogram(bins, value_range).update(samples)
+
+    hist = StreamingHistogram(bins, value_range)
+    if workers > 1:
+        with ThreadPoolExecutor(max_workers=workers) as pool:
+            for part in pool.map(run_band, bands):
+                hist.merge(part)
+    else:
+        for band in bands:
+            hist.merge(run_band(band))
+    return hist
+
+@dataclass
+class BoundaryStats:
+    """
+    边界采样的汇总统计 (不保留采样值本身)。
+
+    属性:
+        count (int): 采样点数
+        total (float): 采样值之和
+        histogram (np.ndarray): 采样值直方图
+        bin_edges (np.ndarray): 直方图 bin 边界
+    """
+    count: int
+    total: float
+    histogram: np.ndarray
+    bin_edges: np.ndarray
+
+    @property
+    def mean(self) -> Optional[float]:
+        return self.total / self.count if self.count else None
+
+def parallel_boundary_stats(
+    image_gray: np.ndarray,
+    gradient_magnitude: np.ndarray,
+    laplacian_image: np.ndarray,
+    T_g: float,
+    workers: Optional[int] = None,
+    bins: int = 256,
+    value_range: Optional[Tuple[float, float]] = None
+) -> BoundaryStats:
+    """
+    按行带并行统计边界采样的个数、总和和直方图。
+
+    每带只返回 (个数, 和, 直方图)，按带的顺序累加，结果可复现
+    (总和与对全部采样值直接求和可能相差浮点舍入误差)。
+    value_range 缺省为图像的灰度范围 (image_value_range，uint8 为 [0, 256)，uint16 为 [0, 65536))。
+    """
+    if value_range is None:
+        value_range = image_value_range(image_gray)
+
+    def run_band(band):
+        values, mask = _band_edge_samples(image_gray, gradient_magnitude, laplacian_image, T_g, band)
+        samples = values[mask]
+        hist, _ = np.histogram(samples, bins=bins, range=value_range)
+        return samples.size, float(samples.sum()), hist
+
+    bands = row_bands(image_gray.shape[0] - 1, workers)
+    with ThreadPoolExecutor(max_workers=workers) as pool:
+        parts = list(pool.map(run_band, bands))
+
+    count, total = 0, 0.0
+    histogram = np.zeros(bins, dtype=np.int64)
+    for n, s, hist in parts:
+        count += n
+        total += s
+        histogram += hist
+    return BoundaryStats(count=count, total=total, histogram=histogram,
+                         bin_edges=np.linspace(value_range[0], value_range[1], bins + 1))
@@ -0,0 +1,164 @@
+"""
+多通道 (H, W, C) 图像的逐通道阈值。
+
+导数、边界采样、Otsu、Kapur 对所有通道一次完成，不必把整个流程对每个通道各跑一遍:
+    - cv2.Sobel / filter2D 直接对通道在后的 (H, W, C) 数组逐通道滤波
+    - 导数转成通道在前的连续数组后，_edge_samples 在 (C, H-1, W-1, 2) 上一次判定，
+      T_g 可按通道给出；按通道求和、计数都是连续内存上的归约
+    - Otsu / Kapur 对 (C, L) 的直方图按行批量计算 (各通道共用同一组 bin 边界)
+可选用彩色梯度幅值 (各通道梯度的平方和开方) 作为边界的强度判据，
+此时各通道的边界位置由同一个梯度决定，但阈值仍按通道分别报告。
+"""
+
+from dataclasses import dataclass
+from typing import List, Optional, Tuple
+
+import cv2
+import numpy as np
+
+from .derivatives import calculate_image_derivatives
+from .histogram import GrayHistogram, image_value_range, kapur_from_histograms
+from .otsu import otsu_from_histograms
+from .sampling import _edge_samples
+
+GRADIENT_MODES = ('channel', 'color')
+
+@dataclass
+class ChannelThresholds:
+    """
+    逐通道阈值。
+
+    属性:
+        wang_bai (np.ndarray): (C,) Wang & Bai 阈值，没有采样点的通道为 NaN
+        otsu (np.ndarray): (C,) Otsu 阈值
+        kapur (np.ndarray): (C,) Kapur 阈值
+        sample_counts (np.ndarray): (C,) 各通道的边界采样点数
+        T_g (np.ndarray): (C,) 各通道实际使用的梯度阈值 (可能是回退值)
+        histograms (np.ndarray): (C, L) 各通道直方图 (uint8 为 256 bin)
+        edges (np.ndarray): (L+1,) 各通道共用的 bin 边界
+    """
+    wang_bai: np.ndarray
+    otsu: np.ndarray
+    kapur: np.ndarray
+    sample_counts: np.ndarray
+    T_g: np.ndarray
+    histograms: np.ndarray
+    edges: np.ndarray
+
+def channel_histograms(image: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    (H, W, C) 图像的各通道直方图。
+
+    uint8 为 256-bin (cv2.calcHist)；其他类型与 GrayHistogram.from_image 相同
+    (uint16 每个灰度级一个 bin，浮点为 256 bin)，所有通道共用整幅图像的 image_value_range，
+    因此 bin 边界一致，可以按行批量计算 Otsu / Kapur。
+    浮点图像的 bin 由所有通道的总范围决定，阈值与单独对某个通道统计时可能相差一个 bin 宽左右。
+
+    返回:
+        (histograms, edges): (C, L) int64 直方图与 (L+1,) bin 边界
+    """
+    channels = range(image.shape[-1])
+    if image.dtype == np.uint8:
+        counts = np.stack([cv2.calcHist([image], [c], None, [256], [0, 256]).ravel() for c in channels])
+        return counts.astype(np.int64), np.arange(257, dtype=np.float64)
+
+    value_range = image_value_range(image)
+    hists = [GrayHistogram.from_image(image[..., c], value_range=value_range) for c in channels]
+    return np.stack([h.counts for h in hists]), hists[0].edges
+
+def color_gradient_magnitude(gradient_magnitude: np.ndarray) -> np.ndarray:
+    """各通道 Sobel 梯度幅值的平方和开方: (H, W, C) -> (H, W)"""
+    return np.sqrt(np.einsum('hwc,hwc->hw', gradient_magnitude, gradient_magnitude))
+
+def _channel_edge_samples(image, gradient_magnitude, laplacian_image, T_g, gradient):
+    """返回 (values, mask)，形状均为 (C, H-1, W-1, 2)；T_g 为 (C,)"""
+    def channels_first(a):
+        return np.ascontiguousarray(np.moveaxis(a, -1, 0))
+
+    if gradient == 'color':
+        # 所有通道共用同一个梯度幅值，广播即可，不必复制 C 份
+        gradient_first = color_gradient_magnitude(gradient_magnitude)[None]
+    else:
+        gradient_first = channels_first(gradient_magnitude)
+    T_g = np.asarray(T_g, dtype=np.float64).reshape(-1, 1, 1, 1)
+    return _edge_samples(channels_first(image), gradient_first, channels_first(laplacian_image), T_g)
+
+def channel_boundary_samples(
+    image: np.ndarray,
+    gradient_magnitude: np.ndarray,
+    laplacian_image: np.ndarray,
+    T_g: float,
+    gradient: str = 'channel'
+) -> List[np.ndarray]:
+    """
+    各通道的边界采样值，每个通道的顺序与单通道 find_boundary_sample_points 相同。
+
+    参数:
+        image (np.ndarray): (H, W, C) 图像
+        gradient_magnitude, laplacian_image: (H, W, C) 导数 (calculate_image_derivatives 的结果)
+        T_g: 梯度阈值，标量或 (C,)
+        gradient (str): 'channel' 用各通道自身的梯度，'color' 用彩色梯度幅值
+
+    返回:
+        List[np.ndarray]: 每个通道一个 float64 采样数组
+    """
+    values, mask = _channel_edge_samples(image, gradient_magnitude, laplacian_image,
+                                         np.broadcast_to(T_g, image.shape[-1:]), gradient)
+    return [values[c][mask[c]] for c in range(image.shape[-1])]
+
+def multichannel_thresholds(
+    image: np.ndarray,
+    T_g: float,
+    fallback_T_g: Optional[float] = None,
+    gradient: str = 'channel'
+) -> ChannelThresholds:
+    """
+    计算 (H, W, C) 图像 (uint8、uint16、float32 等) 各通道的 Wang & Bai、Otsu、Kapur 阈值。
+
+    Wang & Bai 阈值为各通道边界采样的均值，在 (C, H-1, W-1, 2) 的数组上按通道求和，
+    与对每个通道单独运行 compare_thresholds 的结果一致 (至多相差求和顺序带来的舍入误差)。
+    某个通道在 T_g 下没有采样点时，只对该通道改用 fallback_T_g。
+
+    参数:
+        image (np.ndarray): (H, W, C) 图像 (OpenCV 的 BGR 顺序即按 B、G、R 报告)
+        T_g (float): 梯度阈值 (以图像自身的灰度单位计)
+        fallback_T_g (Optional[float]): 找不到边界点时改用的梯度阈值
+        gradient (str): 'channel' 或 'color'，见 channel_boundary_samples
+
+    返回:
+        ChannelThresholds
+    """
+    if image.ndim != 3:
+        raise ValueError(f"需要 (H, W, C) 图像: {image.shape}")
+    if gradient not in GRADIENT_MODES:
+        raise ValueError(f"未知的梯度方式: {gradient} (可选: {', '.join(GRADIENT_MODES)})")
+
+    channels = image.shape[-1]
+    gradient_magnitude, laplacian_image = calculate_image_derivatives(image)
+
+    used_T_g = np.full(channels, float(T_g))
+    values, mask = _channel_edge_samples(image, gradient_magnitude, laplacian_image, used_T_g, gradient)
+    counts = mask.reshape(channels, -1).sum(axis=1)
+    if fallback_T_g is not None and (counts == 0).any():
+        used_T_g[counts == 0] = fallback_T_g
+        values, mask = _channel_edge_samples(image, gradient_magnitude, laplacian_image, used_T_g, gradient)
+        counts = mask.reshape(channels, -1).sum(axis=1)
+
+    sums = np.where(mask, values, 0.0).reshape(channels, -1).sum(axis=1)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        wang_bai = np.where(counts > 0, sums / counts, np.nan)
+
+    # 阈值所在的 bin 序号按共用的 bin 边界换算为灰度值 (uint8 下即 bin 序号)
+    histograms, edges = channel_histograms(image)
+    levels = GrayHistogram(counts=histograms[0], edges=edges)
+    otsu_bins = otsu_from_histograms(histograms).thresholds
+    kapur_bins = kapur_from_histograms(histograms)
+    return ChannelThresholds(
+        wang_bai=wang_bai,
+        otsu=np.array([levels.bin_level(int(i), upper=True) for i in otsu_bins]),
+        kapur=np.array([levels.bin_level(int(i), upper=False) for i in kapur_bins]),
+        sample_counts=counts,
+        T_g=used_T_g,
+        histograms=histograms,
+        edges=edges,
+    )
@@ -0,0 +1,53 @@
+from typing import Optional, Tuple
+
+import cv2
+import numpy as np
+
+# 3x3 8邻域拉普拉斯核
+LAPLACIAN_KERNEL_8 = np.array(
+    [[1, 1, 1],
+     [1, -8, 1],
+     [1, 1, 1]],
+    dtype=np.float64
+)
+
+# 这些类型直接以 float32 计算导数 (cv2 可直接读入，不必先把整幅图像转为浮点)
+_FLOAT32_INPUTS = (np.uint16, np.int16, np.float32)
+
+def derivative_dtype(image_gray: np.ndarray) -> np.dtype:
+    """导数的数值类型: uint8 等沿用 float64；uint16 / int16 / float32 图像用 float32"""
+    return np.dtype(np.float32 if image_gray.dtype in _FLOAT32_INPUTS else np.float64)
+
+def calculate_image_derivatives(
+    image_gray: np.ndarray,
+    out: Optional[Tuple[np.ndarray, np.ndarray]] = None
+) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    计算图像的梯度幅值和拉普拉斯算子。
+
+    uint16 / int16 / float32 图像由 cv2 直接读入并以 float32 计算 (见 derivative_dtype)，
+    不会把整幅图像提升为 float64。
+
+    参数:
+        image_gray (np.ndarray): 灰度图像 (uint8、uint16、float32 等)
+        out: 可选的预分配 (gradient_magnitude, laplacian_image) 缓冲区 (例如共享内存)，
+             类型须为 derivative_dtype(image_gray)
+
+    返回:
+        Tuple[np.ndarray, np.ndarray]:
+            - gradient_magnitude: 梯度幅值 (3x3 Sobel)
+            - laplacian_image: 拉普拉斯图像 (3x3 8邻域核)
+    """
+    gradient_out, laplacian_out = out if out is not None else (None, None)
+    if derivative_dtype(image_gray) == np.float32:
+        image_float, depth = image_gray, cv2.CV_32F
+    else:
+        image_float, depth = image_gray.astype(np.float64), cv2.CV_64F
+
+    grad_x = cv2.Sobel(image_float, depth, 1, 0, ksize=3)
+    grad_y = cv2.Sobel(image_float, depth, 0, 1, ksize=3)
+    gradient_magnitude = np.sqrt(grad_x**2 + grad_y**2, out=gradient_out)
+
+    laplacian_image = cv2.filter2D(image_float, depth, LAPLACIAN_KERNEL_8, dst=laplacian_out)
+
+    return gradient_magnitude, laplacian_image
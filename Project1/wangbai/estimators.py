@@ -0,0 +1,186 @@
+"""
+边界采样值的稳健阈值估计 (常数内存)。
+
+采样值先流式累加到细分的固定 bin 直方图 (默认 1/16 灰度级一个 bin)，
+中位数、截尾均值、众数都只在直方图上计算，内存与采样点数无关，
+误差不超过一个 bin 宽；多个分块 / 行带的直方图可以直接相加合并。
+均值仍由精确的总和与计数得到。
+不保留采样值、逐行带直接累加的用法见 bands.boundary_sample_histogram。
+"""
+
+from typing import Callable, Dict, Iterable, Optional, Tuple
+
+import numpy as np
+
+# 默认 bin 数: [0, 256) 上每 1/16 灰度级一个 bin
+DEFAULT_BINS = 4096
+
+class StreamingHistogram:
+    """
+    固定 bin 的流式直方图。
+
+    参数:
+        bins (int): bin 个数
+        value_range (Tuple[float, float]): 取值范围 [lo, hi)，范围外的值计入首/末 bin
+    """
+
+    def __init__(self, bins: int = DEFAULT_BINS, value_range: Tuple[float, float] = (0.0, 256.0)):
+        self.bins = bins
+        self.lo, self.hi = float(value_range[0]), float(value_range[1])
+        self.bin_width = (self.hi - self.lo) / bins
+        self.counts = np.zeros(bins, dtype=np.int64)
+        self.total = 0.0
+
+    @property
+    def count(self) -> int:
+        return int(self.counts.sum())
+
+    @property
+    def bin_edges(self) -> np.ndarray:
+        return np.linspace(self.lo, self.hi, self.bins + 1)
+
+    def update(self, samples: np.ndarray) -> 'StreamingHistogram':
+        """累加一批采样值"""
+        samples = np.asarray(samples, dtype=np.float64).ravel()
+        if samples.size == 0:
+            return self
+        idx = ((samples - self.lo) / self.bin_width).astype(np.int64)
+        np.clip(idx, 0, self.bins - 1, out=idx)
+        self.counts += np.bincount(idx, minlength=self.bins)
+        self.total += float(samples.sum())
+        return self
+
+    def merge(self, other: 'StreamingHistogram') -> 'StreamingHistogram':
+        """合并另一个 bin 设置相同的直方图"""
+        if (other.bins, other.lo, other.hi) != (self.bins, self.lo, self.hi):
+            raise ValueError("直方图的 bin 设置不一致，无法合并")
+        self.counts += other.counts
+        self.total += other.total
+        return self
+
+    @classmethod
+    def from_chunks(cls, chunks: Iterable[np.ndarray], **kwargs) -> 'StreamingHistogram':
+        """由采样值分块 (例如逐带、逐图) 构建"""
+        hist = cls(**kwargs)
+        for chunk in chunks:
+            hist.update(chunk)
+        return hist
+
+    def mean(self) -> Optional[float]:
+        n = self.count
+        return self.total / n if n else None
+
+    def quantile(self, q: float) -> Optional[float]:
+        """
+        分位数: 找到累计计数跨过 q * N 的 bin，在 bin 内线性插值 (误差不超过一个 bin 宽)。
+        """
+        n = self.count
+        if n == 0:
+            return None
+        target = q * n
+        cdf = np.cumsum(self.counts)
+        k = int(np.searchsorted(cdf, target, side='left'))
+        k = min(k, self.bins - 1)
+        before = cdf[k - 1] if k > 0 else 0
+        inside = self.counts[k]
+        frac = (target - before) / inside if inside else 0.0
+        return self.lo + (k + frac) * self.bin_width
+
+    def median(self) -> Optional[float]:
+        return self.quantile(0.5)
+
+    def trimmed_mean(self, proportion: float = 0.1) -> Optional[float]:
+        """
+        截尾均值: 去掉两端各 proportion 比例的采样后取均值。
+        被截断的边界 bin 只计入落在区间内的那部分计数，bin 内取中心值。
+        """
+        if not 0 <= proportion < 0.5:
+            raise ValueError(f"proportion 必须在 [0, 0.5) 内: {proportion}")
+        n = self.count
+        if n == 0:
+            return None
+        lower, upper = proportion * n, (1 - proportion) * n
+        cdf = np.cumsum(self.counts)
+        before = cdf - self.counts
+        # 每个 bin 落在 [lower, upper] 之间的计数
+        kept = np.clip(np.minimum(cdf, upper) - np.maximum(before, lower), 0, None)
+        centers = self.lo + (np.arange(self.bins) + 0.5) * self.bin_width
+        return float((kept * centers).sum() / kept.sum())
+
+    def mode(self, bandwidth: float = 1.0) -> Optional[float]:
+        """
+        众数: 直方图先用 sigma = bandwidth (灰度级) 的高斯核平滑，取峰值 bin，
+        再用峰值及左右相邻 bin 拟合抛物线，得到 bin 内的亚 bin 精度位置。
+        """
+        if self.count == 0:
+            return None
+        smoothed = self.counts.astype(np.float64)
+        sigma_bins = bandwidth / self.bin_width
+        if sigma_bins > 0:
+            radius = int(np.ceil(3 * sigma_bins))
+            x = np.arange(-radius, radius + 1)
+            kernel = np.exp(-0.5 * (x / sigma_bins) ** 2)
+            smoothed = np.convolve(smoothed, kernel / kernel.sum(), mode='same')
+
+        k = int(np.argmax(smoothed))
+        offset = 0.0
+        if 0 < k < self.bins - 1:
+            left, center, right = smoothed[k - 1], smoothed[k], smoothed[k + 1]
+            denom = left - 2 * center + right
+            if denom != 0:
+                offset = 0.5 * (left - right) / denom
+        return self.lo + (k + 0.5 + offset) * self.bin_width
+
+ESTIMATORS: Dict[str, Callable[[StreamingHistogram], Optional[float]]] = {
+    'median': StreamingHistogram.median,
+    'trimmed_mean': StreamingHistogram.trimmed_mean,
+    'mode': StreamingHistogram.mode,
+}
+
+# 分块累加时每块的采样数，限制临时数组的大小
+CHUNK_SIZE = 1 << 20
+
+def estimate_from_histogram(hist: StreamingHistogram, estimator: str = 'mean', **kwargs) -> Optional[float]:
+    """
+    由已累加好的流式直方图估计阈值 (不需要采样值本身)。
+    'mean' 取 total / count，与对全部采样值直接求均值可能相差浮点舍入误差。
+
+    返回:
+        Optional[float]: 阈值，直方图为空时为 None
+    """
+    if estimator == 'mean':
+        return hist.mean()
+    if estimator not in ESTIMATORS:
+        raise ValueError(f"未知的估计方法: {estimator} (可选: mean, {', '.join(ESTIMATORS)})")
+    return ESTIMATORS[estimator](hist, **kwargs)
+
+def estimate_threshold(
+    boundary_samples: np.ndarray,
+    estimator: str = 'mean',
+    bins: int = DEFAULT_BINS,
+    value_range: Tuple[float, float] = (0.0, 256.0),
+    **kwargs
+) -> Optional[float]:
+    """
+    由边界采样值估计阈值。
+
+    参数:
+        boundary_samples (np.ndarray): 采样值
+        estimator (str): 'mean' (精确均值，与原实现相同)、'median'、'trimmed_mean' 或 'mode'
+        bins (int): 流式直方图的 bin 数
+        value_range (Tuple[float, float]): 流式直方图的范围 (16 位图像为 (0, 65536)，见 histogram.image_value_range)
+        **kwargs: 传给估计方法 (如 trimmed_mean 的 proportion、mode 的 bandwidth)
+
+    返回:
+        Optional[float]: 阈值，没有采样点时为 None
+    """
+    if len(boundary_samples) == 0:
+        return None
+    if estimator == 'mean':
+        return float(np.mean(boundary_samples, dtype=np.float64))
+    if estimator not in ESTIMATORS:
+        raise ValueError(f"未知的估计方法: {estimator} (可选: mean, {', '.join(ESTIMATORS)})")
+
+    chunks = (boundary_samples[i:i + CHUNK_SIZE] for i in range(0, len(boundary_samples), CHUNK_SIZE))
+    hist = StreamingHistogram.from_chunks(chunks, bins=bins, value_range=value_range)
+    return estimate_from_histogram(hist, estimator, **kwargs)
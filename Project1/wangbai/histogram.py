@@ -0,0 +1,235 @@
+from dataclasses import dataclass
+from typing import List, Optional, Tuple
+
+import cv2
+import numpy as np
+
+from .otsu import otsu_from_histograms
+
+# 多阈值 Otsu 是 O(n * L^2)，bin 数超过该值时先合并相邻 bin
+MULTI_OTSU_MAX_BINS = 1024
+
+# 分块统计时每块的像素数，索引计算的临时数组大小与图像无关
+_CHUNK_PIXELS = 1 << 20
+
+def image_value_range(image: np.ndarray) -> Tuple[float, float]:
+    """
+    图像灰度值的 [lo, hi) 范围: 整数类型取该类型的完整范围 (uint8 为 [0, 256)，uint16 为 [0, 65536))，
+    浮点类型取实际的最小值到略大于最大值。
+    """
+    if np.issubdtype(image.dtype, np.integer):
+        info = np.iinfo(image.dtype)
+        return float(info.min), float(info.max) + 1.0
+    lo, hi = float(np.min(image)), float(np.max(image))
+    return lo, float(np.nextafter(hi, np.inf)) if hi > lo else lo + 1.0
+
+def _row_chunks(image: np.ndarray):
+    flat = image.reshape(-1, image.shape[-1]) if image.ndim > 1 else image.reshape(1, -1)
+    rows = max(1, _CHUNK_PIXELS // max(flat.shape[1], 1))
+    for start in range(0, flat.shape[0], rows):
+        yield flat[start:start + rows].ravel()
+
+@dataclass
+class GrayHistogram:
+    """
+    灰度直方图: 只对图像做一次统计，Otsu、Kapur、多阈值方法和绘图都复用这一份结果。
+
+    属性:
+        counts (np.ndarray): (L,) 每个 bin 的像素数
+        edges (np.ndarray): (L+1,) bin 边界
+    """
+    counts: np.ndarray
+    edges: np.ndarray
+
+    @classmethod
+    def from_image(
+        cls,
+        image_gray: np.ndarray,
+        bins: Optional[int] = None,
+        value_range: Optional[Tuple[float, float]] = None
+    ) -> 'GrayHistogram':
+        """
+        计算灰度直方图。
+
+        - uint8 且不指定 bins / value_range: 256-bin (cv2.calcHist)，与原实现相同
+        - 其他整数类型默认每个灰度级一个 bin (uint16 为 65536 bin)
+        - 浮点类型默认在 [最小值, 最大值] 上取 256 bin
+        统计按块做 bincount，不会把整幅图像转换为 float64 / int64。
+
+        参数:
+            image_gray (np.ndarray): 灰度图像 (uint8 / uint16 / int16 / float32 ...)
+            bins (Optional[int]): bin 数
+            value_range (Optional[Tuple[float, float]]): 统计范围 [lo, hi)，范围外的值计入首/末 bin
+        """
+        if image_gray.dtype == np.uint8 and bins is None and value_range is None:
+            counts = cv2.calcHist([image_gray], [0], None, [256], [0, 256]).ravel().astype(np.int64)
+            return cls(counts=counts, edges=np.arange(257, dtype=np.float64))
+
+        lo, hi = value_range if value_range is not None else image_value_range(image_gray)
+        integer = np.issubdtype(image_gray.dtype, np.integer)
+        if bins is None:
+            bins = int(hi - lo) if integer else 256
+
+        counts = np.zeros(bins, dtype=np.int64)
+        unit_bins = integer and bins == hi - lo and float(lo).is_integer()
+        scale = bins / (hi - lo)
+        for chunk in _row_chunks(image_gray):
+            if unit_bins:
+                # 每个整数灰度一个 bin: 直接以 (值 - lo) 为索引
+                index = chunk.astype(np.int64) - int(lo)
+            else:
+                index = np.floor((chunk - lo) * scale).astype(np.int64)
+            np.clip(index, 0, bins - 1, out=index)
+            counts += np.bincount(index, minlength=bins)
+        return cls(counts=counts, edges=np.linspace(lo, hi, bins + 1))
+
+    @property
+    def total(self) -> int:
+        return int(self.counts.sum())
+
+    @property
+    def prob(self) -> np.ndarray:
+        """归一化的概率分布"""
+        return self.counts / self.total
+
+    @property
+    def unit_bins(self) -> bool:
+        """是否每个 bin 恰好对应一个整数灰度级 (uint8 的 256 bin、uint16 的 65536 bin)"""
+        return bool(self.edges[0] == np.floor(self.edges[0]) and np.all(np.diff(self.edges) == 1))
+
+    @property
+    def display_range(self) -> Tuple[float, float]:
+        """绘图时的横轴范围 (uint8 为 [0, 255])"""
+        if self.unit_bins:
+            return float(self.edges[0]), float(self.edges[-1] - 1)
+        return float(self.edges[0]), float(self.edges[-1])
+
+    def bin_level(self, index: int, upper: bool = False) -> float:
+        """
+        bin 序号 -> 灰度值。每个 bin 一个整数灰度级时就是该灰度级 (uint8 下即 bin 序号)；
+        否则取 bin 的上边界 (upper) 或下边界。
+        Otsu 类阈值 (> t 为前景) 取 upper=True，Kapur 类阈值 (>= t 为前景) 取 upper=False。
+        """
+        if self.unit_bins:
+            return int(self.edges[index])
+        return float(self.edges[index + 1] if upper else self.edges[index])
+
+    def otsu(self) -> float:
+        """Otsu 阈值 (像素值 > 阈值为前景，与 cv2.THRESH_OTSU 一致)"""
+        return self.bin_level(int(otsu_from_histograms(self.counts).thresholds[0]), upper=True)
+
+    def kapur(self) -> float:
+        """Kapur 最大熵阈值 (背景为 [0, t)，前景为 [t, L))"""
+        return self.bin_level(kapur_from_histogram(self.counts), upper=False)
+
+    def multi_otsu(self, n_thresholds: int) -> List[float]:
+        """
+        多阈值 Otsu，返回递增的 n_thresholds 个阈值 (第 k 类为 (t_{k-1}, t_k])。
+        bin 数超过 MULTI_OTSU_MAX_BINS 时先把相邻 bin 合并，阈值精度为合并后的 bin 宽。
+        """
+        counts = self.counts
+        factor = -(-len(counts) // MULTI_OTSU_MAX_BINS)
+        if factor > 1:
+            padded = np.zeros(-(-len(counts) // factor) * factor, dtype=counts.dtype)
+            padded[:len(counts)] = counts
+            coarse = multi_otsu_from_histogram(padded.reshape(-1, factor).sum(axis=1), n_thresholds)
+            # 合并后的第 k 个 bin 对应原来的最后一个 bin (k + 1) * factor - 1
+            indices = [min((k + 1) * factor - 1, len(counts) - 1) for k in coarse]
+        else:
+            indices = multi_otsu_from_histogram(counts, n_thresholds)
+        return [self.bin_level(i, upper=True) for i in indices]
+
+    def plot(self, ax, **kwargs):
+        """直接由 bin 计数绘制直方图 (不再重新遍历图像)"""
+        kwargs.setdefault('fill', True)
+        return ax.stairs(self.counts, self.edges, **kwargs)
+
+def kapur_from_histogram(counts: np.ndarray) -> int:
+    """
+    Kapur 最大熵阈值，所有候选阈值 t 一次向量化计算。
+
+    对背景 [0, t)，记 P_b = sum(p_i)，S_b = sum(p_i * log p_i)，则
+        H_b = -sum (p_i/P_b) * log(p_i/P_b) = log(P_b) - S_b / P_b
+    前景同理 (P_f = 1 - P_b)。总熵最大的 t 即为阈值。
+
+    参数:
+        counts (np.ndarray): (L,) 直方图
+
+    返回:
+        int: Kapur 阈值
+    """
+    return int(kapur_from_histograms(counts[None, :])[0])
+
+def kapur_from_histograms(hists: np.ndarray) -> np.ndarray:
+    """
+    批量 Kapur 阈值: 对 (N, L) 的每一行直方图 (例如多通道图像的各通道) 一次计算。
+
+    参数:
+        hists (np.ndarray): (N, L) 直方图
+
+    返回:
+        np.ndarray: (N,) int64 Kapur 阈值
+    """
+    prob = hists.astype(np.float64) / hists.sum(axis=1, keepdims=True)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        plogp = np.where(prob > 0, prob * np.log(prob), 0.0)
+
+    # 候选阈值 t = 1 ... L-1
+    prob_background = prob.cumsum(axis=1)[:, :-1]
+    plogp_background = plogp.cumsum(axis=1)[:, :-1]
+    prob_foreground = 1.0 - prob_background
+    plogp_foreground = plogp.sum(axis=1, keepdims=True) - plogp_background
+
+    with np.errstate(divide='ignore', invalid='ignore'):
+        entropy_background = np.where(
+            prob_background > 0, np.log(prob_background) - plogp_background / prob_background, 0.0)
+        entropy_foreground = np.where(
+            prob_foreground > 0, np.log(prob_foreground) - plogp_foreground / prob_foreground, 0.0)
+
+    total_entropy = entropy_background + entropy_foreground
+    return np.argmax(total_entropy, axis=1) + 1
+
+def multi_otsu_from_histogram(counts: np.ndarray, n_thresholds: int) -> List[int]:
+    """
+    多阈值 Otsu (动态规划)。
+
+    最大化各类 m_k^2 / w_k 之和 (与最大化类间方差等价)，
+    其中 w_k、m_k 为第 k 类的概率和一阶矩，由累积和 O(1) 得到。
+    复杂度 O(n_thresholds * L^2)，对 L = 256 可以忽略。
+
+    参数:
+        counts (np.ndarray): (L,) 直方图
+        n_thresholds (int): 阈值个数
+
+    返回:
+        List[int]: 递增的阈值列表
+    """
+    L = len(counts)
+    prob = counts.astype(np.float64) / counts.sum()
+    P = np.concatenate([[0.0], prob.cumsum()])
+    S = np.concatenate([[0.0], (prob * np.arange(L)).cumsum()])
+
+    # cost[a, b]: 灰度 [a, b) 作为一类的 m^2 / w (a < b)
+    a = np.arange(L + 1)[:, None]
+    b = np.arange(L + 1)[None, :]
+    w = P[b] - P[a]
+    m = S[b] - S[a]
+    with np.errstate(divide='ignore', invalid='ignore'):
+        cost = np.where((b > a) & (w > 0), m * m / w, 0.0)
+    cost[b <= a] = -np.inf
+
+    # best[j][e]: 把 [0, e) 分成 j+1 类的最大得分
+    best = cost[0].copy()
+    choices = []
+    for _ in range(n_thresholds):
+        scores = best[:, None] + cost
+        choices.append(scores.argmax(axis=0))
+        best = scores.max(axis=0)
+
+    # 回溯: 最后一类以 L 结束
+    thresholds = []
+    end = L
+    for choice in reversed(choices):
+        end = int(choice[end])
+        thresholds.append(end - 1)
+    return sorted(thresholds)
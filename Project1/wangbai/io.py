@@ -0,0 +1,172 @@
+"""
+灰度图像读取与预取。
+
+BMP 直接以 IMREAD_GRAYSCALE 解码 (不先解出彩色再 cvtColor)，结果与 imread + cvtColor(BGR2GRAY)
+逐像素相同；未压缩的 BMP 还可以不经解码，直接把像素区映射为只读的 np.memmap 视图 (map_bmp)，
+页面在首次访问时才从磁盘载入。JPEG、PNG 等格式的解码库直接输出灰度时与 cvtColor 的取整不同
+(例如 characters.jpg 个别像素相差 ±1，Wang & Bai 阈值随之变化)，因此仍先解出彩色再 cvtColor。
+预览时可用 reduce=2/4/8 在解码阶段降采样。
+
+iter_gray_images 在线程池中提前解码后面的若干张图像 (cv2.imread 解码时释放 GIL)，
+与当前图像的计算重叠，同时在内存中的图像数不超过 prefetch + 1 (当前图像 + 预取队列)。
+"""
+
+import struct
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from itertools import islice
+from pathlib import Path
+from typing import Iterable, Iterator, Optional, Tuple
+
+import cv2
+import numpy as np
+
+# 解码阶段降采样的倍数 -> imread 标志 (直接解码为灰度，BMP 使用)
+_REDUCED_FLAGS = {
+    1: cv2.IMREAD_GRAYSCALE,
+    2: cv2.IMREAD_REDUCED_GRAYSCALE_2,
+    4: cv2.IMREAD_REDUCED_GRAYSCALE_4,
+    8: cv2.IMREAD_REDUCED_GRAYSCALE_8,
+}
+
+# 同上，解码为彩色后再 cvtColor (其他格式使用)
+_REDUCED_COLOR_FLAGS = {
+    1: cv2.IMREAD_COLOR,
+    2: cv2.IMREAD_REDUCED_COLOR_2,
+    4: cv2.IMREAD_REDUCED_COLOR_4,
+    8: cv2.IMREAD_REDUCED_COLOR_8,
+}
+
+# BITMAPFILEHEADER (14 字节) 之后紧跟 BITMAPINFOHEADER (至少 40 字节)
+_BMP_FILE_HEADER = struct.Struct('<2sIHHI')
+_BMP_INFO_HEADER = struct.Struct('<IiiHHIIiiII')
+_BI_RGB = 0
+
+def map_bmp(image_path: Path) -> Optional[np.ndarray]:
+    """
+    把未压缩 BMP 的像素区映射为只读数组视图，不做解码和拷贝。
+
+    - 8位灰度调色板 (第 i 项为 (i, i, i))：返回 (H, W) uint8 视图
+    - 24位 BGR：返回 (H, W, 3) uint8 视图
+    BMP 默认自下而上存储，视图用负的行步长翻转；每行补齐到 4 字节的填充被切掉。
+
+    参数:
+        image_path (Path): 图像路径
+
+    返回:
+        Optional[np.ndarray]: 像素视图；压缩、非灰度调色板或其他位深的 BMP 返回 None
+    """
+    path = Path(image_path)
+    try:
+        with open(path, 'rb') as f:
+            header = f.read(_BMP_FILE_HEADER.size + _BMP_INFO_HEADER.size + 256 * 4)
+        file_size = path.stat().st_size
+    except OSError:
+        return None
+    if len(header) < _BMP_FILE_HEADER.size + _BMP_INFO_HEADER.size:
+        return None
+
+    magic, _, _, _, data_offset = _BMP_FILE_HEADER.unpack_from(header)
+    (info_size, width, height, _, bit_count, compression,
+     _, _, _, colors_used, _) = _BMP_INFO_HEADER.unpack_from(header, _BMP_FILE_HEADER.size)
+    if magic != b'BM' or info_size < _BMP_INFO_HEADER.size or compression != _BI_RGB or width <= 0 or height == 0:
+        return None
+
+    if bit_count == 8:
+        palette_offset = _BMP_FILE_HEADER.size + info_size
+        n_colors = colors_used or 256
+        if n_colors != 256 or len(header) < palette_offset + 256 * 4:
+            return None
+        palette = np.frombuffer(header, dtype=np.uint8, count=256 * 4, offset=palette_offset).reshape(256, 4)
+        if not (palette[:, :3] == np.arange(256, dtype=np.uint8)[:, None]).all():
+            return None
+        channels = 1
+    elif bit_count == 24:
+        channels = 3
+    else:
+        return None
+
+    rows = abs(height)
+    stride = (width * bit_count + 31) // 32 * 4
+    if data_offset + rows * stride > file_size:
+        return None
+
+    pixels = np.memmap(path, dtype=np.uint8, mode='r', offset=data_offset, shape=(rows, stride))
+    view = pixels[:, :width * channels]
+    if channels == 3:
+        view = view.reshape(rows, width, 3)
+    # height > 0 表示自下而上存储
+    return view[::-1] if height > 0 else view
+
+def read_gray(
+    image_path: Path,
+    reduce: int = 1,
+    use_mmap: bool = True,
+    keep_depth: bool = False
+) -> Optional[np.ndarray]:
+    """
+    把图像解码为 8位灰度图，结果与 imread + cvtColor(BGR2GRAY) 逐像素相同。
+
+    未压缩的 8位灰度 BMP 直接返回内存映射的只读视图 (零解码、零拷贝)；
+    24位 BMP 在映射的 BGR 视图上做一次 cvtColor；其他 BMP 直接以 IMREAD_GRAYSCALE 解码。
+    JPEG、PNG 等格式直接解码为灰度时会有 ±1 的差异，因此先解出彩色再 cvtColor。
+
+    参数:
+        image_path (Path): 图像路径
+        reduce (int): 解码时的降采样倍数 (1、2、4、8)，预览用
+        use_mmap (bool): 是否对 BMP 使用内存映射 (为 False 时总是返回可写的新数组)
+        keep_depth (bool): 保留 16 位 / 浮点图像 (PNG、TIFF 等) 的原始位深，否则缩放为 8 位
+
+    返回:
+        Optional[np.ndarray]: 灰度图像，读取失败时为 None
+    """
+    if reduce not in _REDUCED_FLAGS:
+        raise ValueError(f"reduce 必须是 {sorted(_REDUCED_FLAGS)} 之一: {reduce}")
+    if use_mmap and reduce == 1 and Path(image_path).suffix.lower() == '.bmp':
+        view = map_bmp(image_path)
+        if view is not None:
+            return view if view.ndim == 2 else cv2.cvtColor(view, cv2.COLOR_BGR2GRAY)
+    depth_flag = cv2.IMREAD_ANYDEPTH if keep_depth else 0
+    if Path(image_path).suffix.lower() == '.bmp':
+        return cv2.imread(str(image_path), _REDUCED_FLAGS[reduce] | depth_flag)
+    image = cv2.imread(str(image_path), _REDUCED_COLOR_FLAGS[reduce] | depth_flag)
+    return None if image is None else cv2.cvtColor(image, cv2.COLOR_BGR2GRAY)
+
+def iter_gray_images(
+    image_paths: Iterable[Path],
+    prefetch: int = 4,
+    workers: int = 2,
+    reduce: int = 1
+) -> Iterator[Tuple[Path, Optional[np.ndarray]]]:
+    """
+    按输入顺序逐张产出 (路径, 灰度图像)，同时在后台预取后面最多 prefetch 张。
+
+    读取失败的图像产出 None，不中断迭代。提前结束迭代 (break) 时未开始的解码任务会被取消。
+
+    参数:
+        image_paths: 图像路径 (可以是惰性的迭代器)
+        prefetch (int): 预取的图像数
+        workers (int): 解码线程数
+        reduce (int): 解码时的降采样倍数，见 read_gray
+
+    返回:
+        Iterator[Tuple[Path, Optional[np.ndarray]]]
+    """
+    if reduce not in _REDUCED_FLAGS:
+        raise ValueError(f"reduce 必须是 {sorted(_REDUCED_FLAGS)} 之一: {reduce}")
+    paths = iter(image_paths)
+    pending = deque()
+    with ThreadPoolExecutor(max_workers=workers) as pool:
+        try:
+            for path in islice(paths, max(prefetch, 1)):
+                pending.append((path, pool.submit(read_gray, path, reduce)))
+            while pending:
+                path, future = pending.popleft()
+                # 先补上一个预取任务，再等待当前图像，使解码与调用方的计算重叠
+                next_path = next(paths, None)
+                if next_path is not None:
+                    pending.append((next_path, pool.submit(read_gray, next_path, reduce)))
+                yield Path(path), future.result()
+        finally:
+            for _, future in pending:
+                future.cancel()
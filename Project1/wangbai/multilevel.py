@@ -0,0 +1,68 @@
+from typing import List
+
+import numpy as np
+
+from .histogram import image_value_range
+
+def find_multilevel_thresholds_kmeans(
+    boundary_samples: np.ndarray,
+    n_clusters: int
+) -> List[float]:
+    """
+    使用 K-Means 聚类寻找多个阈值 (各簇均值，升序)。
+    """
+    if len(boundary_samples) < n_clusters or len(boundary_samples) == 0:
+        return []
+
+    # sklearn 导入较慢，只在需要聚类时加载
+    from sklearn.cluster import KMeans
+
+    X = np.asarray(boundary_samples, dtype=np.float64).reshape(-1, 1)
+    kmeans = KMeans(n_clusters=n_clusters, n_init=10, random_state=42)
+    kmeans.fit(X)
+
+    # 聚类中心 (即“簇的均值”) 就是阈值
+    centers = kmeans.cluster_centers_.flatten()
+    return sorted(list(centers))
+
+def segment_image_by_thresholds(
+    image_gray: np.ndarray,
+    thresholds: List[float],
+    background_upper_offset: float = 30.0,
+    lower_offset: float = 20.0,
+    upper_offset: float = 0.0
+) -> List[np.ndarray]:
+    """
+    使用一个阈值列表来分割图像，返回多个二值掩码 (0 或 255)。
+
+    分段边界为 [lo, t1, t2, ..., hi]，[lo, hi) 为图像类型的灰度范围 (uint8 为 [0, 256)，
+    uint16 为 [0, 65536)，浮点为实际取值范围)；偏移与灰度值同单位。第 k 段的区间按经验偏移修正:
+        第一段 (背景): 取 [0, t1 - background_upper_offset] 之外的像素
+        其他分段:      (lower - lower_offset, upper - upper_offset]
+
+    参数:
+        image_gray (np.ndarray): 灰度图像
+        thresholds (List[float]): 阈值
+        background_upper_offset (float): 背景段上界的偏移
+        lower_offset (float): 其他分段下界的偏移
+        upper_offset (float): 其他分段上界的偏移
+
+    返回:
+        List[np.ndarray]: len(thresholds) + 1 个 uint8 掩码
+    """
+    lo, hi = image_value_range(image_gray)
+    bounds = [lo] + sorted(thresholds) + [hi]
+
+    segments = []
+    for i in range(len(bounds) - 1):
+        lower_bound = bounds[i]
+        upper_bound = bounds[i+1]
+
+        if i == 0:
+            mask = ~((image_gray >= lower_bound) & (image_gray <= upper_bound - background_upper_offset))
+        else:
+            mask = (image_gray > lower_bound - lower_offset) & (image_gray <= upper_bound - upper_offset)
+
+        segments.append((mask * 255).astype(np.uint8))
+
+    return segments
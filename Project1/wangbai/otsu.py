@@ -0,0 +1,79 @@
+from dataclasses import dataclass
+from typing import Iterable, Union
+
+import cv2
+import numpy as np
+
+# 与 OpenCV 的 Otsu 实现相同, 忽略某一类概率过小的候选阈值
+_FLT_EPSILON = np.finfo(np.float32).eps
+
+@dataclass
+class OtsuResult:
+    """
+    批量 Otsu 的结果。
+
+    属性:
+        thresholds (np.ndarray): (N,) 每张图像的最佳阈值 (像素值 > 阈值为前景, 与 cv2.THRESH_OTSU 一致)
+        variances (np.ndarray): (N, 256) 每个候选阈值的类间方差曲线
+        histograms (np.ndarray): (N, 256) 每张图像的灰度直方图
+    """
+    thresholds: np.ndarray
+    variances: np.ndarray
+    histograms: np.ndarray
+
+def batch_histograms(images: Union[np.ndarray, Iterable[np.ndarray]]) -> np.ndarray:
+    """
+    批量计算 8 位灰度图像的 256-bin 直方图。
+
+    参数:
+        images: (N, H, W) 的 uint8 图像栈，或任意 uint8 图像的可迭代对象 (尺寸可不同)
+
+    返回:
+        np.ndarray: (N, 256) int64 直方图
+    """
+    # cv2.calcHist 单次调用开销很小，逐张统计比拼接后 bincount 更快，也不需要额外的临时数组
+    hists = [cv2.calcHist([img], [0], None, [256], [0, 256]).ravel() for img in images]
+    return np.array(hists, dtype=np.int64).reshape(-1, 256)
+
+def otsu_from_histograms(hists: np.ndarray) -> OtsuResult:
+    """
+    由直方图批量计算 Otsu 阈值: 所有图像、所有候选阈值的类间方差用一个向量化表达式求出。
+
+    参数:
+        hists (np.ndarray): (N, L) 或 (L,) 直方图
+
+    返回:
+        OtsuResult
+    """
+    hists = np.atleast_2d(hists)
+    levels = np.arange(hists.shape[1], dtype=np.float64)
+
+    prob = hists / hists.sum(axis=1, keepdims=True)
+    q1 = prob.cumsum(axis=1)                       # 背景 (<= t) 概率
+    q2 = 1.0 - q1                                  # 前景 (> t) 概率
+    cum_mu = (prob * levels).cumsum(axis=1)
+    mu_total = cum_mu[:, -1:]
+
+    with np.errstate(divide='ignore', invalid='ignore'):
+        mu1 = cum_mu / q1
+        mu2 = (mu_total - cum_mu) / q2
+        variances = q1 * q2 * (mu1 - mu2) ** 2
+
+    valid = (np.minimum(q1, q2) >= _FLT_EPSILON) & (np.maximum(q1, q2) <= 1.0 - _FLT_EPSILON)
+    variances = np.where(valid, variances, 0.0)
+
+    # argmax 取第一个最大值, 与 OpenCV 的严格大于比较一致
+    thresholds = variances.argmax(axis=1)
+    return OtsuResult(thresholds=thresholds, variances=variances, histograms=hists)
+
+def batch_otsu(images: Union[np.ndarray, Iterable[np.ndarray]]) -> OtsuResult:
+    """
+    批量 Otsu 阈值。
+
+    参数:
+        images: (N, H, W) uint8 图像栈，或 uint8 图像的可迭代对象
+
+    返回:
+        OtsuResult
+    """
+    return otsu_from_histograms(batch_histograms(images))
@@ -0,0 +1,235 @@
+"""
+纯计算流程: 输入灰度图像，返回结果对象，不读写文件也不打印。
+各脚本 (以及服务) 在此之上负责 I/O 与展示。
+"""
+
+from dataclasses import dataclass, field
+from functools import partial
+from typing import Dict, List, Optional, Tuple
+
+import cv2
+import numpy as np
+
+from .bands import boundary_sample_histogram, parallel_boundary_samples, parallel_derivatives
+from .derivatives import calculate_image_derivatives
+from .estimators import StreamingHistogram, estimate_from_histogram, estimate_threshold
+from .histogram import GrayHistogram
+from .multilevel import find_multilevel_thresholds_kmeans, segment_image_by_thresholds
+from .sampling import find_boundary_sample_points, find_boundary_sample_points_sparse
+
+@dataclass
+class ComparisonResult:
+    """
+    单张图像上 Wang & Bai / Otsu / Kapur 三种阈值的对比结果。
+
+    属性:
+        thresholds (Dict[str, Optional[float]]): 'wang_bai' (失败时为 None)、'otsu'、'kapur'
+        binaries (Dict[str, np.ndarray]): 对应的二值图像 (Wang & Bai 失败时为全黑)
+        boundary_samples (np.ndarray): 边界采样灰度值 (keep_samples=False 时为空数组)
+        T_g (float): 实际使用的梯度阈值 (可能是回退值)
+        histogram (GrayHistogram): 全局直方图
+        n_samples (int): 边界采样点数 (不保留采样值时也有效)
+    """
+    thresholds: Dict[str, Optional[float]]
+    binaries: Dict[str, np.ndarray]
+    boundary_samples: np.ndarray
+    T_g: float
+    histogram: GrayHistogram
+    n_samples: int = 0
+
+@dataclass
+class MultilevelResult:
+    """
+    多阈值 (K-Means) 分割结果。
+
+    属性:
+        thresholds (List[float]): 各簇均值 (升序)，失败时为空
+        segments (List[np.ndarray]): 各分段的二值掩码
+        boundary_samples (np.ndarray): 边界采样灰度值
+        T_g (float): 实际使用的梯度阈值 (可能是回退值)
+    """
+    thresholds: List[float]
+    segments: List[np.ndarray] = field(default_factory=list)
+    boundary_samples: np.ndarray = field(default_factory=lambda: np.empty(0))
+    T_g: float = 0.0
+
+def sample_boundary(
+    image_gray: np.ndarray,
+    T_g: float,
+    fallback_T_g: Optional[float] = None,
+    derivatives_out: Optional[Tuple[np.ndarray, np.ndarray]] = None,
+    workers: int = 1,
+    block_size: Optional[int] = None
+) -> Tuple[np.ndarray, float]:
+    """
+    计算导数并做边界采样；在 T_g 下没有采样点时用 fallback_T_g 再试一次。
+    derivatives_out 为可选的 (梯度, 拉普拉斯) 预分配缓冲区；
+    workers > 1 时按行带在线程池中并行 (结果与单线程一致)；
+    给出 block_size 时采样改用块稀疏扫描 (结果同样一致，见 find_boundary_sample_points_sparse)，
+    两者同时给出时每个行带内部做块稀疏扫描。
+
+    返回:
+        (boundary_samples, 实际使用的 T_g)
+    """
+    gradient_magnitude, laplacian_image = _derivatives(image_gray, derivatives_out, workers)
+    if workers > 1:
+        sampler = partial(parallel_boundary_samples, workers=workers, block_size=block_size)
+    else:
+        sampler = find_boundary_sample_points
+        if block_size is not None:
+            sampler = partial(find_boundary_sample_points_sparse, block_size=block_size)
+
+    boundary_samples = sampler(image_gray, gradient_magnitude, laplacian_image, T_g)
+    if len(boundary_samples) == 0 and fallback_T_g is not None:
+        T_g = fallback_T_g
+        boundary_samples = sampler(image_gray, gradient_magnitude, laplacian_image, T_g)
+    return boundary_samples, T_g
+
+def _derivatives(image_gray, derivatives_out, workers):
+    if workers > 1:
+        return parallel_derivatives(image_gray, workers, out=derivatives_out)
+    return calculate_image_derivatives(image_gray, out=derivatives_out)
+
+def stream_boundary(
+    image_gray: np.ndarray,
+    T_g: float,
+    fallback_T_g: Optional[float] = None,
+    derivatives_out: Optional[Tuple[np.ndarray, np.ndarray]] = None,
+    workers: int = 1,
+    block_size: Optional[int] = None,
+    value_range: Optional[Tuple[float, float]] = None
+) -> Tuple[StreamingHistogram, float]:
+    """
+    与 sample_boundary 相同的采样与回退规则，但采样值逐行带累加进 StreamingHistogram，
+    不保留完整的采样数组 (见 bands.boundary_sample_histogram)。
+
+    返回:
+        (采样值直方图, 实际使用的 T_g)
+    """
+    gradient_magnitude, laplacian_image = _derivatives(image_gray, derivatives_out, workers)
+    accumulate = partial(boundary_sample_histogram, workers=workers, block_size=block_size, value_range=value_range)
+    hist = accumulate(image_gray, gradient_magnitude, laplacian_image, T_g)
+    if hist.count == 0 and fallback_T_g is not None:
+        T_g = fallback_T_g
+        hist = accumulate(image_gray, gradient_magnitude, laplacian_image, T_g)
+    return hist, T_g
+
+def wang_bai_threshold(
+    boundary_samples: np.ndarray,
+    estimator: str = 'mean',
+    value_range: Tuple[float, float] = (0.0, 256.0)
+) -> Optional[float]:
+    """
+    由边界采样值估计阈值，没有采样点时返回 None。
+    estimator 默认为论文中的均值，也可选 'median'、'trimmed_mean'、'mode' (见 wangbai.estimators)；
+    value_range 为这些直方图估计的灰度范围。
+    """
+    return estimate_threshold(boundary_samples, estimator, value_range=value_range)
+
+def _binarize(image_gray: np.ndarray, threshold: float, dst: Optional[np.ndarray] = None) -> np.ndarray:
+    """像素值 > threshold 为 255，否则为 0；输出总是 uint8"""
+    if image_gray.dtype == np.uint8:
+        return cv2.threshold(image_gray, threshold, 255, cv2.THRESH_BINARY, dst=dst)[1]
+    if dst is None:
+        dst = np.empty(image_gray.shape, dtype=np.uint8)
+    np.multiply(image_gray > threshold, 255, out=dst, dtype=np.uint8)
+    return dst
+
+def compare_thresholds(
+    image_gray: np.ndarray,
+    T_g: float,
+    fallback_T_g: Optional[float] = None,
+    derivatives_out: Optional[Tuple[np.ndarray, np.ndarray]] = None,
+    binaries_out: Optional[Dict[str, np.ndarray]] = None,
+    workers: int = 1,
+    estimator: str = 'mean',
+    block_size: Optional[int] = None,
+    keep_samples: bool = False
+) -> ComparisonResult:
+    """
+    计算 Wang & Bai、Otsu、Kapur 三种阈值及其二值化结果。
+    uint16 / float32 图像使用大 bin 数的直方图 (见 GrayHistogram.from_image)，二值图仍为 uint8。
+
+    参数:
+        image_gray (np.ndarray): 灰度图像 (uint8、uint16、float32 等)
+        T_g (float): 梯度阈值
+        fallback_T_g (Optional[float]): 找不到边界点时改用的梯度阈值
+        derivatives_out: 可选的 (梯度, 拉普拉斯) 预分配缓冲区 (uint8 图像为 float64)
+        binaries_out: 可选的 {'wang_bai', 'otsu', 'kapur'} uint8 预分配缓冲区
+        workers (int): 单张图像内的行带并行线程数
+        estimator (str): Wang & Bai 阈值的估计方法 ('mean'、'median'、'trimmed_mean'、'mode')
+        block_size (Optional[int]): 块稀疏边界采样的块边长，None 为逐像素扫描整幅图像
+            (与 workers > 1 可同时使用)
+        keep_samples (bool): 是否保留完整的采样数组 (绘制采样直方图时需要)；默认不保留，
+            采样值逐行带累加进流式直方图 (见 stream_boundary)，内存与采样点数无关，
+            'mean' 与对完整数组求均值可能相差浮点舍入误差
+
+    返回:
+        ComparisonResult
+    """
+    binaries_out = binaries_out or {}
+
+    # 全局直方图只统计一次，Otsu、Kapur 和绘图共用
+    histogram = GrayHistogram.from_image(image_gray)
+    otsu_thresh = float(histogram.otsu())
+    kapur_thresh = histogram.kapur()
+    value_range = (histogram.edges[0], histogram.edges[-1])
+    if keep_samples:
+        boundary_samples, used_T_g = sample_boundary(image_gray, T_g, fallback_T_g, derivatives_out, workers, block_size)
+        n_samples = len(boundary_samples)
+        wang_bai_thresh = wang_bai_threshold(boundary_samples, estimator, value_range=value_range)
+    else:
+        sample_hist, used_T_g = stream_boundary(image_gray, T_g, fallback_T_g, derivatives_out, workers, block_size,
+                                                value_range=value_range)
+        n_samples = sample_hist.count
+        boundary_samples = np.empty(0, dtype=np.float64)
+        wang_bai_thresh = estimate_from_histogram(sample_hist, estimator)
+
+    binary_otsu = _binarize(image_gray, otsu_thresh, binaries_out.get('otsu'))
+    binary_kapur = _binarize(image_gray, kapur_thresh, binaries_out.get('kapur'))
+    if wang_bai_thresh is not None:
+        binary_wang_bai = _binarize(image_gray, wang_bai_thresh, binaries_out.get('wang_bai'))
+    elif 'wang_bai' in binaries_out:
+        binary_wang_bai = binaries_out['wang_bai']
+        binary_wang_bai.fill(0)
+    else:
+        binary_wang_bai = np.zeros(image_gray.shape, dtype=np.uint8)
+
+    return ComparisonResult(
+        thresholds={'wang_bai': wang_bai_thresh, 'otsu': otsu_thresh, 'kapur': kapur_thresh},
+        binaries={'wang_bai': binary_wang_bai, 'otsu': binary_otsu, 'kapur': binary_kapur},
+        boundary_samples=boundary_samples,
+        T_g=used_T_g,
+        histogram=histogram,
+        n_samples=n_samples,
+    )
+
+def multilevel_segment(
+    image_gray: np.ndarray,
+    n_clusters: int,
+    T_g: float,
+    fallback_T_g: Optional[float] = None,
+    workers: int = 1,
+    block_size: Optional[int] = None,
+    **segment_kwargs
+) -> MultilevelResult:
+    """
+    多阈值分割: 边界采样 -> K-Means 聚类得到 n_clusters 个阈值 -> 分段掩码。
+
+    参数:
+        image_gray (np.ndarray): 8位灰度图像
+        n_clusters (int): 聚类数 (阈值个数)
+        T_g (float): 梯度阈值
+        fallback_T_g (Optional[float]): 找不到边界点时改用的梯度阈值
+        workers (int): 单张图像内的行带并行线程数
+        block_size (Optional[int]): 块稀疏边界采样的块边长，见 compare_thresholds
+        **segment_kwargs: 传给 segment_image_by_thresholds 的边界偏移
+
+    返回:
+        MultilevelResult (采样或聚类失败时 thresholds 为空)
+    """
+    boundary_samples, used_T_g = sample_boundary(image_gray, T_g, fallback_T_g, workers=workers, block_size=block_size)
+    thresholds = find_multilevel_thresholds_kmeans(boundary_samples, n_clusters)
+    segments = segment_image_by_thresholds(image_gray, thresholds, **segment_kwargs) if thresholds else []
+    return MultilevelResult(thresholds=thresholds, segments=segments,
+                            boundary_samples=boundary_samples, T_g=used_T_g)
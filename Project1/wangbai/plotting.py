@@ -0,0 +1,24 @@
+"""
+绘图后端的延迟加载。
+
+matplotlib (及 pyplot 的后端初始化) 的导入开销远大于 cv2/numpy，
+只计算阈值的调用 (批处理工作进程、服务) 不应承担这部分开销，
+因此各脚本在真正绘图时才通过 get_pyplot() 取得 pyplot。
+"""
+
+_pyplot = None
+
+def get_pyplot():
+    """
+    首次调用时导入 matplotlib.pyplot 并设置中文字体，之后直接返回缓存的模块。
+
+    返回:
+        module: matplotlib.pyplot
+    """
+    global _pyplot
+    if _pyplot is None:
+        import matplotlib.pyplot as plt
+        plt.rcParams['font.sans-serif'] = ['SimHei']
+        plt.rcParams['axes.unicode_minus'] = False
+        _pyplot = plt
+    return _pyplot
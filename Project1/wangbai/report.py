@@ -0,0 +1,459 @@
+"""
+复现脚本的 I/O 层: 读图、打印过程信息、保存二值图与对比图表、打印总结报告。
+计算全部委托给 wangbai.pipeline。
+"""
+
+import os
+import sqlite3
+import time
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+
+import cv2
+import numpy as np
+
+from .bundle import DEFAULT_OUTPUT_MODE, OUTPUT_MODES, save_bundle
+from .histogram import GrayHistogram
+from .io import read_gray
+from .pipeline import ComparisonResult, MultilevelResult, compare_thresholds, multilevel_segment
+from .plotting import get_pyplot
+from .store import DEFAULT_DB_PATH, ResultStore
+
+def read_gray_image(image_path: Path) -> Optional[np.ndarray]:
+    """读取图像并直接解码为灰度，失败时返回 None"""
+    return read_gray(image_path)
+
+def _report_sampling(T_g: float, fallback_T_g: Optional[float], used_T_g: float, n_samples: int, fail_message: str):
+    """打印边界采样过程 (包括回退到 fallback_T_g 的情况)"""
+    if used_T_g != T_g:
+        print(f"     未找到边界点。尝试更低的 T_g = {fallback_T_g} ...")
+    if n_samples:
+        print(f"     找到 {n_samples} 个边界点。")
+    else:
+        print(fail_message)
+
+def _check_output_mode(output_mode: str):
+    if output_mode not in OUTPUT_MODES:
+        raise ValueError(f"未知的输出方式: {output_mode} (可选: {', '.join(OUTPUT_MODES)})")
+
+def _figure_enabled(output_mode: str, save_figure: Optional[bool]) -> bool:
+    """
+    是否生成 300 dpi 的对比图。save_figure 为 None 时看环境变量 WANGBAI_SAVE_FIGURE ('1'/'0')，
+    未设置则只在 'png' 输出方式下生成 (bundle 方式默认不画图，也就不会加载 matplotlib)。
+    """
+    if save_figure is not None:
+        return save_figure
+    env = os.environ.get('WANGBAI_SAVE_FIGURE')
+    if env is not None:
+        return env not in ('', '0')
+    return output_mode == 'png'
+
+def _record_run(results_db: Optional[Path], **record):
+    """把结果追加到结果数据库 (results_db 为 None 时不记录)，写入失败只打印警告"""
+    if results_db is None:
+        return
+    try:
+        with ResultStore(results_db) as store:
+            store.record_run(**record)
+    except sqlite3.Error as e:
+        print(f"  [警告] 无法写入结果数据库 {results_db}: {e}")
+
+def generate_comparison_plots(
+    image_name: str,
+    image_gray: np.ndarray,
+    result: ComparisonResult,
+    output_dir: Path
+):
+    """
+    生成并保存所有对比图表。
+    """
+    plt = get_pyplot()
+    boundary_samples = result.boundary_samples
+    # 横轴范围随图像类型 (uint8 为 [0, 255]，16 位图像为 [0, 65535])
+    xlim = result.histogram.display_range
+    thresholds = result.thresholds
+    binaries = result.binaries
+
+    # --- 1. 综合对比图 (2x3) ---
+    fig, axes = plt.subplots(2, 3, figsize=(18, 11))
+    fig.suptitle(f'"{image_name}" 图像阈值分割方法对比', fontsize=18)
+
+    # --- 第一行 ---
+
+    # [0, 0] 原始图像
+    axes[0, 0].imshow(image_gray, cmap='gray')
+    axes[0, 0].set_title(f'原始图像')
+    axes[0, 0].axis('off')
+
+    # [0, 1] 全局直方图
+    result.histogram.plot(axes[0, 1], alpha=0.7, color='darkblue')
+    axes[0, 1].set_title('全局直方图 (整图)')
+    axes[0, 1].set_xlabel('灰度级')
+    axes[0, 1].set_ylabel('像素数量')
+    axes[0, 1].grid(True, linestyle='--', alpha=0.3)
+    axes[0, 1].set_xlim(xlim)
+
+    # [0, 2] 边界点直方图
+    if len(boundary_samples):
+        axes[0, 2].hist(boundary_samples, bins=50, alpha=0.9, color='darkgreen')
+        axes[0, 2].set_title(f'边界采样直方图 (N={len(boundary_samples)})')
+        axes[0, 2].set_xlabel('灰度级')
+        axes[0, 2].set_ylabel('采样点数量')
+        axes[0, 2].grid(True, linestyle='--', alpha=0.3)
+        axes[0, 2].set_xlim(xlim)
+    else:
+        axes[0, 2].text(0.5, 0.5, '未找到边界采样点', ha='center', va='center', fontsize=12, color='red')
+        axes[0, 2].set_title('边界采样直方图')
+        axes[0, 2].set_xlim(xlim)
+
+    # 在直方图上绘制阈值线
+    if thresholds['wang_bai'] is not None:
+        axes[0, 1].axvline(thresholds['wang_bai'], color='red', linestyle='--', label=f"Wang&Bai: {thresholds['wang_bai']:.1f}")
+        axes[0, 2].axvline(thresholds['wang_bai'], color='red', linestyle='--', linewidth=2)
+    axes[0, 1].axvline(thresholds['otsu'], color='cyan', linestyle=':', label=f"Otsu: {thresholds['otsu']:.1f}")
+    axes[0, 1].axvline(thresholds['kapur'], color='yellow', linestyle=':', label=f"Kapur: {thresholds['kapur']:.1f}")
+    axes[0, 1].legend()
+
+    # --- 第二行: 分割结果 ---
+
+    # [1, 0] Otsu
+    axes[1, 0].imshow(binaries['otsu'], cmap='gray')
+    axes[1, 0].set_title(f"Otsu 方法 (t = {thresholds['otsu']:.0f})")
+    axes[1, 0].axis('off')
+
+    # [1, 1] Kapur
+    axes[1, 1].imshow(binaries['kapur'], cmap='gray')
+    axes[1, 1].set_title(f"Kapur 方法 (t = {thresholds['kapur']:.0f})")
+    axes[1, 1].axis('off')
+
+    # [1, 2] Wang & Bai
+    axes[1, 2].imshow(binaries['wang_bai'], cmap='gray')
+    if thresholds['wang_bai'] is not None:
+        axes[1, 2].set_title(f"Wang & Bai 方法 (t = {thresholds['wang_bai']:.1f})")
+    else:
+        axes[1, 2].set_title(f"Wang & Bai 方法 (失败)")
+    axes[1, 2].axis('off')
+
+    plt.tight_layout(rect=[0, 0.03, 1, 0.95])
+    fig_path = output_dir / f"{image_name}_00_comprehensive_comparison.png"
+    plt.savefig(fig_path, dpi=300)
+    print(f"  已保存综合对比图: {fig_path}")
+    plt.close()
+
+def process_image_and_compare_methods(
+    image_name: str,
+    image_path: Path,
+    expected_thresholds: Dict[str, float],
+    T_g: float = 60.0,
+    fallback_T_g: Optional[float] = 30.0,
+    estimator: str = 'mean',
+    results_db: Optional[Path] = DEFAULT_DB_PATH,
+    image_gray: Optional[np.ndarray] = None,
+    output_mode: str = DEFAULT_OUTPUT_MODE,
+    save_figure: Optional[bool] = None
+) -> Optional[Dict[str, Any]]:
+    """
+    对单张图像执行完整的复现流程，结果保存至 ./<image_name>/。
+    estimator 为 Wang & Bai 阈值的估计方法 (默认均值)；
+    结果同时追加到 results_db (见 wangbai.store)，为 None 时不记录。
+    image_gray 为已读取的灰度图像 (例如来自 wangbai.io.iter_gray_images 的预取)，缺省时从 image_path 读取。
+    output_mode 为 'bundle' 时三张二值图位压缩后存入 <image_name>_binaries.npz (见 wangbai.bundle)，
+    且不再另存灰度原图。
+    save_figure 控制是否生成综合对比图，缺省时 'png' 方式生成、'bundle' 方式不生成。
+    """
+    _check_output_mode(output_mode)
+    output_dir = Path(f"./{image_name}")
+    output_dir.mkdir(exist_ok=True)
+
+    print(f"\n{'='*60}")
+    print(f"正在处理图像: {image_name} (来自: {image_path})")
+    print(f"结果将保存至: {output_dir}")
+    print(f"{'='*60}")
+
+    # 1. 读取图像
+    if image_gray is None:
+        image_gray = read_gray_image(image_path)
+    if image_gray is None:
+        print(f"  [错误] 无法读取图像文件: {image_path}")
+        return None
+    if output_mode == 'png':
+        cv2.imwrite(str(output_dir / f"{image_name}_01_original_gray.png"), image_gray)
+
+    # 2. 边界采样并计算各方法阈值
+    print(f"  1. 正在执行 Wang & Bai 边界采样 (T_g = {T_g}, 估计方法: {estimator}) 并计算各方法阈值...")
+    start = time.perf_counter()
+    save_figure = _figure_enabled(output_mode, save_figure)
+    # 只有画采样直方图时才需要完整的采样数组
+    result = compare_thresholds(image_gray, T_g, fallback_T_g, estimator=estimator, keep_samples=save_figure)
+    elapsed_ms = (time.perf_counter() - start) * 1000
+    _report_sampling(T_g, fallback_T_g, result.T_g, result.n_samples,
+                     "     [警告] 仍未找到边界点。Wang & Bai 方法失败。")
+
+    thresholds = result.thresholds
+    print("\n  --- 阈值计算结果 ---")
+    if thresholds['wang_bai'] is not None:
+        print(f"    Wang & Bai: {thresholds['wang_bai']:.2f} \t (论文值: {expected_thresholds['wang_bai']})")
+    else:
+        print(f"    Wang & Bai: 失败 \t (论文值: {expected_thresholds['wang_bai']})")
+    print(f"    Otsu:       {thresholds['otsu']:.2f} \t (论文值: {expected_thresholds['otsu']})")
+    print(f"    Kapur:      {thresholds['kapur']:.2f} \t (论文值: {expected_thresholds['kapur']})")
+
+    # 3. 生成图表
+    if save_figure:
+        print("\n  2. 正在生成对比图表...")
+        generate_comparison_plots(image_name, image_gray, result, output_dir)
+
+    # 4. 保存二值化结果
+    if output_mode == 'bundle':
+        bundle_path = save_bundle(output_dir / f"{image_name}_binaries.npz", {image_name: result.binaries}, {
+            image_name: {'thresholds': thresholds, 'expected': expected_thresholds, 'T_g': result.T_g,
+                         'boundary_points': result.n_samples, 'image_path': str(image_path)},
+        })
+        print(f"  已保存二值结果包: {bundle_path}")
+    else:
+        cv2.imwrite(str(output_dir / f"{image_name}_02_otsu_binary.png"), result.binaries['otsu'])
+        cv2.imwrite(str(output_dir / f"{image_name}_03_kapur_binary.png"), result.binaries['kapur'])
+        cv2.imwrite(str(output_dir / f"{image_name}_04_wangbai_binary.png"), result.binaries['wang_bai'])
+
+    _record_run(results_db, image_name=image_name, thresholds=thresholds, expected=expected_thresholds,
+                image_path=image_path, shape=image_gray.shape, T_g=T_g, used_T_g=result.T_g,
+                boundary_points=result.n_samples, elapsed_ms=elapsed_ms,
+                params={'fallback_T_g': fallback_T_g, 'estimator': estimator})
+
+    print(f"  --- {image_name} 处理完成 ---")
+
+    return {
+        'image_name': image_name,
+        'thresholds': thresholds,
+        'expected': expected_thresholds,
+        'boundary_points_found': result.n_samples,
+        'output_dir': output_dir
+    }
+
+def print_comparison_summary(all_results: List[Dict[str, Any]]):
+    """打印三种方法与论文值的对比总结"""
+    print(f"\n\n{'='*70}")
+    print("                 复 现 总 结 报 告")
+    print(f"{'='*70}")
+
+    for res in all_results:
+        print(f"\n--- 图像: {res['image_name'].upper()} ---")
+        print(f"  边界采样点: {res['boundary_points_found']} 个")
+        print(f"  结果保存至: {res['output_dir']}/")
+        print(f"  方法        |  复现值  |  论文值  |  差异")
+        print(f"  -----------------------------------------------")
+
+        # Wang&Bai
+        wb_rep = res['thresholds']['wang_bai']
+        wb_exp = res['expected']['wang_bai']
+        if wb_rep is not None:
+            wb_diff = wb_rep - wb_exp
+            print(f"  Wang & Bai  |  {wb_rep: <7.2f} |  {wb_exp: <7.2f} |  {wb_diff: <+7.2f}")
+        else:
+            print(f"  Wang & Bai  |  失败    |  {wb_exp: <7.2f} |   ---")
+
+        # Otsu
+        ot_rep = res['thresholds']['otsu']
+        ot_exp = res['expected']['otsu']
+        ot_diff = ot_rep - ot_exp
+        print(f"  Otsu        |  {ot_rep: <7.2f} |  {ot_exp: <7.2f} |  {ot_diff: <+7.2f}")
+
+        # Kapur
+        ka_rep = res['thresholds']['kapur']
+        ka_exp = res['expected']['kapur']
+        ka_diff = ka_rep - ka_exp
+        print(f"  Kapur       |  {ka_rep: <7.2f} |  {ka_exp: <7.2f} |  {ka_diff: <+7.2f}")
+
+def generate_multilevel_plots(
+    image_name: str,
+    image_gray: np.ndarray,
+    result: MultilevelResult,
+    segment_names: List[str],
+    output_dir: Path
+):
+    """
+    生成并保存多阈值对比图表。
+    """
+    plt = get_pyplot()
+    boundary_samples = result.boundary_samples
+    histogram = GrayHistogram.from_image(image_gray)
+    # 横轴范围随图像类型 (uint8 为 [0, 255]，16 位图像为 [0, 65535])
+    xlim = histogram.display_range
+    thresholds = result.thresholds
+    segments = result.segments
+    num_segments = len(segments)
+
+    # 动态布局：1行用于信息，(N)行用于分段
+    # 每行最多放3个分段图
+    num_segment_rows = int(np.ceil(num_segments / 3))
+    num_rows = 1 + num_segment_rows
+    fig, axes = plt.subplots(num_rows, 3, figsize=(18, 6 * num_rows))
+    fig.suptitle(f'"{image_name}" 图像多阈值分割 (Wang & Bai, K-Means法)', fontsize=18)
+
+    # 确保 axes 是 2D 数组
+    if num_rows == 1:
+        axes = axes.reshape(1, -1)
+
+    # --- 第一行: 基本信息 ---
+
+    # [0, 0] 原始图像
+    axes[0, 0].imshow(image_gray, cmap='gray')
+    axes[0, 0].set_title(f'原始图像 (论文图 {18 if "leg" in image_name else 21})')
+    axes[0, 0].axis('off')
+
+    # [0, 1] 全局直方图
+    histogram.plot(axes[0, 1], alpha=0.7, color='darkblue')
+    axes[0, 1].set_title(f'全局直方图 (论文图 {19 if "leg" in image_name else 22} 下)')
+    axes[0, 1].set_xlabel('灰度级')
+    axes[0, 1].set_ylabel('像素数量')
+    axes[0, 1].grid(True, linestyle='--', alpha=0.3)
+    axes[0, 1].set_xlim(xlim)
+
+    # [0, 2] 边界点直方图
+    if len(boundary_samples):
+        axes[0, 2].hist(boundary_samples, bins=100, alpha=0.9, color='darkgreen')
+        axes[0, 2].set_title(f'边界采样直方图 (论文图 {19 if "leg" in image_name else 22} 上)')
+        axes[0, 2].set_xlabel('灰度级')
+        axes[0, 2].set_ylabel('采样点数量 (N={len(boundary_samples)})')
+        axes[0, 2].grid(True, linestyle='--', alpha=0.3)
+        axes[0, 2].set_xlim(xlim)
+    else:
+        axes[0, 2].text(0.5, 0.5, '未找到边界采样点', ha='center', va='center', color='red')
+        axes[0, 2].set_title('边界采样直方图')
+
+    # 在两个直方图上都画上阈值线
+    threshold_colors = ['red', 'orange', 'yellow', 'cyan']
+    for i, t in enumerate(thresholds):
+        color = threshold_colors[i % len(threshold_colors)]
+        label = f"T{i+1} (簇{i+1}均值): {t:.1f}"
+        axes[0, 1].axvline(t, color=color, linestyle='--', label=label)
+        axes[0, 2].axvline(t, color=color, linestyle='--', linewidth=2, label=label)
+    if thresholds:
+        axes[0, 1].legend()
+        axes[0, 2].legend()
+
+    # --- 后续行: 分割结果 ---
+    ax_flat = axes.ravel()
+    for i in range(num_segments):
+        plot_index = 3 + i
+        if plot_index < len(ax_flat):
+            name = segment_names[i] if i < len(segment_names) else f'分段 {i+1}'
+            ax_flat[plot_index].imshow(segments[i], cmap='gray')
+            ax_flat[plot_index].set_title(name)
+            ax_flat[plot_index].axis('off')
+
+    # 隐藏未使用的子图
+    for i in range(num_segments + 3, len(ax_flat)):
+        ax_flat[i].axis('off')
+
+    plt.tight_layout(rect=[0, 0.03, 1, 0.95])
+    fig_path = output_dir / f"{image_name}_00_multilevel_kmeans_comparison.png"
+    plt.savefig(fig_path, dpi=300)
+    print(f"  已保存综合对比图: {fig_path}")
+    plt.close()
+
+def process_ct_image(
+    image_name: str,
+    image_path: Path,
+    n_clusters: int,
+    segment_names: List[str],
+    T_g: float = 40.0,
+    fallback_T_g: Optional[float] = 20.0,
+    results_db: Optional[Path] = DEFAULT_DB_PATH,
+    image_gray: Optional[np.ndarray] = None,
+    output_mode: str = DEFAULT_OUTPUT_MODE,
+    save_figure: Optional[bool] = None,
+    **segment_kwargs
+) -> Optional[Dict[str, Any]]:
+    """
+    对单张CT图像执行完整的多阈值复现流程，结果保存至 ./<image_name>/。
+    segment_kwargs 为 segment_image_by_thresholds 的边界偏移；
+    各聚类中心以 kmeans_T1、kmeans_T2 ... 追加到 results_db，为 None 时不记录。
+    image_gray 为已读取的灰度图像，缺省时从 image_path 读取。
+    output_mode 为 'bundle' 时各分段掩码存入 <image_name>_segments.npz，且不再另存灰度原图。
+    save_figure 控制是否生成多阈值对比图，缺省时 'png' 方式生成、'bundle' 方式不生成。
+    """
+    _check_output_mode(output_mode)
+    output_dir = Path(f"./{image_name}")
+    output_dir.mkdir(exist_ok=True)
+
+    print(f"\n{'='*60}")
+    print(f"正在处理多阈值图像: {image_name} (来自: {image_path})")
+    print(f"预期聚类数 (n_clusters): {n_clusters}")
+    print(f"结果将保存至: {output_dir}")
+    print(f"{'='*60}")
+
+    # 1. 读取图像
+    if image_gray is None:
+        image_gray = read_gray_image(image_path)
+    if image_gray is None:
+        print(f"  [错误] 无法读取图像文件: {image_path}")
+        return None
+    if output_mode == 'png':
+        cv2.imwrite(str(output_dir / f"{image_name}_01_original_gray.png"), image_gray)
+
+    # 2. 边界采样 + K-Means 多阈值 + 分段
+    print(f"  1. 正在执行 Wang & Bai 边界采样 (T_g = {T_g})，并用 K-Means 寻找 {n_clusters} 个聚类中心...")
+    start = time.perf_counter()
+    result = multilevel_segment(image_gray, n_clusters, T_g, fallback_T_g, **segment_kwargs)
+    elapsed_ms = (time.perf_counter() - start) * 1000
+    n_samples = len(result.boundary_samples)
+    _report_sampling(T_g, fallback_T_g, result.T_g, n_samples, "     [错误] 仍未找到边界点。Wang & Bai 方法失败。")
+    if not n_samples:
+        return None
+
+    if not result.thresholds:
+        print(f"     [错误] K-Means 未能找到 {n_clusters} 个聚类。")
+        return None
+
+    print("\n  --- 阈值计算结果 (K-Means聚类中心) ---")
+    for i, t in enumerate(result.thresholds):
+        print(f"    T{i+1} (簇{i+1}均值): {t:.2f}")
+
+    # 3. 保存分段图像
+    print(f"\n  2. 已生成 {len(result.segments)} 个图像分段 (二值掩码)")
+    if output_mode == 'bundle':
+        bundle_path = save_bundle(
+            output_dir / f"{image_name}_segments.npz",
+            {image_name: {f"segment_{i}": seg_img for i, seg_img in enumerate(result.segments)}},
+            {image_name: {'thresholds': result.thresholds, 'segment_names': segment_names, 'T_g': result.T_g,
+                          'boundary_points': n_samples, 'image_path': str(image_path)}},
+        )
+        print(f"  已保存分段结果包: {bundle_path}")
+    else:
+        for i, seg_img in enumerate(result.segments):
+            cv2.imwrite(str(output_dir / f"{image_name}_02_segment_{i}.png"), seg_img)
+
+    # 4. 生成图表
+    if _figure_enabled(output_mode, save_figure):
+        print("\n  3. 正在生成对比图表...")
+        generate_multilevel_plots(image_name, image_gray, result, segment_names, output_dir)
+
+    _record_run(results_db, image_name=image_name,
+                thresholds={f"kmeans_T{i+1}": t for i, t in enumerate(result.thresholds)},
+                image_path=image_path, shape=image_gray.shape, T_g=T_g, used_T_g=result.T_g,
+                boundary_points=n_samples, elapsed_ms=elapsed_ms,
+                params={'fallback_T_g': fallback_T_g, 'n_clusters': n_clusters, **segment_kwargs})
+
+    print(f"  --- {image_name} 处理完成 ---")
+
+    return {
+        'image_name': image_name,
+        'thresholds': result.thresholds,
+        'boundary_points_found': n_samples,
+        'output_dir': output_dir
+    }
+
+def print_multilevel_summary(all_results: List[Dict[str, Any]]):
+    """打印多阈值分割的总结报告"""
+    print(f"\n\n{'='*70}")
+    print("                 复 现 总 结 报 告 (多阈值 K-Means)")
+    print(f"{'='*70}")
+
+    for res in all_results:
+        print(f"\n--- 图像: {res['image_name'].upper()} ---")
+        print(f"  边界采样点: {res['boundary_points_found']} 个")
+        print(f"  结果保存至: {res['output_dir']}/")
+        print(f"  检测到的阈值 (聚类中心):")
+        for i, t in enumerate(res['thresholds']):
+            print(f"    T{i+1}: {t:.2f}")
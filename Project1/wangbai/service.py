@@ -0,0 +1,344 @@
+"""
+本地阈值服务: 常驻的 HTTP 服务 + 预热的工作进程池。
+
+    python -m wangbai.service --port 8765 --workers 4
+
+接口:
+    POST /threshold?T_g=60&fallback_T_g=30&binaries=1&estimator=median
+        请求体为 PNG/BMP 等编码后的图像字节；或 Content-Type: application/json，
+        {"shm": {"name": ..., "offset": 0, "shape": [H, W], "dtype": "uint8"}, "T_g": ...}
+        引用调用方共享内存中的灰度数组 (wangbai.shm.ArrayDescriptor.to_dict())，不经过 HTTP 传输像素
+    GET /health
+        队列长度、工作进程数等状态
+
+返回 JSON: Wang & Bai / Otsu / Kapur 阈值、采样点数、实际使用的 T_g，
+binaries=1 时附带 base64 编码的 PNG 二值图。
+支持 8 位、16 位 (如 12/16 位的 CT PNG) 和 32 位浮点灰度图像；T_g、fallback_T_g 以图像自身的
+灰度单位计，默认值 60 / 30 对应 8 位图像，16 位图像应相应放大 (约 257 倍)。
+
+请求先进入有界队列，调度线程把短时间窗口内到达的请求合并成一批交给一个工作进程，
+队列满时立即返回 503 (背压)，而不是无限堆积。
+"""
+
+import argparse
+import base64
+import json
+import os
+import queue
+import threading
+import time
+from concurrent.futures import Future, ProcessPoolExecutor
+from contextlib import ExitStack
+from functools import partial
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Any, Dict, List, Optional
+from urllib.parse import parse_qs, urlparse
+
+import cv2
+import numpy as np
+
+from .estimators import ESTIMATORS
+from .shm import ArrayDescriptor, attached_views, plain_thresholds
+
+DEFAULT_T_G = 60.0
+DEFAULT_FALLBACK_T_G = 30.0
+
+# compare_thresholds 支持的灰度图像类型
+SUPPORTED_DTYPES = (np.uint8, np.uint16, np.float32)
+
+class ServiceBusy(Exception):
+    """请求队列已满"""
+
+class ServiceClosed(Exception):
+    """服务已关闭，请求未被处理"""
+
+# ---------------- 工作进程 ----------------
+
+def _warm_worker():
+    """工作进程初始化: 预先导入计算模块并跑一次小图，后续请求不再承担导入/首次调用开销"""
+    from .pipeline import compare_thresholds
+    dummy = np.zeros((8, 8), dtype=np.uint8)
+    dummy[:, 4:] = 255
+    compare_thresholds(dummy, DEFAULT_T_G, DEFAULT_FALLBACK_T_G)
+
+def _decode_image(data: bytes) -> np.ndarray:
+    """
+    解码图像字节为灰度图，保留原始位深 (8 位与各脚本 imread + cvtColor(BGR2GRAY) 的结果一致)。
+    """
+    image = cv2.imdecode(np.frombuffer(data, dtype=np.uint8), cv2.IMREAD_UNCHANGED)
+    if image is None:
+        raise ValueError("无法解码图像")
+    if image.ndim == 3:
+        code = cv2.COLOR_BGRA2GRAY if image.shape[2] == 4 else cv2.COLOR_BGR2GRAY
+        image = cv2.cvtColor(image, code)
+    if image.dtype not in SUPPORTED_DTYPES:
+        raise ValueError(f"不支持的图像类型: {image.dtype} (支持 uint8、uint16、float32)")
+    return image
+
+def _encode_png(image: np.ndarray) -> str:
+    ok, buf = cv2.imencode('.png', image)
+    if not ok:
+        raise ValueError("PNG 编码失败")
+    return base64.b64encode(buf.tobytes()).decode('ascii')
+
+def _run_job(job: Dict[str, Any]) -> Dict[str, Any]:
+    from .pipeline import compare_thresholds
+
+    start = time.perf_counter()
+    with ExitStack() as stack:
+        if job.get('shm') is not None:
+            desc = ArrayDescriptor.from_dict(job['shm'])
+            image = stack.enter_context(attached_views([desc]))[0]
+        else:
+            image = _decode_image(job['image'])
+
+        result = compare_thresholds(image, job['T_g'], job['fallback_T_g'], estimator=job.get('estimator', 'mean'))
+        response = {
+            'thresholds': plain_thresholds(result.thresholds),
+            'boundary_points_found': int(result.n_samples),
+            'T_g': float(result.T_g),
+            'shape': list(image.shape),
+        }
+        if job.get('binaries'):
+            response['binaries'] = {k: _encode_png(v) for k, v in result.binaries.items()}
+        del image, result
+    response['compute_ms'] = (time.perf_counter() - start) * 1000
+    return response
+
+def _process_batch(jobs: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+    """在一个工作进程中依次处理一批请求；单个请求出错不影响同批其他请求"""
+    results = []
+    for job in jobs:
+        try:
+            results.append(_run_job(job))
+        except Exception as e:
+            results.append({'error': f"{type(e).__name__}: {e}"})
+    return results
+
+# ---------------- 调度 ----------------
+
+class ThresholdService:
+    """
+    预热的进程池 + 有界请求队列 + 批量调度线程。
+
+    参数:
+        workers (int): 工作进程数
+        max_batch (int): 每批最多合并的请求数
+        batch_window_s (float): 凑批的最长等待时间 (秒)
+        max_queue (int): 排队请求上限，超过时 submit 抛出 ServiceBusy
+    """
+
+    def __init__(self, workers: Optional[int] = None, max_batch: int = 8,
+                 batch_window_s: float = 0.005, max_queue: int = 64):
+        self.workers = workers or os.cpu_count() or 1
+        self.max_batch = max_batch
+        self.batch_window_s = batch_window_s
+        self._queue: "queue.Queue" = queue.Queue(maxsize=max_queue)
+        # 限制同时在途的批次数，使积压留在有界队列里而不是进程池内部
+        self._inflight = threading.Semaphore(self.workers * 2)
+        self._stopping = threading.Event()
+        # 保护 stats 计数，并使“检查是否已关闭 + 入队”与 close 互斥 (HTTP 处理线程并发调用 submit)
+        self._lock = threading.Lock()
+        self.stats = {'requests': 0, 'batches': 0, 'rejected': 0}
+        self._pool = ProcessPoolExecutor(max_workers=self.workers, initializer=_warm_worker)
+        # 预热: 让所有工作进程立即启动并完成初始化
+        for f in [self._pool.submit(_process_batch, []) for _ in range(self.workers)]:
+            f.result()
+        self._dispatcher = threading.Thread(target=self._dispatch_loop, name='threshold-dispatcher', daemon=True)
+        self._dispatcher.start()
+
+    def submit(self, job: Dict[str, Any]) -> Future:
+        """提交一个请求，返回结果 Future；队列已满时抛出 ServiceBusy，已关闭时抛出 ServiceClosed"""
+        future: Future = Future()
+        with self._lock:
+            if self._stopping.is_set():
+                raise ServiceClosed()
+            try:
+                self._queue.put_nowait((job, future))
+            except queue.Full:
+                self.stats['rejected'] += 1
+                raise ServiceBusy()
+            self.stats['requests'] += 1
+        return future
+
+    def stats_snapshot(self) -> Dict[str, int]:
+        """计数的一致快照"""
+        with self._lock:
+            return dict(self.stats)
+
+    def _dispatch_loop(self):
+        while not self._stopping.is_set():
+            try:
+                first = self._queue.get(timeout=0.1)
+            except queue.Empty:
+                continue
+            batch = [first]
+            deadline = time.monotonic() + self.batch_window_s
+            while len(batch) < self.max_batch:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    break
+                try:
+                    batch.append(self._queue.get(timeout=remaining))
+                except queue.Empty:
+                    break
+
+            self._inflight.acquire()
+            with self._lock:
+                self.stats['batches'] += 1
+            futures = [f for _, f in batch]
+            try:
+                pool_future = self._pool.submit(_process_batch, [job for job, _ in batch])
+            except Exception as e:
+                self._inflight.release()
+                for f in futures:
+                    f.set_exception(e)
+                continue
+            pool_future.add_done_callback(partial(self._deliver, futures))
+
+    def _deliver(self, futures: List[Future], pool_future: Future):
+        self._inflight.release()
+        try:
+            results = pool_future.result()
+        except Exception as e:
+            for f in futures:
+                f.set_exception(e)
+            return
+        for f, r in zip(futures, results):
+            f.set_result(r)
+
+    def queue_size(self) -> int:
+        return self._queue.qsize()
+
+    def close(self):
+        """停止调度并关闭进程池；仍在队列中的请求以 ServiceClosed 失败，不会让等待的调用方一直阻塞"""
+        with self._lock:
+            self._stopping.set()
+        self._dispatcher.join()
+        # 此后不会再有请求入队
+        while True:
+            try:
+                _, future = self._queue.get_nowait()
+            except queue.Empty:
+                break
+            future.set_exception(ServiceClosed())
+        self._pool.shutdown(wait=True, cancel_futures=True)
+
+# ---------------- HTTP ----------------
+
+def _parse_float(value: Optional[str], default: Optional[float]) -> Optional[float]:
+    if value is None:
+        return default
+    if value.lower() in ('', 'none', 'null'):
+        return None
+    return float(value)
+
+class _Handler(BaseHTTPRequestHandler):
+    service: ThresholdService = None
+    request_timeout_s: float = 60.0
+
+    def _send_json(self, status: int, payload: Dict[str, Any], headers: Optional[Dict[str, str]] = None):
+        body = json.dumps(payload, ensure_ascii=False).encode('utf-8')
+        self.send_response(status)
+        self.send_header('Content-Type', 'application/json; charset=utf-8')
+        self.send_header('Content-Length', str(len(body)))
+        for k, v in (headers or {}).items():
+            self.send_header(k, v)
+        self.end_headers()
+        self.wfile.write(body)
+
+    def do_GET(self):
+        if urlparse(self.path).path != '/health':
+            self._send_json(404, {'error': 'not found'})
+            return
+        self._send_json(200, {'status': 'ok', 'workers': self.service.workers,
+                              'queued': self.service.queue_size(), **self.service.stats_snapshot()})
+
+    def do_POST(self):
+        url = urlparse(self.path)
+        if url.path != '/threshold':
+            self._send_json(404, {'error': 'not found'})
+            return
+
+        params = {k: v[-1] for k, v in parse_qs(url.query).items()}
+        try:
+            length = int(self.headers.get('Content-Length', 0))
+            if length < 0:
+                raise ValueError(f"Content-Length 无效: {length}")
+            body = self.rfile.read(length)
+            if self.headers.get('Content-Type', '').startswith('application/json'):
+                payload = json.loads(body)
+                params.update({k: str(v) for k, v in payload.items() if k != 'shm'})
+                job = {'shm': payload['shm']}
+            else:
+                if not body:
+                    raise ValueError("请求体为空")
+                job = {'image': body}
+            job['T_g'] = _parse_float(params.get('T_g'), DEFAULT_T_G)
+            job['fallback_T_g'] = _parse_float(params.get('fallback_T_g'), DEFAULT_FALLBACK_T_G)
+            job['binaries'] = params.get('binaries', '0').lower() in ('1', 'true', 'yes')
+            job['estimator'] = params.get('estimator', 'mean')
+            if job['estimator'] != 'mean' and job['estimator'] not in ESTIMATORS:
+                raise ValueError(f"未知的估计方法: {job['estimator']}")
+        except (ValueError, KeyError) as e:
+            self._send_json(400, {'error': f"请求格式错误: {e}"})
+            return
+
+        start = time.perf_counter()
+        try:
+            result = self.service.submit(job).result(timeout=self.request_timeout_s)
+        except ServiceBusy:
+            self._send_json(503, {'error': '服务繁忙，请稍后重试'}, headers={'Retry-After': '1'})
+            return
+        except ServiceClosed:
+            self._send_json(503, {'error': '服务正在关闭'})
+            return
+        except Exception as e:
+            self._send_json(500, {'error': f"{type(e).__name__}: {e}"})
+            return
+
+        if 'error' in result:
+            self._send_json(422, result)
+            return
+        result['latency_ms'] = (time.perf_counter() - start) * 1000
+        self._send_json(200, result)
+
+    def log_message(self, format, *args):
+        pass
+
+class _Server(ThreadingHTTPServer):
+    # 默认 listen backlog 只有 5，突发的并发连接会在 TCP 层被重置；
+    # 连接应先被接受，再由有界队列决定排队还是返回 503
+    request_queue_size = 128
+
+def make_server(service: ThresholdService, host: str = '127.0.0.1', port: int = 8765,
+                request_timeout_s: float = 60.0) -> ThreadingHTTPServer:
+    """创建绑定到 service 的 HTTP 服务器 (调用方负责 serve_forever / shutdown)"""
+    handler = type('ThresholdHandler', (_Handler,), {'service': service, 'request_timeout_s': request_timeout_s})
+    server = _Server((host, port), handler)
+    server.daemon_threads = True
+    return server
+
+def main(argv: Optional[List[str]] = None):
+    parser = argparse.ArgumentParser(description='Wang & Bai / Otsu / Kapur 本地阈值服务')
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=8765)
+    parser.add_argument('-j', '--workers', type=int, default=os.cpu_count(), help='工作进程数')
+    parser.add_argument('--max-batch', type=int, default=8, help='每批最多合并的请求数')
+    parser.add_argument('--batch-window-ms', type=float, default=5.0, help='凑批的最长等待时间 (毫秒)')
+    parser.add_argument('--max-queue', type=int, default=64, help='排队请求上限，超过时返回 503')
+    args = parser.parse_args(argv)
+
+    service = ThresholdService(args.workers, args.max_batch, args.batch_window_ms / 1000, args.max_queue)
+    server = make_server(service, args.host, args.port)
+    print(f"阈值服务已启动: http://{args.host}:{args.port}  (工作进程: {service.workers})")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        print("\n正在关闭...")
+    finally:
+        server.server_close()
+        service.close()
+
+if __name__ == '__main__':
+    main()
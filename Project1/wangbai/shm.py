@@ -0,0 +1,322 @@
+"""
+共享内存区 (arena): 跨进程传递图像和结果数组而不做 pickle 拷贝。
+
+主进程创建一块共享内存，把输入图像和预分配的输出缓冲区都放在里面，
+进程间只传递 ArrayDescriptor (名字 + 偏移 + 形状 + 类型，几十字节)；
+工作进程按描述符映射出 ndarray 视图，直接读输入、写输出。
+
+生命周期: 创建方 (owner) 负责 unlink，close() / with 语句 / 对象被回收时都会释放；
+工作进程只 attach，不登记到 resource_tracker，退出时不会误删创建方的内存。
+"""
+
+import threading
+import weakref
+from contextlib import contextmanager
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import asdict, dataclass
+from multiprocessing import resource_tracker, shared_memory
+from pathlib import Path
+from typing import Any, Dict, Iterator, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+from .bundle import save_bundle
+from .derivatives import derivative_dtype
+
+# 每个数组的起始偏移按缓存行对齐
+_ALIGN = 64
+
+@dataclass(frozen=True)
+class ArrayDescriptor:
+    """共享内存中一个数组的位置描述 (可 pickle / JSON 序列化)"""
+    name: str
+    offset: int
+    shape: Tuple[int, ...]
+    dtype: str
+
+    @property
+    def nbytes(self) -> int:
+        return int(np.prod(self.shape)) * np.dtype(self.dtype).itemsize
+
+    def to_dict(self) -> Dict[str, Any]:
+        d = asdict(self)
+        d['shape'] = list(self.shape)
+        return d
+
+    @classmethod
+    def from_dict(cls, d: Dict[str, Any]) -> 'ArrayDescriptor':
+        return cls(name=d['name'], offset=int(d.get('offset', 0)),
+                   shape=tuple(int(n) for n in d['shape']), dtype=str(d.get('dtype', 'uint8')))
+
+_attach_lock = threading.Lock()
+
+def attach_shared_memory(name: str) -> shared_memory.SharedMemory:
+    """
+    连接其他进程创建的共享内存。
+
+    连接方不拥有这块内存，不能登记到 resource_tracker: 否则本进程退出时会把
+    创建方仍在使用的内存删除；fork 出的子进程与父进程共用同一个 tracker，
+    事后 unregister 又会抹掉创建方自己的登记。Python 3.13+ 直接用 track=False，
+    更早的版本在 attach 期间临时屏蔽 shared_memory 的登记。
+    """
+    try:
+        return shared_memory.SharedMemory(name=name, track=False)
+    except TypeError:
+        pass
+
+    with _attach_lock:
+        register = resource_tracker.register
+
+        def _skip_shared_memory(res_name, rtype):
+            if rtype != 'shared_memory':
+                register(res_name, rtype)
+
+        resource_tracker.register = _skip_shared_memory
+        try:
+            return shared_memory.SharedMemory(name=name)
+        finally:
+            resource_tracker.register = register
+
+def _view(shm: shared_memory.SharedMemory, desc: ArrayDescriptor) -> np.ndarray:
+    return np.ndarray(desc.shape, dtype=np.dtype(desc.dtype), buffer=shm.buf, offset=desc.offset)
+
+class SharedArena:
+    """
+    一块共享内存 + 顺序分配器。
+
+    参数:
+        size (int): 总字节数
+    """
+
+    def __init__(self, size: int):
+        self._shm = shared_memory.SharedMemory(create=True, size=max(int(size), 1))
+        self.name = self._shm.name
+        self.size = self._shm.size
+        self._next = 0
+        # 即使调用方忘记 close，对象回收或解释器退出时也会释放
+        self._finalizer = weakref.finalize(self, SharedArena._release, self._shm)
+
+    @staticmethod
+    def _release(shm: shared_memory.SharedMemory):
+        shm.close()
+        shm.unlink()
+
+    @staticmethod
+    def required_size(specs: Sequence[Tuple[Tuple[int, ...], Any]]) -> int:
+        """容纳一组 (shape, dtype) 数组 (含对齐) 所需的字节数"""
+        total = 0
+        for shape, dtype in specs:
+            total = -(-total // _ALIGN) * _ALIGN
+            total += int(np.prod(shape)) * np.dtype(dtype).itemsize
+        return total
+
+    def allocate(self, shape: Tuple[int, ...], dtype: Any = np.uint8) -> Tuple[ArrayDescriptor, np.ndarray]:
+        """分配一个数组，返回 (描述符, 本进程中的视图)"""
+        offset = -(-self._next // _ALIGN) * _ALIGN
+        desc = ArrayDescriptor(self.name, offset, tuple(int(n) for n in shape), np.dtype(dtype).str)
+        if offset + desc.nbytes > self.size:
+            raise MemoryError(f"共享内存区空间不足: 需要 {offset + desc.nbytes} 字节，总共 {self.size} 字节")
+        self._next = offset + desc.nbytes
+        return desc, _view(self._shm, desc)
+
+    def put(self, array: np.ndarray) -> ArrayDescriptor:
+        """把数组拷贝进共享内存 (每张图像只拷贝这一次)"""
+        desc, view = self.allocate(array.shape, array.dtype)
+        view[...] = array
+        return desc
+
+    def view(self, desc: ArrayDescriptor) -> np.ndarray:
+        if desc.name != self.name:
+            raise ValueError(f"描述符不属于该共享内存区: {desc.name}")
+        return _view(self._shm, desc)
+
+    def close(self):
+        """释放共享内存 (之后本进程中的视图不可再使用)"""
+        self._finalizer()
+
+    @property
+    def closed(self) -> bool:
+        return not self._finalizer.alive
+
+    def __enter__(self) -> 'SharedArena':
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+@contextmanager
+def attached_views(descs: Sequence[ArrayDescriptor]) -> Iterator[List[np.ndarray]]:
+    """
+    在工作进程中按描述符映射出视图；同一块共享内存只 attach 一次，退出时统一 close。
+    视图不得在 with 块之外使用。
+    """
+    segments: Dict[str, shared_memory.SharedMemory] = {}
+    try:
+        views = []
+        for desc in descs:
+            if desc.name not in segments:
+                segments[desc.name] = attach_shared_memory(desc.name)
+            views.append(_view(segments[desc.name], desc))
+        yield views
+        del views
+    finally:
+        for shm in segments.values():
+            try:
+                shm.close()
+            except BufferError:
+                # 异常回溯仍引用着视图时无法立即关闭，映射在视图被回收后释放
+                pass
+
+# ---------------- 进程池批处理 ----------------
+
+BINARY_KEYS = ('wang_bai', 'otsu', 'kapur')
+
+def plain_thresholds(thresholds: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    阈值字典转为可 JSON 序列化的 Python 数值: 整数阈值 (如 uint8 / uint16 的 Kapur) 保持为 int，
+    其余为 float (浮点图像的 Kapur 是 bin 边界，不能取整)，失败的阈值保持为 None。
+    """
+    return {k: None if v is None else int(v) if isinstance(v, (int, np.integer)) else float(v)
+            for k, v in thresholds.items()}
+
+def _per_image(value: Any, n: int, name: str) -> List[Any]:
+    # 标量 (或 None) 对所有图像通用；序列则逐图像给出
+    if value is None or np.ndim(value) == 0:
+        return [value] * n
+    values = list(value)
+    if len(values) != n:
+        raise ValueError(f"{name} 的个数 ({len(values)}) 与图像数 ({n}) 不一致")
+    return values
+
+def _compare_task(
+    image_desc: ArrayDescriptor,
+    binary_descs: Dict[str, ArrayDescriptor],
+    derivative_descs: Optional[Tuple[ArrayDescriptor, ArrayDescriptor]],
+    T_g: float,
+    fallback_T_g: Optional[float]
+) -> Dict[str, Any]:
+    """工作进程: 读共享内存中的图像，把二值图 (和导数) 直接写回共享内存，只返回小的结果字典"""
+    from .pipeline import compare_thresholds
+
+    descs = [image_desc] + [binary_descs[k] for k in BINARY_KEYS] + list(derivative_descs or ())
+    with attached_views(descs) as views:
+        image = views[0]
+        binaries_out = dict(zip(BINARY_KEYS, views[1:4]))
+        derivatives_out = tuple(views[4:6]) if derivative_descs else None
+        result = compare_thresholds(image, T_g, fallback_T_g, derivatives_out, binaries_out)
+        thresholds = plain_thresholds(result.thresholds)
+        n_samples = int(result.n_samples)
+        used_T_g = float(result.T_g)
+        del image, binaries_out, derivatives_out, result
+    return {'thresholds': thresholds, 'boundary_points_found': n_samples, 'T_g': used_T_g}
+
+class SharedBatch:
+    """
+    batch_compare_thresholds 的结果。二值图 (和导数) 是共享内存中的视图，
+    在 close() / with 块结束前有效；需要长期保留时自行 copy()。
+
+    属性:
+        results (List[Dict]): 每张图像的阈值、采样点数、实际 T_g
+    """
+
+    def __init__(self, arena: SharedArena, results: List[Dict[str, Any]],
+                 binaries: List[Dict[str, ArrayDescriptor]],
+                 derivatives: List[Optional[Tuple[ArrayDescriptor, ArrayDescriptor]]]):
+        self.arena = arena
+        self.results = results
+        self._binaries = binaries
+        self._derivatives = derivatives
+
+    def __len__(self) -> int:
+        return len(self.results)
+
+    def binary(self, index: int, method: str) -> np.ndarray:
+        return self.arena.view(self._binaries[index][method])
+
+    def save_bundle(self, path: Path, names: Optional[Sequence[str]] = None) -> Path:
+        """
+        把整批二值图位压缩存入一个 .npz (见 wangbai.bundle)，各图像的结果记录作为元数据。
+        names 为各图像的名字，缺省为 '0'、'1' ...
+        """
+        names = list(names) if names is not None else [str(i) for i in range(len(self))]
+        binaries = {name: {k: self.binary(i, k) for k in BINARY_KEYS} for i, name in enumerate(names)}
+        return save_bundle(path, binaries, dict(zip(names, self.results)))
+
+    def derivatives(self, index: int) -> Tuple[np.ndarray, np.ndarray]:
+        descs = self._derivatives[index]
+        if descs is None:
+            raise ValueError("未保留导数 (with_derivatives=False)")
+        return self.arena.view(descs[0]), self.arena.view(descs[1])
+
+    def close(self):
+        self.arena.close()
+
+    def __enter__(self) -> 'SharedBatch':
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+def batch_compare_thresholds(
+    images: Sequence[np.ndarray],
+    T_g: float = 60.0,
+    fallback_T_g: Optional[float] = 30.0,
+    workers: Optional[int] = None,
+    with_derivatives: bool = False,
+    executor: Optional[ProcessPoolExecutor] = None
+) -> SharedBatch:
+    """
+    多进程计算一批灰度图像的三种阈值与二值图。
+
+    所有输入图像和输出缓冲区放在一块共享内存中，只拷贝一次；
+    提交给进程池的只有描述符，结果数组由工作进程原地写入。
+    图像以原始类型 (uint8、uint16、float32 等) 放入共享内存，二值图总是 uint8。
+
+    参数:
+        images: 灰度图像 (尺寸、类型可不同)
+        T_g, fallback_T_g: 梯度阈值及回退值，以图像自身的灰度单位计 (uint16 图像约为 uint8 的 257 倍)；
+            标量对所有图像通用，也可以按图像给出序列
+        workers (Optional[int]): 工作进程数 (未给出 executor 时使用)
+        with_derivatives (bool): 是否在共享内存中保留梯度/拉普拉斯 (类型见 derivative_dtype)
+        executor: 可复用的进程池 (例如常驻服务的预热进程池)
+
+    返回:
+        SharedBatch (请用 with 语句或 close() 释放共享内存)
+    """
+    T_gs = _per_image(T_g, len(images), 'T_g')
+    fallback_T_gs = _per_image(fallback_T_g, len(images), 'fallback_T_g')
+
+    specs = []
+    for image in images:
+        specs.append((image.shape, image.dtype))
+        specs.extend([(image.shape, np.uint8)] * len(BINARY_KEYS))
+        if with_derivatives:
+            specs.extend([(image.shape, derivative_dtype(image))] * 2)
+    arena = SharedArena(SharedArena.required_size(specs))
+
+    try:
+        tasks = []
+        binary_descs, derivative_descs = [], []
+        for image, image_T_g, image_fallback_T_g in zip(images, T_gs, fallback_T_gs):
+            image_desc = arena.put(np.ascontiguousarray(image))
+            binaries = {k: arena.allocate(image.shape, np.uint8)[0] for k in BINARY_KEYS}
+            derivs = None
+            if with_derivatives:
+                dtype = derivative_dtype(image)
+                derivs = (arena.allocate(image.shape, dtype)[0], arena.allocate(image.shape, dtype)[0])
+            tasks.append((image_desc, binaries, derivs, image_T_g, image_fallback_T_g))
+            binary_descs.append(binaries)
+            derivative_descs.append(derivs)
+
+        pool = executor or ProcessPoolExecutor(max_workers=workers)
+        try:
+            futures = [pool.submit(_compare_task, *task) for task in tasks]
+            results = [f.result() for f in futures]
+        finally:
+            if executor is None:
+                pool.shutdown()
+    except BaseException:
+        arena.close()
+        raise
+
+    return SharedBatch(arena, results, binary_descs, derivative_descs)
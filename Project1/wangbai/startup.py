@@ -0,0 +1,96 @@
+"""
+入口脚本的启动时间测量。
+
+每个脚本在独立的新解释器中导入 (不执行 main)，记录模块导入耗时，
+并检查 matplotlib / sklearn 是否被提前加载。用法 (在 Project1 目录下):
+
+    python -m wangbai.startup                    # 检查全部脚本
+    python -m wangbai.startup rice/rice.py --budget 0.3
+"""
+
+import argparse
+import json
+import subprocess
+import sys
+from dataclasses import dataclass
+from pathlib import Path
+from typing import List, Optional
+
+# 只应在绘图/聚类时才加载的重量级模块
+HEAVY_MODULES = ('matplotlib', 'sklearn')
+
+# 导入单个入口脚本的时间预算 (秒)，numpy + cv2 本身约占 0.1 ~ 0.2 秒
+DEFAULT_BUDGET_S = 0.3
+
+_PROBE = """
+import importlib.util, json, sys, time
+start = time.perf_counter()
+spec = importlib.util.spec_from_file_location('_startup_probe', sys.argv[1])
+module = importlib.util.module_from_spec(spec)
+spec.loader.exec_module(module)
+elapsed = time.perf_counter() - start
+heavy = sorted(name for name in sys.argv[2:] if name in sys.modules)
+print(json.dumps({'seconds': elapsed, 'heavy': heavy}))
+"""
+
+@dataclass
+class StartupReport:
+    """单个脚本的启动测量结果"""
+    script: str
+    seconds: float
+    heavy_modules: List[str]
+    budget_s: float
+
+    @property
+    def ok(self) -> bool:
+        return self.seconds <= self.budget_s and not self.heavy_modules
+
+def measure_startup(script: Path, repeat: int = 3, budget_s: float = DEFAULT_BUDGET_S) -> StartupReport:
+    """
+    在新进程中导入脚本 repeat 次，取最短的导入耗时 (排除磁盘缓存等偶然因素)。
+
+    参数:
+        script (Path): 入口脚本路径
+        repeat (int): 重复次数
+        budget_s (float): 时间预算 (秒)
+
+    返回:
+        StartupReport: 测量结果
+    """
+    best = None
+    heavy: List[str] = []
+    for _ in range(repeat):
+        out = subprocess.run(
+            [sys.executable, '-c', _PROBE, str(script), *HEAVY_MODULES],
+            capture_output=True, text=True, check=True,
+        )
+        record = json.loads(out.stdout.strip().splitlines()[-1])
+        if best is None or record['seconds'] < best:
+            best = record['seconds']
+        heavy = record['heavy']
+    return StartupReport(script=str(script), seconds=best, heavy_modules=heavy, budget_s=budget_s)
+
+def default_scripts(root: Optional[Path] = None) -> List[Path]:
+    """Project1 下的全部入口脚本 (各子目录中的 .py，不含 wangbai 自身)"""
+    root = root or Path(__file__).resolve().parents[1]
+    return sorted(p for p in root.glob('*/*.py') if p.parent.name != 'wangbai')
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description='测量入口脚本的导入耗时')
+    parser.add_argument('scripts', nargs='*', type=Path, help='要测量的脚本 (默认全部)')
+    parser.add_argument('--budget', type=float, default=DEFAULT_BUDGET_S, help='单个脚本的导入时间预算 (秒)')
+    parser.add_argument('--repeat', type=int, default=3, help='每个脚本的重复测量次数')
+    args = parser.parse_args(argv)
+
+    reports = [measure_startup(s, args.repeat, args.budget) for s in (args.scripts or default_scripts())]
+    for r in reports:
+        status = '通过' if r.ok else '超出'
+        heavy = f"  (提前加载: {', '.join(r.heavy_modules)})" if r.heavy_modules else ''
+        print(f"  {r.script:<60} {r.seconds * 1000:8.1f} ms  {status}{heavy}")
+
+    n_fail = sum(not r.ok for r in reports)
+    print(f"\n预算 {args.budget * 1000:.0f} ms: {len(reports) - n_fail} 通过, {n_fail} 超出")
+    return 1 if n_fail else 0
+
+if __name__ == '__main__':
+    sys.exit(main())
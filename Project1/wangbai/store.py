@@ -0,0 +1,234 @@
+"""
+复现结果存储 (SQLite) 与批量回归检查。
+
+每次运行复现脚本，每张图像追加一条 runs 记录 (图像哈希、尺寸、参数、采样点数、耗时)，
+每个方法的阈值及论文值各一行写入 thresholds 表 (窄表，多阈值的 K-Means 结果同样适用)。
+与论文值的对比是一条 SQL 查询，上千条记录也一次完成。用法 (在 Project1 目录下):
+
+    python -m wangbai.store check                      # 最近一次各图像的结果，默认容差 2
+    python -m wangbai.store check --tol 1 --tol otsu=0.5 --all
+    python -m wangbai.store list --image rice
+
+数据库默认位于 Project1/results.sqlite，可用环境变量 WANGBAI_RESULTS_DB 修改。
+"""
+
+import argparse
+import hashlib
+import json
+import os
+import sqlite3
+import sys
+import time
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Sequence
+
+DEFAULT_DB_PATH = Path(os.environ.get('WANGBAI_RESULTS_DB', Path(__file__).resolve().parents[1] / 'results.sqlite'))
+
+# 未单独指定方法容差时使用的容差 (灰度级)
+DEFAULT_TOLERANCE = 2.0
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS runs (
+    id INTEGER PRIMARY KEY,
+    created_at REAL NOT NULL,
+    image_name TEXT NOT NULL,
+    image_path TEXT,
+    image_sha256 TEXT,
+    height INTEGER,
+    width INTEGER,
+    T_g REAL,
+    used_T_g REAL,
+    boundary_points INTEGER,
+    elapsed_ms REAL,
+    params TEXT
+);
+CREATE TABLE IF NOT EXISTS thresholds (
+    run_id INTEGER NOT NULL REFERENCES runs(id),
+    method TEXT NOT NULL,
+    value REAL,
+    expected REAL,
+    PRIMARY KEY (run_id, method)
+);
+CREATE INDEX IF NOT EXISTS runs_image ON runs(image_name, id);
+"""
+
+def file_sha256(path: Path) -> str:
+    """图像文件内容的 SHA-256"""
+    digest = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for chunk in iter(lambda: f.read(1 << 20), b''):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+class ResultStore:
+    """
+    复现结果数据库。
+
+    参数:
+        path (Path): SQLite 文件路径 (不存在时创建)
+    """
+
+    def __init__(self, path: Path = DEFAULT_DB_PATH):
+        self.path = Path(path)
+        self.conn = sqlite3.connect(str(self.path))
+        self.conn.executescript(_SCHEMA)
+
+    def record_run(
+        self,
+        image_name: str,
+        thresholds: Dict[str, Optional[float]],
+        expected: Optional[Dict[str, float]] = None,
+        image_path: Optional[Path] = None,
+        shape: Optional[Sequence[int]] = None,
+        T_g: Optional[float] = None,
+        used_T_g: Optional[float] = None,
+        boundary_points: Optional[int] = None,
+        elapsed_ms: Optional[float] = None,
+        params: Optional[Dict[str, Any]] = None
+    ) -> int:
+        """
+        追加一张图像的结果。
+
+        参数:
+            thresholds: 方法名 -> 阈值 (失败为 None)
+            expected: 方法名 -> 论文值 (可缺省)
+            params: 其余运行参数，以 JSON 保存
+
+        返回:
+            int: runs 表中的记录 id
+        """
+        expected = expected or {}
+        with self.conn:
+            cur = self.conn.execute(
+                "INSERT INTO runs (created_at, image_name, image_path, image_sha256, height, width,"
+                " T_g, used_T_g, boundary_points, elapsed_ms, params) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                (time.time(), image_name, str(image_path) if image_path else None,
+                 file_sha256(image_path) if image_path else None,
+                 shape[0] if shape else None, shape[1] if shape else None,
+                 T_g, used_T_g, boundary_points, elapsed_ms, json.dumps(params or {}, ensure_ascii=False)),
+            )
+            run_id = cur.lastrowid
+            self.conn.executemany(
+                "INSERT INTO thresholds (run_id, method, value, expected) VALUES (?, ?, ?, ?)",
+                [(run_id, method, None if value is None else float(value), expected.get(method))
+                 for method, value in thresholds.items()],
+            )
+        return run_id
+
+    def check(
+        self,
+        tolerance: float = DEFAULT_TOLERANCE,
+        method_tolerances: Optional[Dict[str, float]] = None,
+        latest_only: bool = True,
+        image_name: Optional[str] = None
+    ) -> List[Dict[str, Any]]:
+        """
+        把有论文值的阈值与论文值比较，一条查询完成。
+
+        参数:
+            tolerance (float): 默认容差
+            method_tolerances: 按方法覆盖的容差
+            latest_only (bool): 每张图像只检查最近一次运行
+            image_name (Optional[str]): 只检查该图像
+
+        返回:
+            List[Dict]: 每条 (运行, 方法) 的比较结果，含 passed 字段 (失败的阈值视为不通过)
+        """
+        with self.conn:
+            self.conn.execute("CREATE TEMP TABLE IF NOT EXISTS tolerances (method TEXT PRIMARY KEY, tol REAL)")
+            self.conn.execute("DELETE FROM tolerances")
+            self.conn.executemany("INSERT INTO tolerances VALUES (?, ?)", (method_tolerances or {}).items())
+
+        latest = ("AND r.id = (SELECT MAX(id) FROM runs WHERE image_name = r.image_name)" if latest_only else "")
+        query = f"""
+            SELECT r.id, r.image_name, datetime(r.created_at, 'unixepoch', 'localtime'), t.method,
+                   t.value, t.expected, t.value - t.expected, COALESCE(tol.tol, ?) AS tol,
+                   t.value IS NOT NULL AND ABS(t.value - t.expected) <= COALESCE(tol.tol, ?)
+            FROM thresholds t
+            JOIN runs r ON r.id = t.run_id
+            LEFT JOIN tolerances tol ON tol.method = t.method
+            WHERE t.expected IS NOT NULL {latest} AND (? IS NULL OR r.image_name = ?)
+            ORDER BY r.image_name, r.id, t.method
+        """
+        rows = self.conn.execute(query, (tolerance, tolerance, image_name, image_name)).fetchall()
+        keys = ('run_id', 'image_name', 'created_at', 'method', 'value', 'expected', 'diff', 'tolerance', 'passed')
+        return [dict(zip(keys, row[:-1] + (bool(row[-1]),))) for row in rows]
+
+    def runs(self, image_name: Optional[str] = None, limit: int = 20) -> List[Dict[str, Any]]:
+        """最近的运行记录 (新的在前)，thresholds 字段为方法名 -> 阈值"""
+        rows = self.conn.execute(
+            "SELECT id, image_name, datetime(created_at, 'unixepoch', 'localtime'), used_T_g, boundary_points,"
+            " elapsed_ms, image_sha256 FROM runs WHERE (? IS NULL OR image_name = ?) ORDER BY id DESC LIMIT ?",
+            (image_name, image_name, limit),
+        ).fetchall()
+        keys = ('run_id', 'image_name', 'created_at', 'used_T_g', 'boundary_points', 'elapsed_ms', 'image_sha256')
+        records = [dict(zip(keys, row)) for row in rows]
+        for record in records:
+            record['thresholds'] = dict(self.conn.execute(
+                "SELECT method, value FROM thresholds WHERE run_id = ? ORDER BY method", (record['run_id'],)))
+        return records
+
+    def close(self):
+        self.conn.close()
+
+    def __enter__(self) -> 'ResultStore':
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+def _parse_tolerances(values: List[str]):
+    """'--tol 2 --tol otsu=0.5' -> (默认容差, {方法: 容差})"""
+    default, per_method = DEFAULT_TOLERANCE, {}
+    for value in values:
+        if '=' in value:
+            method, tol = value.split('=', 1)
+            per_method[method] = float(tol)
+        else:
+            default = float(value)
+    return default, per_method
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description='复现结果数据库')
+    parser.add_argument('--db', type=Path, default=DEFAULT_DB_PATH, help='数据库路径')
+    sub = parser.add_subparsers(dest='command', required=True)
+
+    check = sub.add_parser('check', help='与论文值比较')
+    check.add_argument('--tol', action='append', default=[],
+                       help=f'容差，可写 方法=容差 单独指定 (默认 {DEFAULT_TOLERANCE})')
+    check.add_argument('--all', action='store_true', help='检查全部历史运行，而不只是每张图像最近一次')
+    check.add_argument('--image', default=None, help='只检查该图像')
+
+    listing = sub.add_parser('list', help='列出最近的运行记录')
+    listing.add_argument('--image', default=None, help='只列出该图像')
+    listing.add_argument('-n', type=int, default=20, help='条数')
+    args = parser.parse_args(argv)
+
+    if not args.db.exists():
+        print(f"数据库不存在: {args.db}")
+        return 1
+
+    with ResultStore(args.db) as store:
+        if args.command == 'list':
+            for r in store.runs(args.image, args.n):
+                values = ', '.join(f"{m}={'失败' if v is None else f'{v:.2f}'}" for m, v in r['thresholds'].items())
+                print(f"  #{r['run_id']:<5} {r['created_at']}  {r['image_name']:<12} "
+                      f"采样 {r['boundary_points']}  {r['elapsed_ms'] or 0:7.1f} ms  {values}")
+            return 0
+
+        default, per_method = _parse_tolerances(args.tol)
+        results = store.check(default, per_method, latest_only=not args.all, image_name=args.image)
+
+    for r in results:
+        value = '失败' if r['value'] is None else f"{r['value']:.2f}"
+        diff = '---' if r['diff'] is None else f"{r['diff']:+.2f}"
+        status = '通过' if r['passed'] else '超出'
+        print(f"  #{r['run_id']:<5} {r['image_name']:<12} {r['method']:<10} {value:>8} "
+              f"(论文值 {r['expected']:.2f}, 差异 {diff}, 容差 {r['tolerance']:g})  {status}")
+
+    n_fail = sum(not r['passed'] for r in results)
+    print(f"\n共 {len(results)} 项: {len(results) - n_fail} 通过, {n_fail} 超出容差")
+    return 1 if n_fail else 0
+
+if __name__ == '__main__':
+    sys.exit(main())
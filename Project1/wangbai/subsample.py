@@ -0,0 +1,196 @@
+"""
+分块抽样的 Wang & Bai 阈值估计 (提前终止)。
+
+把“像素右/下边”的网格切成若干 tile，按随机 (或分层随机) 顺序逐个访问：
+每个 tile 只在自身区域加 1 像素 halo 上计算导数和边界采样，结果与整图计算一致。
+访问过程中维护阈值的比率估计及其置信区间，区间半宽小于要求的精度即停止，
+不必对整幅图像求导和采样。
+
+同一 tile 内的采样点高度相关，因此置信区间按整群抽样 (tile 为群) 的比率估计方差
+计算，而不是把所有采样点当作独立样本；并带有限总体校正，访问完全部 tile 时半宽为 0。
+"""
+
+from dataclasses import dataclass
+from statistics import NormalDist
+from typing import List, Optional, Tuple
+
+import numpy as np
+
+from .derivatives import calculate_image_derivatives
+from .sampling import _edge_samples
+
+# 默认 tile 边长 (像素边网格上的行/列数)
+DEFAULT_TILE_SIZE = 64
+
+@dataclass
+class SubsampledEstimate:
+    """
+    分块抽样估计的结果。
+
+    属性:
+        threshold (Optional[float]): 阈值估计 (已访问 tile 内边界采样的均值)，没有采样点时为 None
+        half_width (float): 置信区间半宽 (达到的精度，灰度级)
+        confidence (float): 置信水平
+        converged (bool): 是否在访问完全部 tile 之前达到了要求的精度
+        n_samples (int): 已用的边界采样点数
+        tiles_visited (int): 已访问的 tile 数
+        n_tiles (int): tile 总数
+        fraction_visited (float): 已访问 tile 覆盖的像素比例
+        T_g (float): 使用的梯度阈值
+    """
+    threshold: Optional[float]
+    half_width: float
+    confidence: float
+    converged: bool
+    n_samples: int
+    tiles_visited: int
+    n_tiles: int
+    fraction_visited: float
+    T_g: float
+
+def edge_tiles(shape: Tuple[int, int], tile_size: int = DEFAULT_TILE_SIZE) -> List[Tuple[int, int, int, int]]:
+    """
+    把 (H-1, W-1) 的像素边网格切成 tile，按行优先返回 (r0, r1, c0, c1) 列表。
+    """
+    rows = range(0, shape[0] - 1, tile_size)
+    cols = range(0, shape[1] - 1, tile_size)
+    return [(r, min(r + tile_size, shape[0] - 1), c, min(c + tile_size, shape[1] - 1))
+            for r in rows for c in cols]
+
+def tile_order(
+    n_tile_rows: int,
+    n_tile_cols: int,
+    order: str = 'random',
+    strata: int = 4,
+    seed: Optional[int] = 0
+) -> np.ndarray:
+    """
+    tile 的访问顺序 (行优先编号)。
+
+    参数:
+        order (str): 'random' 为整体随机排列；
+            'stratified' 把 tile 网格分成 strata x strata 个区域，各区域内部随机排列后轮流取，
+            保证前若干个 tile 在空间上均匀覆盖整幅图像
+        strata (int): 'stratified' 时每个方向的分区数
+        seed (Optional[int]): 随机种子，None 时每次不同
+
+    返回:
+        np.ndarray: tile 编号的排列
+    """
+    rng = np.random.default_rng(seed)
+    n_tiles = n_tile_rows * n_tile_cols
+    if order == 'random':
+        return rng.permutation(n_tiles)
+    if order != 'stratified':
+        raise ValueError(f"未知的访问顺序: {order} (可选: random, stratified)")
+
+    ids = np.arange(n_tiles).reshape(n_tile_rows, n_tile_cols)
+    row_groups = np.array_split(np.arange(n_tile_rows), min(strata, n_tile_rows))
+    col_groups = np.array_split(np.arange(n_tile_cols), min(strata, n_tile_cols))
+    groups = [rng.permutation(ids[np.ix_(r, c)].ravel()) for r in row_groups for c in col_groups]
+    rng.shuffle(groups)
+
+    # 轮流从各区域取下一个 tile
+    result = []
+    for k in range(max(len(g) for g in groups)):
+        result.extend(int(g[k]) for g in groups if k < len(g))
+    return np.array(result, dtype=np.int64)
+
+def _tile_samples(image_gray: np.ndarray, T_g: float, tile: Tuple[int, int, int, int]) -> np.ndarray:
+    # tile 覆盖像素行 [r0, r1] 与列 [c0, c1] (右/下边需要多 1 行/列)，导数再向外多取 1 像素 halo
+    r0, r1, c0, c1 = tile
+    height, width = image_gray.shape
+    lo_r, hi_r = max(r0 - 1, 0), min(r1 + 2, height)
+    lo_c, hi_c = max(c0 - 1, 0), min(c1 + 2, width)
+    grad, lap = calculate_image_derivatives(image_gray[lo_r:hi_r, lo_c:hi_c])
+
+    rows = slice(r0 - lo_r, r1 + 1 - lo_r)
+    cols = slice(c0 - lo_c, c1 + 1 - lo_c)
+    values, mask = _edge_samples(image_gray[r0:r1 + 1, c0:c1 + 1], grad[rows, cols], lap[rows, cols], T_g)
+    return values[mask]
+
+def subsampled_wang_bai_threshold(
+    image_gray: np.ndarray,
+    T_g: float,
+    tolerance: float = 0.5,
+    confidence: float = 0.95,
+    tile_size: int = DEFAULT_TILE_SIZE,
+    order: str = 'random',
+    min_tiles: int = 8,
+    seed: Optional[int] = 0
+) -> SubsampledEstimate:
+    """
+    按 tile 抽样估计 Wang & Bai 阈值，置信区间半宽 <= tolerance 时提前停止。
+
+    阈值为已访问 tile 内全部采样的均值 (比率估计 R = sum(y_i) / sum(n_i))，方差
+        Var(R) ≈ (1 - f) / (m * n_bar^2) * sum((y_i - R * n_i)^2) / (m - 1)
+    其中 m 为已访问 tile 数，y_i、n_i 为第 i 个 tile 的采样值之和与采样数，f = m / tile 总数。
+    只需维护几个累加和，内存与图像大小无关。
+
+    参数:
+        image_gray (np.ndarray): 8位灰度图像
+        T_g (float): 梯度阈值
+        tolerance (float): 要求的置信区间半宽 (灰度级)
+        confidence (float): 置信水平
+        tile_size (int): tile 边长
+        order (str): 'random' 或 'stratified'，见 tile_order
+        min_tiles (int): 判断收敛前至少访问的 tile 数 (且其中至少 2 个含采样点)
+        seed (Optional[int]): 访问顺序的随机种子
+
+    返回:
+        SubsampledEstimate
+    """
+    height, width = image_gray.shape
+    tiles = edge_tiles((height, width), tile_size)
+    n_tile_rows = -(-(height - 1) // tile_size)
+    n_tile_cols = -(-(width - 1) // tile_size)
+    visit = tile_order(n_tile_rows, n_tile_cols, order, seed=seed)
+    z = NormalDist().inv_cdf((1 + confidence) / 2)
+
+    # 累加和: sum n_i, sum y_i, sum y_i^2, sum y_i n_i, sum n_i^2
+    s_n = s_y = s_yy = s_yn = s_nn = 0.0
+    m = m_nonempty = 0
+    visited_edges = 0
+    total_edges = (height - 1) * (width - 1)
+    threshold, half_width, converged = None, float('inf'), False
+
+    for tile_id in visit:
+        tile = tiles[tile_id]
+        samples = _tile_samples(image_gray, T_g, tile)
+        n_i, y_i = float(samples.size), float(samples.sum())
+        s_n += n_i
+        s_y += y_i
+        s_yy += y_i * y_i
+        s_yn += y_i * n_i
+        s_nn += n_i * n_i
+        m += 1
+        m_nonempty += samples.size > 0
+        visited_edges += (tile[1] - tile[0]) * (tile[3] - tile[2])
+
+        if s_n == 0:
+            continue
+        threshold = s_y / s_n
+        f = m / len(tiles)
+        if f >= 1:
+            half_width = 0.0
+            break
+        if m < 2:
+            continue
+        residual = max(s_yy - 2 * threshold * s_yn + threshold ** 2 * s_nn, 0.0)
+        n_bar = s_n / m
+        half_width = z * float(np.sqrt((1 - f) * residual / (m - 1) / m)) / n_bar
+        if m >= min_tiles and m_nonempty >= 2 and half_width <= tolerance:
+            converged = True
+            break
+
+    return SubsampledEstimate(
+        threshold=threshold,
+        half_width=half_width,
+        confidence=confidence,
+        converged=converged,
+        n_samples=int(s_n),
+        tiles_visited=m,
+        n_tiles=len(tiles),
+        fraction_visited=visited_edges / total_edges if total_edges else 0.0,
+        T_g=T_g,
+    )